@@ -0,0 +1,110 @@
+"""
+Matching cost of the voice command index (utils.commands) as the
+registry grows.
+
+    python benchmarks/bench_commands.py [--sizes 5,50,500,2000] [--lang en-US|hi-IN]
+
+For each size, the built-in commands are padded with synthetic ones
+("open <app>", "start <app> now", "<verb> {text}" ...) and compiled, then
+a fixed set of utterances is matched: built-in commands, synthetic ones,
+recognizer-style misspellings and chatter that matches nothing. The
+same utterances also go through a linear scan that tests every phrase's
+keywords in turn (how the old if/elif chains scaled). Reported per
+size: phrases, compile time, and µs per utterance for both, plus how
+many utterances matched.
+"""
+import os
+import sys
+import time
+import random
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+from utils.commands import BUILTIN_COMMANDS, CommandIndex, command_languages, tokenize
+
+VERBS   = ("open", "start", "launch", "show", "close", "switch to", "play", "mute")
+SYLLABI = ("ka", "ro", "mi", "ten", "sul", "dor", "vex", "pa", "lin", "qua", "zo", "bre")
+ROUNDS  = 20
+
+
+def word(rng):
+    return "".join(rng.choice(SYLLABI) for _ in range(rng.randint(2, 4)))
+
+def synthetic(n, rng):
+    """`n` made-up commands with English phrases, some with a trailing slot."""
+    out = {}
+    while len(out) < n:
+        app  = word(rng)
+        verb = rng.choice(VERBS)
+        if rng.random() < 0.15:
+            out[f"cmd_{app}"] = {"en": [f"{app} {{text}}", f"{verb} {app} {{text}}"]}
+        else:
+            out[f"cmd_{app}"] = {"en": [f"{verb} {app}", f"{verb} {app} now"]}
+    return out
+
+def misspell(text, rng):
+    words = text.split()
+    i = rng.randrange(len(words))
+    w = words[i]
+    if len(w) > 4:
+        j = rng.randrange(1, len(w) - 1)
+        words[i] = w[:j] + w[j + 1:]
+    return " ".join(words)
+
+def utterances(commands, languages, rng):
+    phrases = [p for c in commands.values() for lang in languages for p in c.get(lang, ())]
+    sample  = [p.replace("{term}", "weather in delhi").replace("{text}", "something")
+               for p in rng.sample(phrases, min(40, len(phrases)))]
+    return (sample + [misspell(p, rng) for p in sample[:20]] +
+            ["please " + p + " thanks" for p in sample[:10]] +
+            ["hello there", "uh what was i saying", "the quick brown fox", "nothing at all"])
+
+def linear_match(parsed, text):
+    """Every phrase in registration order; the first whose keywords all occur wins."""
+    words = set(tokenize(text))
+    for name, keywords in parsed:
+        if all(k in words for k in keywords):
+            return name
+    return None
+
+def main():
+    argv  = sys.argv[1:]
+    sizes = [5, 50, 500, 2000]
+    if "--sizes" in argv:
+        sizes = [int(s) for s in argv[argv.index("--sizes") + 1].split(",")]
+    lang  = argv[argv.index("--lang") + 1] if "--lang" in argv else "en-US"
+    langs = command_languages(lang)
+    rng   = random.Random(7)
+
+    print(f"{'commands':>8} {'phrases':>8} {'compile ms':>11} {'index µs':>9} "
+          f"{'linear µs':>10} {'matched':>8}")
+    for n in sizes:
+        commands = dict(BUILTIN_COMMANDS)
+        commands.update(synthetic(n, rng))
+        t0 = time.perf_counter()
+        index = CommandIndex(commands, langs)
+        compile_ms = (time.perf_counter() - t0) * 1000
+        parsed = [(name, tokenize(" ".join(w for w in p.split() if not w.startswith("{"))))
+                  for name, c in commands.items() for l in langs for p in c.get(l, ())]
+        texts = utterances(commands, langs, rng)
+        for text in texts:           # warm the fuzzy-lookup cache, as a session would
+            index.match(text)
+
+        t0 = time.perf_counter()
+        for _ in range(ROUNDS):
+            matched = sum(index.match(text) is not None for text in texts)
+        index_us = (time.perf_counter() - t0) / (ROUNDS * len(texts)) * 1e6
+        t0 = time.perf_counter()
+        for _ in range(ROUNDS):
+            for text in texts:
+                linear_match(parsed, text)
+        linear_us = (time.perf_counter() - t0) / (ROUNDS * len(texts)) * 1e6
+        print(f"{len(commands):8d} {len(index):8d} {compile_ms:11.1f} {index_us:9.1f} "
+              f"{linear_us:10.1f} {matched:5d}/{len(texts)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Startup and mode-switch latency of the warm NAC engine.
+
+    python benchmarks/bench_engine.py [rounds] [mode ...]
+
+Spawns the engine (unless one is already running), times how long it takes
+to answer, then cycles through the given modes (default: gesture eye)
+timing each switch round-trip as seen by the GUI client.
+"""
+import os
+import sys
+import time
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+from input_handlers.nac_engine import EngineClient
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    modes  = sys.argv[2:] or ["gesture", "eye"]
+    client = EngineClient()
+
+    spawned = False
+    if client.available():
+        print("engine already running; skipping startup measurement")
+    else:
+        t0 = time.perf_counter()
+        if not client.ensure_running(timeout=120):
+            print("engine did not come up")
+            return
+        spawned = True
+        print(f"startup (spawn → first answer): {(time.perf_counter() - t0) * 1000:8.1f} ms")
+    print(f"model preload inside engine:     {client.status()['preload_ms']:8.1f} ms")
+
+    switch_ms, engine_ms = [], []
+    for i in range(rounds):
+        for mode in modes:
+            t0 = time.perf_counter()
+            reply = client.start(mode)
+            switch_ms.append((time.perf_counter() - t0) * 1000)
+            if not reply.get("ok"):
+                print(f"start {mode} failed: {reply.get('error')}")
+                return
+            engine_ms.append(reply["elapsed_ms"])
+    t0 = time.perf_counter()
+    client.stop()
+    stop_ms = (time.perf_counter() - t0) * 1000
+
+    switch_ms.sort()
+    engine_ms.sort()
+    n = len(switch_ms)
+    print(f"{n} switches across {modes}")
+    print(f"  round-trip  p50 {switch_ms[n // 2]:7.1f} ms   max {switch_ms[-1]:7.1f} ms")
+    print(f"  in-engine   p50 {engine_ms[n // 2]:7.1f} ms   max {engine_ms[-1]:7.1f} ms")
+    print(f"  stop        {stop_ms:7.1f} ms")
+
+    if spawned:
+        client.shutdown()
+
+if __name__ == "__main__":
+    main()
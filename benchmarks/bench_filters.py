@@ -0,0 +1,203 @@
+"""
+Jitter and lag of the cursor filters in utils.filters.
+
+    python benchmarks/bench_filters.py TRACE.jsonl [TRACE.jsonl ...] [--latency MS]
+    python benchmarks/bench_filters.py --synthetic [--latency MS]
+
+Takes the raw cursor signals from recorded traces (right index fingertip
+for gesture, iris midpoint for eye) and runs every filter over them. The
+"true" path is estimated with a centred (zero-lag) moving average of the
+raw signal; --synthetic instead generates holds and sweeps with known
+truth plus landmark-like noise.
+
+--latency models camera + inference delay: each frame's output reaches
+the screen that long after capture (predicting filters extrapolate to
+that moment), and is judged against where the true path is by then.
+
+    jitter  RMS distance (screen px) from the true path while it is still
+    lag     perceived latency: how far (ms) the displayed cursor trails the
+            true path while it moves
+    µs      cost per update
+"""
+import os
+import sys
+import math
+import time
+import random
+
+import numpy as np
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+from utils.trace import TraceReader, hands_from_json, face_from_json
+from utils.landmarks import hands_from_result, face_from_result, gaze_point, INDEX_TIP
+from utils.filters import make_filter
+
+SCREEN      = np.array([1920.0, 1080.0])
+REF_WIN     = 7      # frames in the centred reference average
+MAX_LAG     = 0.3    # s; lags searched from -MAX_LAG/3 to MAX_LAG
+LAG_STEP    = 0.005  # s
+STILL_SPEED = 0.05   # true-path speed (screen widths/s) counted as holding still
+
+CANDIDATES = [
+    ("none",              {"x_filter": "none"}),
+    ("average 3",         {"x_filter": "average", "x_smoothing": 3}),
+    ("average 5",         {"x_filter": "average", "x_smoothing": 5}),
+    ("average 10",        {"x_filter": "average", "x_smoothing": 10}),
+    ("ema 0.5",           {"x_filter": "ema", "x_ema_alpha": 0.5}),
+    ("ema 0.3",           {"x_filter": "ema", "x_ema_alpha": 0.3}),
+    ("one_euro b=1",      {"x_filter": "one_euro", "x_beta": 1.0}),
+    ("one_euro b=5",      {"x_filter": "one_euro", "x_beta": 5.0}),
+    ("one_euro b=20",     {"x_filter": "one_euro", "x_beta": 20.0}),
+    ("one_euro mc=0.5",   {"x_filter": "one_euro", "x_min_cutoff": 0.5, "x_beta": 5.0}),
+    ("kalman cv",         {"x_filter": "kalman"}),
+    ("kalman cv q=1",     {"x_filter": "kalman", "x_process_noise": 1.0}),
+    ("kalman ca q=100",   {"x_filter": "kalman", "x_kalman_model": "acceleration",
+                           "x_process_noise": 100.0}),
+]
+
+
+# ─── Signals ───────────────────────────────────────────────────────────────
+def trace_segments(path):
+    """{"gesture"/"eye": [(t array, xy array), ...]} contiguous runs from a trace."""
+    trace = TraceReader(path)
+    out   = {"gesture": [], "eye": []}
+    runs  = {"gesture": [], "eye": []}
+
+    def close(kind):
+        if len(runs[kind]) > REF_WIN * 2:
+            t, xy = zip(*runs[kind])
+            out[kind].append((np.array(t), np.array(xy)))
+        runs[kind] = []
+
+    for rec in trace.records:
+        right = [h for label, h in hands_from_result(hands_from_json(rec.get("hands")))
+                 if label == "Right"]
+        if right:
+            runs["gesture"].append((rec["t"], [right[0][INDEX_TIP].x, right[0][INDEX_TIP].y]))
+        else:
+            close("gesture")
+        iris = face_from_result(face_from_json(rec.get("face")))
+        if iris is not None:
+            runs["eye"].append((rec["t"], list(gaze_point(iris))))
+        else:
+            close("eye")
+    close("gesture")
+    close("eye")
+    return out
+
+def centred_average(xy, win=REF_WIN):
+    pad    = win // 2
+    padded = np.pad(xy, ((pad, pad), (0, 0)), mode="edge")
+    kernel = np.ones(win) / win
+    return np.stack([np.convolve(padded[:, i], kernel, mode="valid") for i in range(2)], 1)
+
+def synthetic(frames=1800, fps=30.0, noise=0.003, seed=1):
+    """Holds and eased sweeps between random targets; returns (t, noisy xy, true xy)."""
+    rng   = random.Random(seed)
+    t     = np.arange(frames) / fps
+    truth = np.empty((frames, 2))
+    pos   = np.array([0.5, 0.5])
+    i = 0
+    while i < frames:
+        hold = rng.randint(15, 45)
+        truth[i:i + hold] = pos
+        i += hold
+        target = np.array([rng.uniform(0.1, 0.9), rng.uniform(0.1, 0.9)])
+        sweep  = rng.randint(8, 30)
+        for k in range(1, sweep + 1):
+            if i >= frames:
+                break
+            truth[i] = pos + (target - pos) * (1 - math.cos(math.pi * k / sweep)) / 2
+            i += 1
+        pos = target
+    noisy = truth + np.random.default_rng(seed).normal(0.0, noise, truth.shape)
+    return t, noisy, truth
+
+
+# ─── Measurement ───────────────────────────────────────────────────────────
+def apply(settings, t, xy, latency):
+    """Displayed positions: filtered at capture, predicted to capture + latency."""
+    filt = make_filter(settings, "x")
+    out  = np.empty_like(xy)
+    t0   = time.perf_counter()
+    for i, ((x, y), ti) in enumerate(zip(xy.tolist(), t.tolist())):
+        out[i] = filt(x, y, ti)
+        if filt.predicts:
+            out[i] = filt.predict(ti + latency)
+    return out, (time.perf_counter() - t0) / len(xy) * 1e6
+
+def truth_at(t, truth, when):
+    return np.stack([np.interp(when, t, truth[:, i]) for i in range(2)], 1)
+
+def lag_and_jitter(t, shown, truth, latency):
+    """(perceived lag in ms over moving frames, RMS px over still frames); NaN if none."""
+    shown_at = t + latency
+    target   = truth_at(t, truth, shown_at)
+    speed    = np.hypot(*np.gradient(truth, t, axis=0).T)
+    still    = np.interp(shown_at, t, speed) < STILL_SPEED
+    d        = (shown - target)[still] * SCREEN
+    jitter   = math.sqrt(float(np.mean(np.sum(d * d, axis=1)))) if still.any() else math.nan
+    # ignore frames whose shifted target would fall outside the segment
+    moving   = ~still & (shown_at - MAX_LAG >= t[0]) & (shown_at + MAX_LAG / 3 <= t[-1])
+    if not moving.any():
+        return math.nan, jitter
+
+    lag, best = math.nan, math.inf
+    for shift in np.arange(-MAX_LAG / 3, MAX_LAG + LAG_STEP / 2, LAG_STEP):
+        ref = truth_at(t, truth, shown_at[moving] - shift)
+        err = float(np.mean(np.hypot(*((shown[moving] - ref) * SCREEN).T)))
+        if err < best:
+            lag, best = shift * 1000, err
+    return lag, jitter
+
+def weighted(values, weights):
+    """Frame-weighted mean over segments, ignoring NaNs."""
+    ok = ~np.isnan(values)
+    return float(np.average(values[ok], weights=weights[ok])) if ok.any() else math.nan
+
+def evaluate(name, segments, latency):
+    """segments: [(t, raw xy, reference xy)]"""
+    if not segments:
+        return
+    frames = sum(len(t) for t, _, _ in segments)
+    dt     = float(np.median(np.concatenate([np.diff(t) for t, _, _ in segments])))
+    print(f"\n{name}: {len(segments)} segment(s), {frames} frames, {1 / dt:.1f} fps, "
+          f"{latency * 1000:.0f} ms capture-to-screen")
+    print(f"{'filter':<18} {'jitter px':>10} {'lag ms':>8} {'µs':>7}")
+    for label, settings in CANDIDATES:
+        rows = []
+        for t, raw, ref in segments:
+            shown, cost = apply(settings, t, raw, latency)
+            rows.append((*lag_and_jitter(t, shown, ref, latency), cost, len(t)))
+        lag, jitter, cost, n = (np.array(c, dtype=float) for c in zip(*rows))
+        print(f"{label:<18} {weighted(jitter, n):10.2f} {weighted(lag, n):8.1f} "
+              f"{weighted(cost, n):7.2f}")
+
+def main():
+    argv = sys.argv[1:]
+    if not argv:
+        print(__doc__)
+        return
+    latency = 0.0
+    if "--latency" in argv:
+        i = argv.index("--latency")
+        latency = float(argv[i + 1]) / 1000
+        del argv[i:i + 2]
+    if "--synthetic" in argv:
+        t, noisy, truth = synthetic()
+        evaluate("synthetic", [(t, noisy, truth)], latency)
+        return
+    gathered = {"gesture": [], "eye": []}
+    for path in argv:
+        for kind, segs in trace_segments(path).items():
+            gathered[kind] += [(t, xy, centred_average(xy)) for t, xy in segs]
+    for kind, segs in gathered.items():
+        evaluate(kind, segs, latency)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+CPU use and wake-up latency of the frame-rate governor (utils.governor).
+
+    python benchmarks/bench_governor.py TRACE.jsonl [--stream hands|face]
+                                        [--cost MS] [--live] [--budget CORES]
+
+Plays the trace back in real time through a FrameProducer, once with the
+governor disabled (every frame processed) and once with the profile's
+idle settings, and reports for each run the frames processed, the
+loop's duty cycle, the process CPU use (cores) and the wake-up latency:
+how long after a hand/face reappears in the trace (the moment its first
+frame is captured) the loop reports it.
+
+Without --live, inference is the recorded landmarks plus a CPU spin of
+--cost ms per frame (default 15) standing in for the model; with --live
+the MediaPipe model runs on the recorded video. Pick a trace with
+stretches where nobody is in frame.
+"""
+import os
+import sys
+import time
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+from config.profile_manager import get_profile
+from utils.camera import FrameProducer
+from utils.governor import FrameGovernor
+from utils.trace import TraceReader, ReplayCapture, ReplayHands, ReplayFaceMesh
+
+
+class MarkedCapture(ReplayCapture):
+    """Real-time ReplayCapture noting when each reappearance of `stream` is captured."""
+
+    def __init__(self, trace, stream):
+        super().__init__(trace, realtime=True)
+        self.stream   = stream
+        self.present  = False
+        self.appeared = []     # monotonic capture times of reappearances
+        self.done     = False
+
+    def read(self, image=None):
+        ok, frame = super().read(image)
+        if not ok:
+            self.done = True
+            return ok, frame
+        here = bool(self.current.get(self.stream))
+        if here and not self.present:
+            self.appeared.append(time.monotonic())
+        self.present = here
+        return ok, frame
+
+
+def spin(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+def make_model(stream, capture, live):
+    if not live:
+        return ReplayHands(capture) if stream == "hands" else ReplayFaceMesh(capture)
+    import mediapipe as mp
+    if stream == "hands":
+        return mp.solutions.hands.Hands(max_num_hands=2, min_detection_confidence=0.7,
+                                        min_tracking_confidence=0.7)
+    return mp.solutions.face_mesh.FaceMesh(refine_landmarks=True)
+
+def run(trace, stream, settings, cost, live):
+    """One real-time pass; returns (governor stats, [wake latencies in s])."""
+    capture  = MarkedCapture(trace, stream)
+    model    = make_model(stream, capture, live)
+    camera   = FrameProducer(capture).start()
+    frames   = camera.subscribe()
+    governor = FrameGovernor().configure(settings)
+    present  = False
+    wakes    = []
+    while not capture.done:
+        governor.wait()
+        frame = frames.read()
+        if frame is None:
+            continue
+        res = model.process(frame.rgb)
+        if not live:
+            spin(cost)
+        found = bool(res.multi_hand_landmarks if stream == "hands" else res.multi_face_landmarks)
+        if found and not present and capture.appeared:
+            wakes.append(time.monotonic() - capture.appeared[-1])
+        present = found
+        governor.update(found, frame.timestamp)
+    camera.stop()
+    return governor.stats(), wakes
+
+def option(argv, flag, default=None):
+    if flag in argv:
+        i = argv.index(flag)
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return default
+
+def main():
+    argv = sys.argv[1:]
+    if not argv or argv[0].startswith("--"):
+        print(__doc__)
+        return
+    trace   = TraceReader(argv[0])
+    stream  = option(argv, "--stream", "hands" if "hands" in trace.streams else "face")
+    cost    = float(option(argv, "--cost", 15))
+    live    = "--live" in argv
+    profile = dict(get_profile("default"))
+    if option(argv, "--budget") is not None:
+        profile["cpu_budget"] = float(option(argv, "--budget"))
+    present = sum(bool(r.get(stream)) for r in trace.records)
+    print(f"{argv[0]}: {trace.duration:.1f} s, {len(trace)} frames, "
+          f"{stream} present in {present}; inference "
+          f"{'live' if live else f'replayed + {cost:.0f} ms spin'}")
+
+    print(f"{'run':<10} {'frames':>7} {'duty':>6} {'cpu':>6} {'idle':>6} "
+          f"{'wakes':>6} {'wake ms mean':>13} {'max':>7}")
+    for name, settings in (("ungoverned", dict(profile, idle_after_frames=0, cpu_budget=0)),
+                           ("governed", profile)):
+        stats, wakes = run(trace, stream, settings, cost, live)
+        mean = sum(wakes) / len(wakes) * 1000 if wakes else 0.0
+        print(f"{name:<10} {stats['frames']:7d} {stats['duty']:6.2f} {stats['cpu']:6.2f} "
+              f"{stats['idle']:6.2f} {len(wakes):6d} {mean:13.1f} "
+              f"{max(wakes, default=0) * 1000:7.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Per-frame cost of the landmark geometry: the previous point-by-point
+Python helpers against utils.landmarks.
+
+    python benchmarks/bench_landmarks.py [frames]
+
+Uses real MediaPipe landmark protobufs when mediapipe is installed (the
+type the modules actually see), otherwise the replay stand-ins from
+utils.trace.
+"""
+import os
+import sys
+import math
+import time
+import random
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+from utils.trace import hands_from_json, face_from_json
+from utils.landmarks import (
+    hands_from_result, face_from_result, gaze_point, calibration, normalize,
+    tip_distances, fingers_extended, THUMB_TIP, INDEX_TIP, MIDDLE_TIP,
+)
+
+CAM_W, CAM_H = 640, 480
+BOUNDS       = ((0.35, 0.40), (0.65, 0.60))
+CALIBRATION  = calibration(*BOUNDS)
+ROUNDS       = 7
+
+
+def random_points(n):
+    return [[random.random(), random.random(), random.random() * 0.1] for _ in range(n)]
+
+def make_results(frames):
+    """Hands (one right, one left) and face results for `frames` frames."""
+    hands, faces = [], []
+    for _ in range(frames):
+        hands.append(hands_from_json([
+            {"label": "Right", "score": 0.99, "landmarks": random_points(21)},
+            {"label": "Left",  "score": 0.99, "landmarks": random_points(21)},
+        ]))
+        faces.append(face_from_json(random_points(478)))
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+    except ImportError:
+        return hands, faces, "replay stand-ins"
+
+    def proto(lms):
+        out = landmark_pb2.NormalizedLandmarkList()
+        for p in lms.landmark:
+            out.landmark.add(x=p.x, y=p.y, z=p.z)
+        return out
+    for h in hands:
+        h.multi_hand_landmarks = [proto(l) for l in h.multi_hand_landmarks]
+    for f in faces:
+        f.multi_face_landmarks = [proto(l) for l in f.multi_face_landmarks]
+    return hands, faces, "mediapipe protobufs"
+
+
+# ─── Previous implementation, kept here for comparison ─────────────────────
+LEFT_IRIS  = [474, 475, 476, 477]
+RIGHT_IRIS = [469, 470, 471, 472]
+
+def legacy_iris_center(lms, idxs, w, h):
+    xs = [lms[i].x * w for i in idxs]
+    ys = [lms[i].y * h for i in idxs]
+    return sum(xs)/len(xs), sum(ys)/len(ys)
+
+def legacy_is_pinch(lm1, lm2, cam_w, cam_h, threshold) -> bool:
+    x1, y1 = lm1.x * cam_w, lm1.y * cam_h
+    x2, y2 = lm2.x * cam_w, lm2.y * cam_h
+    return math.hypot(x2 - x1, y2 - y1) < threshold
+
+def legacy_fingers_extended(lms, cam_h) -> bool:
+    return (
+        lms[8].y * cam_h < lms[6].y * cam_h and
+        lms[12].y * cam_h < lms[10].y * cam_h
+    )
+
+def legacy_hands(result):
+    out = []
+    for idx, hand_hm in enumerate(result.multi_handedness):
+        lms = result.multi_hand_landmarks[idx].landmark
+        if hand_hm.classification[0].label == "Right":
+            out.append((lms[8].x * 1920, lms[8].y * 1080))
+        else:
+            out.append((legacy_is_pinch(lms[4], lms[8], CAM_W, CAM_H, 30),
+                        legacy_is_pinch(lms[4], lms[12], CAM_W, CAM_H, 30),
+                        legacy_fingers_extended(lms, CAM_H)))
+    return out
+
+def legacy_eye(result):
+    lm = result.multi_face_landmarks[0].landmark
+    lx, ly = legacy_iris_center(lm, LEFT_IRIS, CAM_W, CAM_H)
+    rx, ry = legacy_iris_center(lm, RIGHT_IRIS, CAM_W, CAM_H)
+    nx, ny = (lx+rx)/2/CAM_W, (ly+ry)/2/CAM_H
+    (x0, y0), (x1, y1) = BOUNDS
+    nx, ny = (nx - x0)/(x1 - x0), (ny - y0)/(y1 - y0)
+    return max(0, min(nx, 1)), max(0, min(ny, 1))
+
+
+# ─── Array implementation ──────────────────────────────────────────────────
+def compact_hands(result):
+    out = []
+    for label, hand in hands_from_result(result):
+        if label == "Right":
+            out.append((hand[INDEX_TIP].x * 1920, hand[INDEX_TIP].y * 1080))
+        else:
+            d = tip_distances(hand, THUMB_TIP, (INDEX_TIP, MIDDLE_TIP), (CAM_W, CAM_H))
+            out.append((d[0] < 30, d[1] < 30, fingers_extended(hand)))
+    return out
+
+def compact_eye(result):
+    return normalize(gaze_point(face_from_result(result)), CALIBRATION)
+
+
+def bench(fn, results, rounds=ROUNDS):
+    """µs per frame, best of `rounds` passes (the differences are small)."""
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for r in results:
+            fn(r)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(results) * 1e6
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    hands, faces, kind = make_results(frames)
+    print(f"{frames} frames of {kind}; µs per frame")
+    print(f"{'':<8} {'legacy':>9} {'compact':>9}")
+    for name, results, legacy, compact in (
+        ("gesture", hands, legacy_hands, compact_hands),
+        ("eye",     faces, legacy_eye,   compact_eye),
+    ):
+        bench(legacy, results[:100], 1); bench(compact, results[:100], 1)   # warm up
+        print(f"{name:<8} {bench(legacy, results):9.2f} {bench(compact, results):9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Stress benchmark for utils.logger: time what a vision loop pays per
+log_event() call, against the old open-append-close-per-call writer.
+
+    python benchmarks/bench_logger.py [calls]
+"""
+import os
+import sys
+import json
+import time
+import datetime
+import tempfile
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+import utils.logger as logger
+
+def legacy_log_event(event_type, details):
+    """The previous synchronous implementation, kept here for comparison."""
+    os.makedirs(logger.LOG_DIR, exist_ok=True)
+    if not os.path.isfile(logger.LOG_FILE):
+        open(logger.LOG_FILE, "w").close()
+    entry = {
+        "timestamp": datetime.datetime.now().isoformat(),
+        "event": event_type,
+        "details": details
+    }
+    with open(logger.LOG_FILE, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def percentile(sorted_vals, q):
+    return sorted_vals[int(q * (len(sorted_vals) - 1))]
+
+def run(fn, calls):
+    times = []
+    for i in range(calls):
+        t0 = time.perf_counter()
+        fn("gesture_scroll", str(i))
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return {
+        "p50_us": percentile(times, 0.50) * 1e6,
+        "p99_us": percentile(times, 0.99) * 1e6,
+        "max_us": times[-1] * 1e6,
+        "total_ms": sum(times) * 1e3,
+    }
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    tmp = tempfile.mkdtemp(prefix="nac_bench_log_")
+    logger.LOG_DIR  = tmp
+    logger.LOG_FILE = os.path.join(tmp, "nac_events.log")
+
+    results = {"legacy": run(legacy_log_event, calls)}
+    os.remove(logger.LOG_FILE)
+    results["async"] = run(logger.log_event, calls)
+    t0 = time.perf_counter()
+    logger.flush()
+    flush_ms = (time.perf_counter() - t0) * 1e3
+
+    print(f"{calls} calls per writer (log dir {tmp})")
+    for name, r in results.items():
+        print(f"  {name:7s} p50 {r['p50_us']:8.1f} us   p99 {r['p99_us']:8.1f} us   "
+              f"max {r['max_us']:9.1f} us   total {r['total_ms']:8.1f} ms")
+    print(f"  final async flush: {flush_ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
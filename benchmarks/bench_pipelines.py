@@ -0,0 +1,427 @@
+"""
+Offline benchmark of the vision pipelines on a recorded trace.
+
+    python benchmarks/bench_pipelines.py TRACE.jsonl [--mode gesture|eye|both]
+                                         [--live] [--roi] [--latency MS]
+                                         [--save OUT.json] [--baseline OUT.json]
+    python benchmarks/bench_pipelines.py TRACE.jsonl --workers threads|processes|both [--roi]
+
+Record a trace first with e.g. `python input_handlers/gesture_module.py
+--record session.jsonl`. The trace is replayed as fast as possible through
+the same per-frame code the modules run, with cursor output going to a
+RecordingBackend (utils.output) instead of the real pointer, so no X
+server is needed. Reports throughput, per-stage latency and the cursor
+motion produced:
+
+    capture    next frame from the trace (decoding the companion video)
+    convert    mirror + BGR→RGB, as FrameProducer does
+    inference  landmarks: the recorded ones, or the real MediaPipe models
+               run on the recorded video with --live
+    logic      gesture/eye code turning landmarks into cursor actions
+    dispatch   draining the event bus (--mode both only)
+
+--roi runs the models behind utils.roi trackers (crops around the last
+landmarks). With --live this times real inference on the crops, which
+run on separate video-mode models (utils.roi.create_crop_model); on
+replayed landmarks the recorded points are re-expressed in each crop
+(and dropped if they fall outside it), which checks the tracking and
+coordinate mapping: compare against a --baseline saved without --roi.
+
+--latency MS treats each frame as handled that long after capture, so
+predicting filters (Kalman) extrapolate over it; bench_filters.py
+measures the resulting perceived lag on the same traces.
+
+--save writes the per-frame cursor output; --baseline compares this run
+against one saved earlier (e.g. before a change to the smoothing code).
+
+--workers compares hybrid mode's two execution modes on the recorded
+video, played back at its recorded pace through a FrameProducer: Hands and
+FaceMesh in threads of one process (combined_module's default) or in
+input_handlers.vision_workers processes fed through shared memory. Both
+run the real MediaPipe models with the default profile's roi_* and
+governor keys (--roi turns ROI tracking on), and report per pipeline the
+results delivered, their rate and the capture-to-result latency.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+from utils.trace import TraceReader, ReplayCapture, ReplayHands, ReplayFaceMesh
+from utils.output import RecordingBackend, set_output
+from utils.landmarks import hands_from_result, face_from_result, gaze_point
+from utils.filters import make_filter
+from utils.roi import RoiTracker
+from utils.camera import FrameProducer
+from utils.governor import FrameGovernor
+from config.profile_manager import get_profile
+
+SCREEN_SIZE = (1920, 1080)
+STAGES      = ("capture", "convert", "inference", "logic", "dispatch")
+
+
+# ─── Captured cursor output ────────────────────────────────────────────────
+def moves(out):
+    return [v for _, _, k, v in out.actions if k == "move"]
+
+def per_frame(out) -> dict:
+    """frame → last cursor position, plus click/scroll actions."""
+    frames = {}
+    for _, f, kind, value in out.actions:
+        rec = frames.setdefault(str(f), {})
+        if kind == "move":
+            rec["pos"] = list(value)
+        else:
+            rec.setdefault(kind, []).append(value)
+    return frames
+
+
+# ─── Models ────────────────────────────────────────────────────────────────
+TRACKERS = {}   # "hands"/"face" → RoiTracker, with --roi
+
+class CroppedReplay:
+    """
+    Replayed landmarks as a model would report them for an RoiTracker's
+    crop: re-expressed relative to the crop, keeping only targets whose
+    centre lies inside it. Full-frame calls get the recording unchanged.
+    """
+
+    def __init__(self, model, kind, tracker, frame_size):
+        self.model      = model
+        self.kind       = kind
+        self.tracker    = tracker
+        self.frame_size = tuple(frame_size)
+
+    def process(self, rgb):
+        result = self.model.process(rgb)
+        box    = self.tracker.box
+        if box is None or (rgb.shape[1], rgb.shape[0]) == self.frame_size:
+            return result
+        (w, h), (x0, y0, x1, y1) = self.frame_size, box
+        cw, ch = x1 - x0, y1 - y0
+        lists  = (result.multi_hand_landmarks if self.kind == "hands"
+                  else result.multi_face_landmarks) or []
+        keep   = []
+        for i, lms in enumerate(lists):
+            pts = lms.landmark
+            cx  = sum(p.x for p in pts) / len(pts) * w
+            cy  = sum(p.y for p in pts) / len(pts) * h
+            if x0 <= cx < x1 and y0 <= cy < y1:
+                for p in pts:
+                    p.x = (p.x * w - x0) / cw
+                    p.y = (p.y * h - y0) / ch
+                    p.z = p.z * w / cw
+                keep.append(i)
+        if self.kind == "hands":
+            result.multi_hand_landmarks = [lists[i] for i in keep] or None
+            result.multi_handedness     = [result.multi_handedness[i] for i in keep] or None
+        else:
+            result.multi_face_landmarks = [lists[i] for i in keep] or None
+        return result
+
+def pick_model(kind, live_model, capture, roi):
+    """`live_model`, or the trace's landmarks if None; behind an RoiTracker with --roi."""
+    if live_model is not None:
+        model = live_model
+    else:
+        model = ReplayHands(capture) if kind == "hands" else ReplayFaceMesh(capture)
+    if not roi:
+        return model
+    # live crops go to the tracker's own crop model, as in the modules
+    crops   = None if live_model is not None else (lambda: replay)
+    tracker = TRACKERS[kind] = RoiTracker(kind, crops).configure({"roi_tracking": True})
+    if live_model is None:
+        replay = CroppedReplay(model, kind, tracker, capture.trace.frame_size)
+    return SimpleNamespace(process=lambda rgb: tracker.process(model, rgb))
+
+
+# ─── Per-mode frame handlers ───────────────────────────────────────────────
+def gesture_step(live, capture, latency, roi):
+    from input_handlers import gesture_module as gm
+    model = pick_model("hands", gm.hands if live else None, capture, roi)
+    w, h  = capture.trace.frame_size
+
+    def step(rgb, t, timer):
+        res = timer("inference", model.process, rgb)
+        timer("logic", gm.process_hands, res, w, h, None, t, t + latency)
+    return step
+
+def eye_step(live, capture, latency, roi):
+    from input_handlers import eye_module as em
+    model     = pick_model("face", em.face_mesh if live else None, capture, roi)
+    smoother  = make_filter(em.settings, "eye")
+
+    def step(rgb, t, timer):
+        res = timer("inference", model.process, rgb)
+        timer("logic", em.track_gaze, res, smoother, None, t, t + latency)
+    return step
+
+def both_step(live, capture, latency, roi):
+    from input_handlers import combined_module as cm
+    hands     = pick_model("hands", cm.get_model("hands") if live else None, capture, roi)
+    mesh      = pick_model("face", cm.get_model("face") if live else None, capture, roi)
+    state     = {"last_click": 0.0}
+    eye_state = {}
+
+    def logic(hres, fres, t):
+        cm.publish_hands(hands_from_result(hres), state, now=t + latency, t=t)
+        iris = face_from_result(fres)
+        if iris is not None:
+            nx, ny = gaze_point(iris)
+            cm.publish_gaze(nx, ny, eye_state, t, t + latency)
+
+    def dispatch():
+        while cm.event_q.qsize():
+            src, evt = cm.event_q.get(timeout=0)
+            cm.dispatch_event(src, evt)
+
+    def step(rgb, t, timer):
+        hres = timer("inference", hands.process, rgb)
+        fres = timer("inference", mesh.process, rgb)
+        timer("logic", logic, hres, fres, t)
+        timer("dispatch", dispatch)
+    return step
+
+STEPS = {"gesture": gesture_step, "eye": eye_step, "both": both_step}
+
+
+# ─── Replay loop ───────────────────────────────────────────────────────────
+def run(trace, mode, live, out, latency=0.0, roi=False):
+    capture = ReplayCapture(trace)
+    step    = STEPS[mode](live, capture, latency, roi)
+    times   = {s: [] for s in STAGES}
+    frame_t = {}
+
+    def timer(stage, fn, *args):
+        t0  = time.perf_counter()
+        out = fn(*args)
+        frame_t[stage] = frame_t.get(stage, 0.0) + time.perf_counter() - t0
+        return out
+
+    w, h = trace.frame_size
+    bgr  = np.empty((h, w, 3), dtype=np.uint8)
+    rgb  = np.empty((h, w, 3), dtype=np.uint8)
+    n    = 0
+    t0   = time.perf_counter()
+    while True:
+        frame_t.clear()
+        ok, raw = timer("capture", capture.read)
+        if not ok:
+            break
+        if raw.shape != bgr.shape:
+            bgr, rgb = np.empty_like(raw), np.empty_like(raw)
+
+        def convert():
+            cv2.flip(raw, 1, dst=bgr)
+            cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=rgb)
+        timer("convert", convert)
+
+        out.tag = n
+        step(rgb, capture.current["t"], timer)
+        for stage, secs in frame_t.items():
+            times[stage].append(secs * 1000)
+        n += 1
+    capture.release()
+    return n, time.perf_counter() - t0, times
+
+
+# ─── Threads vs worker processes (--workers) ───────────────────────────────
+def thread_pipelines(camera, settings, stop, report):
+    """Start Hands and FaceMesh threads reading `camera`, as in combined_module's thread mode."""
+    from input_handlers import combined_module as cm
+
+    def pipeline(src, kind, found):
+        model  = cm.get_model(kind)
+        roi    = RoiTracker(kind, lambda: cm.get_model(kind + "_crop")).configure(settings)
+        gov    = FrameGovernor().configure(settings)
+        frames = camera.subscribe()
+        while gov.wait(stop):
+            frame = frames.read()
+            if frame is None:
+                continue
+            res = roi.process(model, frame.rgb)
+            gov.update(bool(found(res)), frame.timestamp)
+            report(src, frame.timestamp)
+
+    # models are built up front, so start-up does not eat into the replay
+    cm.get_model("hands")
+    cm.get_model("face")
+    threads = [threading.Thread(target=pipeline, args=("gesture", "hands", hands_from_result), daemon=True),
+               threading.Thread(target=pipeline, args=("eye", "face", face_from_result), daemon=True)]
+    for t in threads:
+        t.start()
+    return threads
+
+def run_workers(trace, workers, settings) -> dict:
+    """Replay `trace` in real time through "threads" or "processes"; per-pipeline results."""
+    from input_handlers.vision_workers import VisionWorkerPool
+    capture = ReplayCapture(trace, realtime=True)
+    camera  = FrameProducer(capture, shared=(workers == "processes")).start()
+    stop    = threading.Event()
+    results = {"gesture": [], "eye": []}   # (arrival time, capture-to-result ms)
+    last    = trace.records[-1]
+
+    def report(src, ts):
+        now = time.monotonic()
+        results[src].append((now, (now - ts) * 1000))
+
+    if workers == "threads":
+        threads = thread_pipelines(camera, settings, stop, report)
+        while capture.current is not last:
+            time.sleep(0.05)
+        stop.set()
+        for t in threads:
+            t.join(timeout=2.0)
+    else:
+        pool = VisionWorkerPool(camera, settings)
+        pool.start()
+        while capture.current is not last:
+            result = pool.get(timeout=0.1)
+            if result is not None:
+                report(result.source, result.timestamp)
+        pool.stop()
+    camera.stop()
+    return results
+
+def worker_summary(results) -> dict:
+    """Result count, rate (first to last result, so start-up is left out) and latency."""
+    n    = len(results)
+    span = results[-1][0] - results[0][0] if n > 1 else 0.0
+    lat  = [ms for _, ms in results]
+    return {
+        "results": n,
+        "fps":     (n - 1) / span if span > 0 else 0.0,
+        "mean_ms": float(np.mean(lat)) if lat else 0.0,
+        "p95_ms":  float(percentile(lat, 0.95)),
+    }
+
+def compare_workers(path, trace, workers, roi):
+    settings = dict(get_profile("default"))
+    if roi:
+        settings["roi_tracking"] = True
+    print(f"{path}: {len(trace.records)} frames, {trace.duration:.1f} s recorded, "
+          f"replayed in real time, roi={'on' if settings.get('roi_tracking') else 'off'}")
+    print(f"{'workers':<10} {'pipeline':<9} {'results':>8} {'fps':>7} {'mean ms':>9} {'p95 ms':>9}")
+    for kind in (("threads", "processes") if workers == "both" else (workers,)):
+        for src, results in run_workers(trace, kind, settings).items():
+            s = worker_summary(results)
+            print(f"{kind:<10} {src:<9} {s['results']:8d} {s['fps']:7.1f} "
+                  f"{s['mean_ms']:9.2f} {s['p95_ms']:9.2f}")
+
+
+# ─── Reporting ─────────────────────────────────────────────────────────────
+def percentile(values, q):
+    if not values:
+        return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+def cursor_summary(out) -> dict:
+    pts   = moves(out)
+    steps = [np.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(pts, pts[1:])]
+    counts = out.stats()
+    return {
+        "moves":       counts["move"],
+        "clicks":      counts["click"],
+        "scrolls":     counts["scroll"],
+        "mean_step":   float(np.mean(steps)) if steps else 0.0,
+        "p95_step":    float(percentile(steps, 0.95)),
+        "path_length": float(np.sum(steps)) if steps else 0.0,
+    }
+
+def compare(current, baseline) -> dict:
+    """Per-frame cursor position differences against a saved run."""
+    diffs, only_one = [], 0
+    for f in set(current) | set(baseline):
+        a = current.get(f, {}).get("pos")
+        b = baseline.get(f, {}).get("pos")
+        if a and b:
+            diffs.append(np.hypot(a[0] - b[0], a[1] - b[1]))
+        elif a or b:
+            only_one += 1
+    actions = lambda run, k: sum(len(r.get(k, [])) for r in run.values())
+    return {
+        "frames_compared": len(diffs),
+        "mean_delta_px":   float(np.mean(diffs)) if diffs else 0.0,
+        "max_delta_px":    float(np.max(diffs)) if diffs else 0.0,
+        "moved_in_one":    only_one,
+        "click_delta":     actions(current, "click") - actions(baseline, "click"),
+        "scroll_delta":    actions(current, "scroll") - actions(baseline, "scroll"),
+    }
+
+def option(argv, flag, default=None):
+    if flag in argv:
+        i = argv.index(flag)
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return default
+
+def main():
+    argv = sys.argv[1:]
+    if not argv or argv[0].startswith("--"):
+        print(__doc__)
+        return
+    trace    = TraceReader(argv[0])
+    workers  = option(argv, "--workers")
+    if workers:
+        if workers not in ("threads", "processes", "both"):
+            print(__doc__)
+            return
+        compare_workers(argv[0], trace, workers, "--roi" in argv)
+        return
+    mode     = option(argv, "--mode", "both" if len(trace.streams) > 1 else
+                      ("eye" if trace.streams == ["face"] else "gesture"))
+    live     = "--live" in argv
+    roi      = "--roi" in argv
+    latency  = float(option(argv, "--latency", 0)) / 1000
+    out      = RecordingBackend(SCREEN_SIZE)
+    set_output(out)
+
+    n, elapsed, times = run(trace, mode, live, out, latency, roi)
+    print(f"{argv[0]}: {n} frames, {trace.duration:.1f} s recorded, "
+          f"mode={mode}, inference={'live' if live else 'replayed'}")
+    print(f"throughput: {n / elapsed if elapsed else 0:8.1f} fps "
+          f"({trace.duration and n / trace.duration:.1f} fps recorded)")
+    print(f"{'stage':<10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for stage in STAGES:
+        t = times[stage]
+        if t:
+            print(f"{stage:<10} {np.mean(t):9.3f} {percentile(t, 0.95):9.3f} {max(t):9.3f}")
+
+    summary = cursor_summary(out)
+    print("cursor: " + ", ".join(f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+                                 for k, v in summary.items()))
+    for kind, tracker in TRACKERS.items():
+        print(f"roi {kind}: " + ", ".join(f"{k}={v}" for k, v in tracker.stats().items()))
+
+    outputs = per_frame(out)
+    baseline_path = option(argv, "--baseline")
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get("mode") != mode:
+            print(f"warning: baseline was recorded in mode {baseline.get('mode')}")
+        delta = compare(outputs, baseline["frames"])
+        print("vs baseline: " + ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                                          for k, v in delta.items()))
+
+    save_path = option(argv, "--save")
+    if save_path:
+        with open(save_path, "w") as f:
+            json.dump({"trace": argv[0], "mode": mode, "live": live,
+                       "summary": summary, "frames": outputs}, f)
+        print(f"cursor output saved to {save_path}")
+
+if __name__ == "__main__":
+    main()
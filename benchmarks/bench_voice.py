@@ -0,0 +1,108 @@
+"""
+Time-to-command of the speech engines (utils.speech) on recorded WAVs.
+
+    python benchmarks/bench_voice.py WAV [WAV ...] [--engine auto|vosk|google]
+                                     [--expect PHRASE] [--realtime] [--wake]
+
+Each file is played through a WavSource into a SpeechListener, exactly
+as the voice modules listen to the microphone. A command "fires" on the
+first hypothesis containing PHRASE (with --expect), else on the first
+final one; partial hypotheses count, so a streaming engine can fire
+before the speaker has finished. Reported per file:
+
+    onset / end   first and last speech chunk of the utterance (s of audio)
+    fired         audio position when the command fired
+    after end     fired − end, plus the recognizer time of that step (ms);
+                  negative when it fired while the speaker was still talking
+    rtf           recognizer time per second of audio
+
+With --realtime the audio is paced as if recorded live and "after end"
+is measured on the wall clock instead. With --wake the file goes through
+the hybrid thread's wake-word gate (utils.wakeword) and "awake" is the
+share of the audio the full recognizer had to decode; say the wake
+phrase before the command. Files must be 16-bit PCM; speak
+one command per file with a little silence around it.
+"""
+import os
+import sys
+import time
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+from config.profile_manager import get_profile
+from utils.speech import WavSource, create_listener
+from utils.wakeword import create_wake_listener
+
+
+def run(path, settings, expect, realtime, wake):
+    """One file; returns (fired Hypothesis or None, lag after it in s, final end, stats)."""
+    source   = WavSource(path, realtime=realtime)
+    if wake:
+        # the whole file fits in the ring even when read faster than real time
+        settings = dict(settings, audio_buffer=source.duration + 1.0)
+        listener = create_wake_listener(settings, source=source)
+    else:
+        listener = create_listener(settings, source=source)
+    fired, lag, end = None, 0.0, None
+    start = time.monotonic()
+    step  = time.perf_counter()
+    for hyp in listener.hypotheses():
+        now = time.perf_counter()
+        if fired is None and (expect in hyp.text if expect else hyp.final):
+            fired = hyp
+            # wall time behind the audio: pacing lag live, else this step's decoding
+            lag = (time.monotonic() - start - hyp.t) if realtime else now - step
+        if hyp.final and end is None:
+            end = hyp.end
+        step = time.perf_counter()
+    listener.close()
+    return fired, lag, end, listener.stats()
+
+def option(argv, flag, default=None):
+    if flag in argv:
+        i = argv.index(flag)
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return default
+
+def main():
+    argv = sys.argv[1:]
+    files = [a for i, a in enumerate(argv)
+             if not a.startswith("--") and (i == 0 or argv[i - 1] not in ("--engine", "--expect"))]
+    if not files:
+        print(__doc__)
+        return
+    settings = dict(get_profile("default"))
+    if option(argv, "--engine"):
+        settings["speech_engine"] = option(argv, "--engine")
+    expect   = (option(argv, "--expect") or "").lower()
+    realtime = "--realtime" in argv
+    wake     = "--wake" in argv
+
+    print(f"{'file':<24} {'onset':>6} {'end':>6} {'fired':>6} {'after end':>10} "
+          f"{'rtf':>6} {'awake':>6}  text")
+    delays = []
+    for path in files:
+        fired, lag, end, stats = run(path, settings, expect, realtime, wake)
+        name  = os.path.basename(path)[:24]
+        rtf   = stats["recognizer"]["rtf"] if "recognizer" in stats else stats["rtf"]
+        awake = stats.get("awake_share", 1.0)
+        if fired is None:
+            print(f"{name:<24} {'':>6} {'':>6} {'-':>6} {'-':>10} {rtf:6.3f} {awake:6.2f}  "
+                  f"(no command)")
+            continue
+        end   = end if end is not None else fired.end
+        delay = (fired.t - end + lag) * 1000
+        delays.append(delay)
+        print(f"{name:<24} {fired.onset:6.2f} {end:6.2f} {fired.t:6.2f} {delay:10.0f} "
+              f"{rtf:6.3f} {awake:6.2f}  {'' if fired.final else '(partial) '}{fired.text}")
+    if delays:
+        print(f"{len(delays)}/{len(files)} fired; after end mean {sum(delays) / len(delays):.0f} ms, "
+              f"max {max(delays):.0f} ms")
+
+if __name__ == "__main__":
+    main()
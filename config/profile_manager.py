@@ -1,55 +1,146 @@
 import json
 import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 # Configuration directory & file
 CONFIG_DIR  = os.path.join(os.path.expanduser("~"), ".nac")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "profiles.json")
 
+# Parsed profiles.json, valid while the file's (mtime, size, inode) stamp matches
+_cache = {"stamp": None, "cfg": None}
+# In-process guard around the OS file lock, so nested calls don't self-deadlock
+_lock       = threading.RLock()
+_lock_depth = 0
+
 def _ensure_config():
     os.makedirs(CONFIG_DIR, exist_ok=True)
     if not os.path.isfile(CONFIG_FILE):
-        with open(CONFIG_FILE, "w") as f:
-            json.dump({"default": {}, "profiles": {}}, f, indent=2)
+        _write_atomic({"default": {}, "profiles": {}})
+
+def _stamp():
+    st = os.stat(CONFIG_FILE)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+def _copy(obj):
+    """Cheap deep copy for JSON data (dicts, lists, scalars)."""
+    if isinstance(obj, dict):
+        return {k: _copy(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy(v) for v in obj]
+    return obj
+
+@contextmanager
+def _file_lock():
+    """
+    Exclusive lock on profiles.json.lock, shared by every NAC process
+    (selector GUI, input modules). Re-entrant within a process.
+    """
+    global _lock_depth
+    with _lock:
+        if _lock_depth:
+            _lock_depth += 1
+            try:
+                yield
+            finally:
+                _lock_depth -= 1
+            return
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        fd = os.open(CONFIG_FILE + ".lock", os.O_RDWR | os.O_CREAT)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            _lock_depth = 1
+            try:
+                yield
+            finally:
+                _lock_depth = 0
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+def _write_atomic(cfg: dict):
+    """Write to a temp file next to CONFIG_FILE, then rename over it."""
+    fd, tmp = tempfile.mkstemp(dir=CONFIG_DIR, prefix=".profiles.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(cfg, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, CONFIG_FILE)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _load_cached() -> dict:
+    """The cached config, re-read only if the file changed on disk."""
+    with _lock:
+        try:
+            stamp = _stamp()
+        except FileNotFoundError:
+            with _file_lock():
+                _ensure_config()
+            stamp = _stamp()
+        if stamp != _cache["stamp"]:
+            with open(CONFIG_FILE, "r") as f:
+                _cache["cfg"] = json.load(f)
+            _cache["stamp"] = stamp
+        return _cache["cfg"]
 
 def load_all() -> dict:
     """Load the entire configuration."""
-    _ensure_config()
-    with open(CONFIG_FILE, "r") as f:
-        return json.load(f)
+    return _copy(_load_cached())
 
 def save_all(cfg: dict):
     """Save the entire configuration."""
-    _ensure_config()
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(cfg, f, indent=2)
+    with _file_lock():
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        _write_atomic(cfg)
+        _cache["cfg"], _cache["stamp"] = _copy(cfg), _stamp()
 
 def get_profile(name: str) -> dict:
     """
     Return the settings for a given profile.
     Falls back to the 'default' profile if name not found.
     """
-    cfg = load_all()
-    return cfg["profiles"].get(name, cfg["default"])
+    cfg = _load_cached()
+    return _copy(cfg["profiles"].get(name, cfg["default"]))
 
 def list_profiles() -> list:
     """Return a list of saved profile names."""
-    cfg = load_all()
-    return list(cfg["profiles"].keys())
+    return list(_load_cached()["profiles"].keys())
 
 def add_or_update_profile(name: str, settings: dict):
     """Create or update a profile with the given settings."""
-    cfg = load_all()
-    cfg["profiles"][name] = settings
-    save_all(cfg)
+    with _file_lock():
+        cfg = load_all()
+        cfg["profiles"][name] = settings
+        save_all(cfg)
 
 def set_default_profile(name: str):
     """Set which profile to load by default at startup."""
-    cfg = load_all()
-    if name in cfg["profiles"]:
-        cfg["default"] = cfg["profiles"][name]
-        save_all(cfg)
-    else:
-        raise KeyError(f"No profile named '{name}'")
+    with _file_lock():
+        cfg = load_all()
+        if name in cfg["profiles"]:
+            cfg["default"] = cfg["profiles"][name]
+            save_all(cfg)
+        else:
+            raise KeyError(f"No profile named '{name}'")
 
 
 def update_default_profile(settings: dict):
@@ -57,6 +148,70 @@ def update_default_profile(settings: dict):
     Overwrite the 'default' profile settings directly
     (used by the in-app Calibration dialog).
     """
-    cfg = load_all()
-    cfg["default"] = settings
-    save_all(cfg)
+    with _file_lock():
+        cfg = load_all()
+        cfg["default"] = settings
+        save_all(cfg)
+
+
+# ─── Voice macros ─────────────────────────────────────────────────────────
+# Stored per profile under "macros": {name: {"phrases": ..., "steps": [...]}}
+# (see utils/macros.py for the format).
+
+def _macro_owner(cfg: dict, profile):
+    if profile is None:
+        return cfg["default"]
+    if profile not in cfg["profiles"]:
+        raise KeyError(f"No profile named '{profile}'")
+    return cfg["profiles"][profile]
+
+def get_macros(profile: str = None) -> dict:
+    """The macros of `profile` (default: the active default settings)."""
+    cfg = _load_cached()
+    settings = cfg["default"] if profile is None else cfg["profiles"].get(profile, cfg["default"])
+    return _copy(settings.get("macros", {}))
+
+def save_macro(name: str, macro: dict, profile: str = None):
+    """Create or replace macro `name` in `profile` (default: the default settings)."""
+    with _file_lock():
+        cfg = load_all()
+        _macro_owner(cfg, profile).setdefault("macros", {})[name] = macro
+        save_all(cfg)
+
+def delete_macro(name: str, profile: str = None):
+    """Remove macro `name` from `profile`, if present."""
+    with _file_lock():
+        cfg = load_all()
+        macros = _macro_owner(cfg, profile).get("macros", {})
+        if name in macros:
+            del macros[name]
+            save_all(cfg)
+
+
+class ProfileWatcher:
+    """
+    Lets a running input module notice Settings changes made by the GUI.
+    Call poll() between frames: at most every `interval` seconds it checks
+    the profile (a stat() unless profiles.json changed) and returns the new
+    settings if they differ from the last ones seen, else None.
+    """
+
+    def __init__(self, name: str = "default", interval: float = 0.5, current: dict = None):
+        self.name     = name
+        self.interval = interval
+        self._current = _copy(current) if current is not None else get_profile(name)
+        self._next    = time.monotonic() + interval
+
+    def poll(self):
+        now = time.monotonic()
+        if now < self._next:
+            return None
+        self._next = now + self.interval
+        try:
+            settings = get_profile(self.name)
+        except (OSError, ValueError):
+            return None  # unreadable right now; try again next interval
+        if settings == self._current:
+            return None
+        self._current = settings
+        return _copy(settings)
@@ -7,7 +7,9 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 # ────────────────────────────────────────────────────────────────────────────
 
+import time
 import subprocess
+from queue import Queue, Empty
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -25,22 +27,95 @@ from PyQt6.QtWidgets import (
     QComboBox,
     QDialogButtonBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from config.profile_manager import (
     get_profile,
     add_or_update_profile,
     set_default_profile,
     update_default_profile
 )
+from input_handlers.nac_engine import EngineClient, STOP_TIMEOUT
+
+POLL_INTERVAL = 2.0    # seconds between status polls
+READY_TIMEOUT = 60.0   # seconds a Launch waits for a spawned engine to finish preloading
+
+class EngineWorker(QThread):
+    """
+    Talks to the warm engine off the GUI thread. The engine answers one
+    connection at a time, so any request can wait several seconds while
+    it stops or switches a mode. The worker starts the engine if none is
+    running, then runs queued commands and polls status between them.
+    Replies come back through `replied` as (command, reply dict or OSError).
+    """
+
+    replied = pyqtSignal(str, object)
+
+    def __init__(self, client):
+        super().__init__()
+        self.client    = client
+        self.process   = None     # engine spawned by this window, if any
+        self.requests  = Queue()
+        self._stopping = False
+
+    def submit(self, cmd, **args):
+        self.requests.put((cmd, args))
+
+    def stop(self):
+        """Finish the current request and end the thread."""
+        self._stopping = True
+        self.requests.put(None)
+        self.wait()
+
+    def spawned_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def run(self):
+        if not self.client.available():
+            try:
+                self.process = self.client.spawn()
+            except OSError:
+                pass  # Launch falls back to one process per module
+        while not self._stopping:
+            try:
+                item = self.requests.get(timeout=POLL_INTERVAL)
+            except Empty:
+                item = ("status", {})
+            if item is None:
+                break
+            cmd, args = item
+            if cmd == "start":
+                self._await_ready()
+            try:
+                reply = self.client.request(cmd, **args)
+            except OSError as e:
+                reply = e
+            self.replied.emit(cmd, reply)
+
+    def _await_ready(self):
+        """While an engine spawned here is still preloading, wait until it answers."""
+        deadline = time.monotonic() + READY_TIMEOUT
+        while self.spawned_alive() and not self._stopping and time.monotonic() < deadline:
+            if self.client.available():
+                return
+            time.sleep(0.2)
+
 
 class SelectorWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("NAC – Next-Gen Assistive Controller")
-        self.setFixedSize(360, 420)
+        self.setFixedSize(360, 460)
 
         # Load default profile settings
         self.settings = get_profile("default")
+
+        # Warm engine: started in the background now so Launch is instant;
+        # all requests to it go through the worker thread
+        self.engine       = EngineClient()
+        self.engine_mode  = None   # mode asked of the engine by the last Launch
+        self.engine_ready = False
+        self.worker       = EngineWorker(self.engine)
+        self.worker.replied.connect(self.on_engine_reply)
         input_mode = self.settings.get("input_mode", "voice")
 
         # Build UI
@@ -73,17 +148,25 @@ class SelectorWindow(QMainWindow):
         layout.addWidget(self.radio_both)
 
         btn_launch   = QPushButton("Launch")
+        btn_stop     = QPushButton("Stop")
         btn_settings = QPushButton("Settings…")
         btn_profiles = QPushButton("Manage Profiles…")
 
         btn_launch.clicked.connect(self.launch_selected)
+        btn_stop.clicked.connect(self.stop_running)
         btn_settings.clicked.connect(self.open_settings)
         btn_profiles.clicked.connect(self.manage_profiles)
 
         layout.addWidget(btn_launch)
+        layout.addWidget(btn_stop)
         layout.addWidget(btn_settings)
         layout.addWidget(btn_profiles)
 
+        self.status_label = QLabel("Engine: starting…")
+        layout.addWidget(self.status_label)
+
+        self.worker.start()
+
     def open_settings(self):
         dialog = QDialog(self)
         dialog.setWindowTitle("Calibration & Language Settings")
@@ -106,18 +189,42 @@ class SelectorWindow(QMainWindow):
         spin_scroll.setValue(self.settings.get("scroll_scale", 2))
         form.addRow("Scroll Sensitivity:", spin_scroll)
 
+        # Cursor smoothing filters (see utils/filters.py)
+        filters = [("None", "none"), ("Moving average", "average"),
+                   ("Exponential", "ema"), ("One Euro (adaptive)", "one_euro"),
+                   ("Kalman (predictive)", "kalman")]
+
+        def filter_combo(current):
+            combo = QComboBox()
+            for name, kind in filters:
+                combo.addItem(name, kind)
+            combo.setCurrentIndex(next((i for i, (_, k) in enumerate(filters) if k == current), 0))
+            return combo
+
+        combo_gesture_filter = filter_combo(self.settings.get("gesture_filter", "one_euro"))
+        form.addRow("Gesture Cursor Filter:", combo_gesture_filter)
+
         # Eye settings
         spin_eye_smooth = QSpinBox()
         spin_eye_smooth.setRange(1, 20)
         spin_eye_smooth.setValue(self.settings.get("eye_smoothing", 5))
         form.addRow("Eye Smoothing (frames):", spin_eye_smooth)
 
+        combo_eye_filter = filter_combo(self.settings.get("eye_filter", "average"))
+        form.addRow("Eye Cursor Filter:", combo_eye_filter)
+
         spin_eye_sens = QDoubleSpinBox()
         spin_eye_sens.setRange(0.5, 5.0)
         spin_eye_sens.setSingleStep(0.1)
         spin_eye_sens.setValue(self.settings.get("eye_sensitivity", 2.0))
         form.addRow("Eye Sensitivity:", spin_eye_sens)
 
+        spin_eye_holdoff = QDoubleSpinBox()
+        spin_eye_holdoff.setRange(0.0, 5.0)
+        spin_eye_holdoff.setSingleStep(0.1)
+        spin_eye_holdoff.setValue(self.settings.get("eye_holdoff", 0.5))
+        form.addRow("Eye Hold-off after Gesture (s):", spin_eye_holdoff)
+
         # Language selector
         combo_lang = QComboBox()
         languages = [("English", "en-US"), ("Hindi", "hi-IN")]
@@ -142,13 +249,17 @@ class SelectorWindow(QMainWindow):
             self.settings["click_cooldown"]  = spin_cooldown.value()
             self.settings["scroll_scale"]    = spin_scroll.value()
             self.settings["eye_smoothing"]   = spin_eye_smooth.value()
+            self.settings["gesture_filter"]  = combo_gesture_filter.currentData()
+            self.settings["eye_filter"]      = combo_eye_filter.currentData()
             self.settings["eye_sensitivity"] = spin_eye_sens.value()
+            self.settings["eye_holdoff"]     = spin_eye_holdoff.value()
             self.settings["language"]        = combo_lang.currentData()
             update_default_profile(self.settings)
             QMessageBox.information(
                 self,
                 "Settings Saved",
-                "Calibration & language settings updated."
+                "Calibration & language settings updated.\n"
+                "Running modules pick them up automatically."
             )
 
     def manage_profiles(self):
@@ -169,8 +280,12 @@ class SelectorWindow(QMainWindow):
             "click_cooldown":  self.settings["click_cooldown"],
             "scroll_scale":    self.settings["scroll_scale"],
             "eye_smoothing":   self.settings["eye_smoothing"],
+            "eye_filter":      self.settings.get("eye_filter", "average"),
+            "gesture_filter":  self.settings.get("gesture_filter", "one_euro"),
             "eye_sensitivity": self.settings["eye_sensitivity"],
-            "language":        self.settings["language"]
+            "eye_holdoff":     self.settings.get("eye_holdoff", 0.5),
+            "language":        self.settings["language"],
+            "macros":          self.settings.get("macros", {}),
         }
         add_or_update_profile(name, new_settings)
         set_default_profile(name)
@@ -182,12 +297,23 @@ class SelectorWindow(QMainWindow):
         self.settings = new_settings
 
     def launch_selected(self):
-        commands = []
         mode = ("voice" if self.radio_voice.isChecked()
                 else "gesture" if self.radio_gesture.isChecked()
                 else "eye" if self.radio_eye.isChecked()
                 else "both")
 
+        # Prefer the warm engine: starting/switching there takes milliseconds.
+        # One still preloading is waited for, so the camera is never opened twice.
+        self.engine_mode = mode
+        if self.engine_ready:
+            self.status_label.setText(f"Engine: starting {mode}…")
+        else:
+            self.status_label.setText(f"Engine: starting… ({mode} launches when ready)")
+        self.worker.submit("start", mode=mode)
+
+    def launch_module(self, mode):
+        """Run `mode` as its own process, when no engine could be started."""
+        commands = []
         if mode == "voice":
             commands.append(("Voice Module", [
                 sys.executable,
@@ -227,6 +353,64 @@ class SelectorWindow(QMainWindow):
             f"{launched} started successfully."
         )
 
+    def on_engine_reply(self, cmd, reply):
+        """A reply (or OSError) from the engine worker, on the GUI thread."""
+        if isinstance(reply, OSError):
+            self.engine_ready = False
+            if cmd == "start":
+                if self.worker.spawned_alive():
+                    self.status_label.setText("Engine: not answering; try Launch again")
+                else:
+                    self.status_label.setText("Engine: not running")
+                    self.launch_module(self.engine_mode)
+            elif cmd == "stop":
+                QMessageBox.warning(
+                    self,
+                    "Not Running",
+                    "The NAC engine is not running; close module windows directly."
+                )
+            else:
+                self.status_label.setText(
+                    "Engine: starting…" if self.worker.spawned_alive() else "Engine: not running"
+                )
+            return
+
+        self.engine_ready = True
+        if not reply.get("ok"):
+            self.status_label.setText(f"Engine: {reply.get('error', 'request failed')}")
+        elif cmd == "start":
+            mode = reply.get("mode") or self.engine_mode
+            self.status_label.setText(
+                f"Engine: running {mode} (switched in {reply['elapsed_ms']:.0f} ms)"
+            )
+        elif cmd == "stop":
+            self.status_label.setText(
+                f"Engine: idle (stopped in {reply.get('elapsed_ms', 0):.0f} ms)"
+            )
+        elif reply.get("running"):
+            self.status_label.setText(f"Engine: running {reply['mode']}")
+        else:
+            self.status_label.setText("Engine: ready")
+
+    def stop_running(self):
+        self.status_label.setText("Engine: stopping…")
+        self.worker.submit("stop")
+
+    def closeEvent(self, event):
+        """Shut down the engine this window started, so no mode runs on without a UI."""
+        self.worker.stop()
+        process = self.worker.process
+        if process is not None and process.poll() is None:
+            try:
+                self.engine.shutdown()
+            except OSError:
+                pass  # still preloading, or already gone
+            try:
+                process.wait(timeout=STOP_TIMEOUT + 1.0)
+            except subprocess.TimeoutExpired:
+                process.terminate()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = SelectorWindow()
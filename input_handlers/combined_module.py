@@ -2,17 +2,11 @@ import os
 import sys
 import threading
 import time
-import math
 import cv2
-import mediapipe as mp
-import speech_recognition as sr
-import pyttsx3
 import subprocess
 import webbrowser
 import datetime
-import pyautogui
-from queue import Queue, Empty
-from collections import deque
+from queue import Empty
 
 # ─── Ensure project root on import path ────────────────────────────────────
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
@@ -20,82 +14,147 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 # ────────────────────────────────────────────────────────────────────────────
 
-from config.profile_manager import get_profile
+from config.profile_manager import get_profile, ProfileWatcher
 from utils.logger import log_event
-
-# ─── Load settings ─────────────────────────────────────────────────────────
-settings        = get_profile("default")
-LANGUAGE        = settings.get("language", "en-US")
-CLICK_THRESH    = settings.get("click_threshold", 30)
-CLICK_COOLDOWN  = settings.get("click_cooldown", 0.5)
-SCROLL_SCALE    = settings.get("scroll_scale", 2)
-EYE_SMOOTH      = settings.get("eye_smoothing", 5)
-EYE_SENSITIVITY = settings.get("eye_sensitivity", 2.0)
-
-pyautogui.FAILSAFE = False
-SCREEN_W, SCREEN_H = pyautogui.size()
-
-# ─── Shared exit flag and event queue ───────────────────────────────────────
+from utils.camera import FrameProducer
+from utils.event_bus import EventBus
+from utils.trace import TraceRecorder, record_path_from_argv
+from utils.output import get_output
+from utils.filters import refresh_filter
+from utils.roi import RoiTracker, create_crop_model
+from utils.governor import FrameGovernor
+from utils.display import Preview, preview_rate, stop_on_signals
+from utils.telemetry import stage_timer, start_export, stop_export
+from utils.spans import start_tracing, stop_tracing
+from utils.wakeword import create_wake_listener
+from utils.tts import get_speech
+from utils.commands import compile_commands
+from utils.macros import compile_macros, get_macro_runner
+from utils.landmarks import (
+    hands_from_result, face_from_result, gaze_point, tip_distances, fingers_extended,
+    THUMB_TIP, INDEX_PIP, INDEX_TIP, MIDDLE_TIP,
+)
+from input_handlers.vision_workers import VisionWorkerPool
+
+# ─── Load settings (re-applied by the dispatcher's profile watcher) ────────
+def apply_settings(new: dict):
+    global settings, LANGUAGE, CLICK_THRESH, CLICK_COOLDOWN, SCROLL_SCALE
+    global EYE_SENSITIVITY, EYE_HOLDOFF, COMMANDS, MACROS
+    settings        = new
+    LANGUAGE        = settings.get("language", "en-US")
+    CLICK_THRESH    = settings.get("click_threshold", 30)
+    CLICK_COOLDOWN  = settings.get("click_cooldown", 0.5)
+    SCROLL_SCALE    = settings.get("scroll_scale", 2)
+    EYE_SENSITIVITY = settings.get("eye_sensitivity", 2.0)
+    EYE_HOLDOFF     = settings.get("eye_holdoff", 0.5)
+    MACROS          = compile_macros(settings)
+    COMMANDS        = compile_commands(settings, MACROS.commands)
+
+apply_settings(get_profile("default"))
+# Fixed for the lifetime of the process (not hot-reloaded):
+# "threads" (default) or "processes"; `--processes` on the command line wins
+VISION_WORKERS  = settings.get("vision_workers", "threads")
+USE_PROCESSES   = "--processes" in sys.argv or VISION_WORKERS == "processes"
+
+# Spoken replies come from a worker thread, so the dispatcher never waits on them
+PHRASES = ("Command not recognized",)
+
+# ─── Output and screen size (looked up on first use, not at import) ────────
+# Spawned vision workers re-import this module as __mp_main__, so importing
+# it must not start the output backend, pyautogui or the speech worker.
+_screen = None
+
+def screen_size():
+    """(width, height) of the output backend's screen, read once."""
+    global _screen
+    if _screen is None:
+        _screen = get_output().size()
+    return _screen
+
+# ─── Shared exit flag, event queue and camera (fresh per main() run) ────────
 exit_event = threading.Event()
-event_q    = Queue()
-
-# ─── Helper for Iris Center ────────────────────────────────────────────────
-def iris_center(landmarks, indices, width, height):
-    xs = [landmarks[i].x * width for i in indices]
-    ys = [landmarks[i].y * height for i in indices]
-    return sum(xs) / len(xs), sum(ys) / len(ys)
+event_q    = EventBus(maxsize=64)
+camera     = None
+
+# ─── Models (built once per process, reused across runs) ──────────────────
+_models = {}
+
+def get_model(kind):
+    """
+    Return the shared "hands" or "face" MediaPipe model, or the separate
+    "hands_crop" / "face_crop" one for RoiTracker crops, building it once.
+    """
+    if kind not in _models:
+        import mediapipe as mp
+        if kind.endswith("_crop"):
+            _models[kind] = create_crop_model(kind[:-len("_crop")])
+        elif kind == "hands":
+            _models[kind] = mp.solutions.hands.Hands(
+                max_num_hands=2,
+                min_detection_confidence=0.7,
+                min_tracking_confidence=0.7
+            )
+        else:
+            _models[kind] = mp.solutions.face_mesh.FaceMesh(refine_landmarks=True)
+    return _models[kind]
 
 # ─── Event Dispatcher ──────────────────────────────────────────────────────
+# event_q serves voice > gesture > eye, so the branches below see events in
+# priority order rather than arrival order.
 def dispatcher():
+    watcher = ProfileWatcher("default", current=settings)
+    timer   = stage_timer("hybrid_dispatch")
     while not exit_event.is_set():
+        changed = watcher.poll()
+        if changed:
+            apply_settings(changed)
+            log_event("profile_reload", "combined_module")
         try:
             src, evt = event_q.get(timeout=0.1)
         except Empty:
             continue
+        timer.start()
+        ok = dispatch_event(src, evt)
+        timer.lap(src)
+        timer.frame()
+        if not ok:
+            exit_event.set()
+            break
 
-        # Voice (highest priority)
-        if src == "voice":
-            cmd = evt
-            if cmd == "exit":
-                exit_event.set()
-                break
-            handle_voice_command(cmd)
-            continue
-
-        # Gesture
-        if src == "gesture":
-            typ = evt["type"]
-            if typ == "move":
-                x, y = evt["pos"]
-                pyautogui.moveTo(x, y)
-            elif typ == "click":
-                pyautogui.click(button=evt["button"])
-            elif typ == "scroll":
-                pyautogui.scroll(evt["amount"])
-            continue
-
-        # Eye (lowest priority)
-        if src == "eye" and evt["type"] == "move":
+def dispatch_event(src, evt) -> bool:
+    """Carry out one event; return False when it asks NAC to exit."""
+    # Voice (highest priority)
+    if src == "voice":
+        cmd = evt
+        if cmd == "exit":
+            return False
+        handle_voice_command(cmd)
+        return True
+
+    output = get_output()
+    # Gesture
+    if src == "gesture":
+        typ = evt["type"]
+        if typ == "move":
             x, y = evt["pos"]
-            pyautogui.moveTo(x, y)
+            output.move_to(x, y)
+        elif typ == "click":
+            output.click(evt["button"])
+        elif typ == "scroll":
+            output.scroll(evt["amount"])
+        return True
+
+    # Eye (lowest priority)
+    if src == "eye" and evt["type"] == "move":
+        x, y = evt["pos"]
+        output.move_to(x, y)
+    return True
 
 # ─── Voice Thread ──────────────────────────────────────────────────────────
-def voice_loop():
-    recognizer = sr.Recognizer()
-    tts        = pyttsx3.init()
-
-    def speak(text):
-        tts.say(text)
-        tts.runAndWait()
-
-    def listen():
-        with sr.Microphone() as src:
-            recognizer.pause_threshold = 0.8
-            audio = recognizer.listen(src, timeout=5, phrase_time_limit=5)
-        try:
-            return recognizer.recognize_google(audio, language=LANGUAGE).lower()
-        except:
-            return ""
+def voice_loop(stop):
+    # continuous capture; full recognition only after the wake word (see utils.wakeword)
+    listener = create_wake_listener(settings, timer=stage_timer("hybrid_voice"),
+                                    mute=get_speech(settings).is_speaking)
 
     def publish(cmd):
         event_q.put(("voice", cmd))
@@ -103,135 +162,292 @@ def voice_loop():
     # Optional greeting
     publish(f"greet_{LANGUAGE}")
 
-    while not exit_event.is_set():
-        cmd = listen()
-        if cmd:
-            publish(cmd)
+    for hyp in listener.hypotheses(stop):
+        listener.configure(settings)
+        # act on a partial as soon as it names a command; drop the rest of it
+        if hyp.final or COMMANDS.ready(hyp.text):
+            if not hyp.final:
+                listener.skip()
+            publish(hyp.text)
+    listener.close()
+    log_event("speech_stats", str(listener.stats()))
+
+def open_app(name):
+    return lambda slots: subprocess.Popen([name])
+
+def search(slots):
+    webbrowser.open(f"https://www.google.com/search?q={slots['term']}")
+
+def tell_time(slots):
+    get_speech(settings).say(datetime.datetime.now().strftime("%I:%M %p"))
+
+def request_exit(slots):
+    event_q.put(("voice", "exit"))
+
+# Registry name → action (see utils.commands)
+VOICE_ACTIONS = {
+    "open_chrome":  open_app("chrome"),
+    "open_notepad": open_app("notepad"),
+    "search":       search,
+    "time":         tell_time,
+    "exit":         request_exit,
+}
 
 def handle_voice_command(cmd):
     log_event("voice_command", cmd)
-    # Basic mappings
-    if "open chrome" in cmd or "क्रोम" in cmd:
-        subprocess.Popen(["chrome"])
-    elif "open notepad" in cmd or "नोटपैड" in cmd:
-        subprocess.Popen(["notepad"])
-    elif cmd.startswith("search ") or cmd.startswith("खोज"):
-        term = cmd.split(" ", 1)[1]
-        webbrowser.open(f"https://www.google.com/search?q={term}")
-    elif "time" in cmd or "समय" in cmd:
-        now = datetime.datetime.now().strftime("%I:%M %p")
-        pyttsx3.init().say(now); pyttsx3.init().runAndWait()
-    elif any(k in cmd for k in ("exit", "quit", "बाहर निकल")):
-        event_q.put(("voice", "exit"))
-    else:
-        pyttsx3.init().say("Command not recognized"); pyttsx3.init().runAndWait()
+    match = COMMANDS.match(cmd)
+    if match is None:
+        get_speech(settings).say("Command not recognized")
+        return
+    # macros only queue their steps, so the dispatcher moves straight on
+    action = VOICE_ACTIONS.get(match.name) or MACROS.actions[match.name]
+    action(match.slots)
+
+# ─── Landmark → event helpers (shared by thread and process modes) ────────
+def state_filter(state, prefix, default="average"):
+    """
+    The `prefix` cursor filter kept in a loop's `state`, rebuilt when the
+    dispatcher has applied new settings that change it.
+    """
+    key = f"{prefix}_settings"
+    if state.get(key) is not settings:
+        state[f"{prefix}_filter"] = refresh_filter(state.get(f"{prefix}_filter"), settings, prefix, default)
+        state[key] = settings
+    return state[f"{prefix}_filter"]
+
+def predicted(filt, x, y, t, now):
+    """Filter a normalized point seen at `t`; predicting filters extrapolate it to `now`."""
+    fx, fy = filt(x, y, t)
+    if filt.predicts:
+        px, py = filt.predict(now)
+        fx, fy = max(0.0, min(px, 1.0)), max(0.0, min(py, 1.0))
+    return fx, fy
+
+def publish_hands(hands, state, now=None, t=None):
+    """
+    Turn one frame's detected hands into gesture events. `hands` is a list
+    of (label, landmarks) as from utils.landmarks.hands_from_result;
+    `state` carries the last click time and cursor filter between frames.
+    `t` is the frame's capture time; `now` overrides the clock (for
+    replay). Both use the time.monotonic() clock.
+    """
+    cursor = state_filter(state, "gesture", "one_euro")
+    if not any(label == "Right" for label, _ in hands):
+        cursor.reset()   # start afresh when the hand comes back
+    if not hands:
+        return
+    # a tracked hand owns the cursor: mute eye moves for a while
+    event_q.hold_off("eye", EYE_HOLDOFF)
+    now = time.monotonic() if now is None else now
+    t   = now if t is None else t
+    screen_w, screen_h = screen_size()
+    for label, hand in hands:
+        # Right hand → move
+        if label == "Right":
+            fx, fy = predicted(cursor, hand[INDEX_TIP].x, hand[INDEX_TIP].y, t, now)
+            x = int(fx * screen_w)
+            y = int(fy * screen_h)
+            event_q.put(("gesture", {"type": "move", "pos": (x, y)}))
+
+        # Left hand → click / scroll
+        if label == "Left":
+            # pinch distances in normalized units; CLICK_THRESH is in 1/100ths
+            d_index, d_middle = tip_distances(hand, THUMB_TIP, (INDEX_TIP, MIDDLE_TIP))
+            pinch_index  = d_index  < CLICK_THRESH / 100
+            pinch_middle = d_middle < CLICK_THRESH / 100
+            # left click
+            if pinch_index and t - state["last_click"] > CLICK_COOLDOWN:
+                event_q.put(("gesture", {"type": "click", "button": "left"}))
+                state["last_click"] = t
+            # right click
+            elif pinch_middle and t - state["last_click"] > CLICK_COOLDOWN:
+                event_q.put(("gesture", {"type": "click", "button": "right"}))
+                state["last_click"] = t
+            # scroll
+            elif fingers_extended(hand):
+                amt = int((hand[INDEX_PIP].y - hand[INDEX_TIP].y) * SCROLL_SCALE * 100)
+                event_q.put(("gesture", {"type": "scroll", "amount": amt}))
+
+def publish_gaze(nx, ny, state, t=None, now=None):
+    """
+    Turn a normalized iris centre (seen at time `t`) into a smoothed eye
+    move event; `state` carries the eye filter between frames. `now`
+    overrides the clock (for replay).
+    """
+    ax = (nx - 0.5) * EYE_SENSITIVITY + 0.5
+    ay = (ny - 0.5) * EYE_SENSITIVITY + 0.5
+    ax, ay = max(0.0, min(ax, 1.0)), max(0.0, min(ay, 1.0))
+
+    now = time.monotonic() if now is None else now
+    avg_x, avg_y = predicted(state_filter(state, "eye"), ax, ay, now if t is None else t, now)
+
+    screen_w, screen_h = screen_size()
+    x = int(avg_x * screen_w)
+    y = int(avg_y * screen_h)
+    event_q.put(("eye", {"type": "move", "pos": (x, y)}))
+
+def draw_hands(frame, res, text=""):
+    """Draw a Hands result and a status line onto `frame` (preview thread)."""
+    import mediapipe as mp
+    for lms in res.multi_hand_landmarks or []:
+        mp.solutions.drawing_utils.draw_landmarks(frame, lms, mp.solutions.hands.HAND_CONNECTIONS)
+    cv2.putText(frame, text, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
 
 # ─── Gesture Thread ─────────────────────────────────────────────────────────
-def gesture_loop():
-    mp_hands = mp.solutions.hands
-    hands    = mp_hands.Hands(
-        max_num_hands=2,
-        min_detection_confidence=0.7,
-        min_tracking_confidence=0.7
-    )
-    last_time = time.time()
-    cap       = cv2.VideoCapture(0)
-
-    def pinch(a, b):
-        return math.hypot(a.x - b.x, a.y - b.y) < (CLICK_THRESH / 100)
-
-    while not exit_event.is_set():
-        ret, frame = cap.read()
-        if not ret:
-            continue
-        frame = cv2.flip(frame, 1)
-        rgb   = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res   = hands.process(rgb)
-
-        if res.multi_hand_landmarks and res.multi_handedness:
-            for idx, hand_hm in enumerate(res.multi_handedness):
-                label = hand_hm.classification[0].label
-                lm    = res.multi_hand_landmarks[idx].landmark
-
-                # Right hand → move
-                if label == "Right":
-                    x = int(lm[8].x * SCREEN_W)
-                    y = int(lm[8].y * SCREEN_H)
-                    event_q.put(("gesture", {"type": "move", "pos": (x, y)}))
-
-                # Left hand → click / scroll
-                if label == "Left":
-                    now = time.time()
-                    # left click
-                    if pinch(lm[4], lm[8]) and now - last_time > CLICK_COOLDOWN:
-                        event_q.put(("gesture", {"type": "click", "button": "left"}))
-                        last_time = now
-                    # right click
-                    elif pinch(lm[4], lm[12]) and now - last_time > CLICK_COOLDOWN:
-                        event_q.put(("gesture", {"type": "click", "button": "right"}))
-                        last_time = now
-                    # scroll
-                    elif lm[8].y < lm[6].y and lm[12].y < lm[10].y:
-                        amt = int((lm[6].y - lm[8].y) * SCROLL_SCALE * 100)
-                        event_q.put(("gesture", {"type": "scroll", "amount": amt}))
-
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            exit_event.set()
+def gesture_loop(stop, recorder=None, preview=None):
+    hands    = get_model("hands")
+    state    = {"last_click": time.monotonic()}
+    roi      = RoiTracker("hands", lambda: get_model("hands_crop"))
+    governor = FrameGovernor()
+    timer    = stage_timer("hybrid_gesture")
+    frames   = camera.subscribe()
+
+    while not stop.is_set():
+        if not governor.configure(settings).wait(stop):
             break
-
-    cap.release()
-    cv2.destroyAllWindows()
+        frame = frames.read()
+        if frame is None:
+            continue
+        timer.start()
+        timer.record("age", frames.last_age)
+        res   = roi.configure(settings).process(hands, frame.rgb)
+        timer.lap("inference")
+        if recorder is not None:
+            recorder.add(frame.seq, frame.timestamp, frame=frame.bgr, hands=res)
+            timer.lap("record")
+
+        found = hands_from_result(res)
+        timer.lap("landmarks")
+        publish_hands(found, state, t=frame.timestamp)
+        timer.lap("logic")
+        governor.update(bool(found), frame.timestamp)
+
+        if preview is not None:
+            preview.offer(frame.bgr, draw_hands, res, frames.overlay_text())
+            timer.lap("preview")
+        timer.frame()
+
+    log_event("frame_stats", f"gesture {frames.stats()}")
+    log_event("governor_stats", f"gesture {governor.stats()}")
+    if roi.enabled:
+        log_event("roi_stats", f"gesture {roi.stats()}")
 
 # ─── Eye Thread ─────────────────────────────────────────────────────────────
-def eye_loop():
-    mp_face   = mp.solutions.face_mesh
-    mesh      = mp_face.FaceMesh(refine_landmarks=True)
-    smoothing = deque(maxlen=EYE_SMOOTH)
-    cap       = cv2.VideoCapture(0)
-
-    LEFT_IRIS  = [474, 475, 476, 477]
-    RIGHT_IRIS = [469, 470, 471, 472]
-
-    while not exit_event.is_set():
-        ret, frame = cap.read()
-        if not ret:
-            continue
-        frame = cv2.flip(frame, 1)
-        h, w = frame.shape[:2]
-        rgb  = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res  = mesh.process(rgb)
-
-        if res.multi_face_landmarks:
-            lm = res.multi_face_landmarks[0].landmark
-            lx, ly = iris_center(lm, LEFT_IRIS, w, h)
-            rx, ry = iris_center(lm, RIGHT_IRIS, w, h)
-            cx, cy = (lx + rx) / 2, (ly + ry) / 2
-
-            nx, ny = cx / w, cy / h
-            ax = (nx - 0.5) * EYE_SENSITIVITY + 0.5
-            ay = (ny - 0.5) * EYE_SENSITIVITY + 0.5
-            ax, ay = max(0.0, min(ax, 1.0)), max(0.0, min(ay, 1.0))
-
-            smoothing.append((ax, ay))
-            avg_x = sum(p[0] for p in smoothing) / len(smoothing)
-            avg_y = sum(p[1] for p in smoothing) / len(smoothing)
-
-            x = int(avg_x * SCREEN_W)
-            y = int(avg_y * SCREEN_H)
-            event_q.put(("eye", {"type": "move", "pos": (x, y)}))
-
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            exit_event.set()
+def eye_loop(stop, recorder=None):
+    mesh      = get_model("face")
+    state     = {}
+    roi       = RoiTracker("face", lambda: get_model("face_crop"))
+    governor  = FrameGovernor()
+    timer     = stage_timer("hybrid_eye")
+    frames    = camera.subscribe()
+
+    while not stop.is_set():
+        if not governor.configure(settings).wait(stop):
             break
-
-    cap.release()
-    cv2.destroyAllWindows()
+        frame = frames.read()
+        if frame is None:
+            continue
+        timer.start()
+        timer.record("age", frames.last_age)
+        res  = roi.configure(settings).process(mesh, frame.rgb)
+        timer.lap("inference")
+        if recorder is not None:
+            recorder.add(frame.seq, frame.timestamp, frame=frame.bgr, face=res)
+            timer.lap("record")
+
+        iris = face_from_result(res)
+        if iris is not None:
+            nx, ny = gaze_point(iris)
+            timer.lap("landmarks")
+            publish_gaze(nx, ny, state, frame.timestamp)
+            timer.lap("logic")
+        governor.update(iris is not None, frame.timestamp)
+        timer.frame()
+
+    log_event("frame_stats", f"eye {frames.stats()}")
+    log_event("governor_stats", f"eye {governor.stats()}")
+    if roi.enabled:
+        log_event("roi_stats", f"eye {roi.stats()}")
+
+# ─── Vision Worker Processes ────────────────────────────────────────────────
+def vision_process_loop(stop, pool):
+    """
+    Process execution mode: Hands and FaceMesh each run in their own worker
+    process of `pool` (see input_handlers.vision_workers), fed through
+    shared memory. This thread only turns the compact results into events.
+    """
+    state     = {"last_click": time.monotonic()}
+    eye_state = {}
+    timers    = {"gesture": stage_timer("hybrid_gesture"), "eye": stage_timer("hybrid_eye")}
+
+    pool.start()
+    while not stop.is_set():
+        result = pool.get(timeout=0.1)
+        if result is None:
+            continue
+        src, payload = result.source, result.payload
+        timer = timers[src]
+        timer.start()
+        # capture → result back from the worker (queue + inference)
+        timer.record("age", time.monotonic() - result.timestamp)
+        if src == "gesture":
+            publish_hands(payload, state, t=result.timestamp)
+        elif src == "eye" and payload is not None:
+            publish_gaze(payload[0], payload[1], eye_state, result.timestamp)
+        timer.lap("logic")
+        timer.frame()
+    pool.stop()
+    log_event("worker_stats", str(pool.stats()))
 
 # ─── Main ──────────────────────────────────────────────────────────────────
-if __name__ == "__main__":
-    # start all three threads
-    threading.Thread(target=voice_loop,   daemon=True).start()
-    threading.Thread(target=gesture_loop, daemon=True).start()
-    threading.Thread(target=eye_loop,     daemon=True).start()
-    # start dispatcher in main thread (blocks)
+def main(cam=None, stop_event=None, recorder=None):
+    """
+    Run hybrid mode until a voice "exit", 'q' in the preview window, or
+    `stop_event` is set. `cam` is an already started FrameProducer to
+    borrow (the warm engine passes its own); otherwise one is opened and
+    closed here. In thread mode, frames and both landmark streams go to
+    `recorder` if given, and the gesture thread feeds the preview (see
+    utils.display; none in process mode).
+    """
+    global exit_event, event_q, camera
+    exit_event = stop_event if stop_event is not None else threading.Event()
+    event_q    = EventBus(maxsize=64)
+    own_camera = cam is None
+    # one camera handle shared by the gesture and eye pipelines
+    camera     = cam if cam is not None else FrameProducer(0, shared=USE_PROCESSES)
+    # checked before anything starts: process mode needs a shared camera
+    pool       = VisionWorkerPool(camera, settings) if USE_PROCESSES else None
+    camera.start()
+    preview    = Preview("NAC Hybrid", preview_rate(settings), exit_event)
+    get_speech(settings).prerender(PHRASES)
+    start_export(settings)
+    start_tracing(settings)
+    # start voice plus the two vision pipelines
+    threading.Thread(target=voice_loop, args=(exit_event,), daemon=True).start()
+    if USE_PROCESSES:
+        vision = [threading.Thread(target=vision_process_loop, args=(exit_event, pool), daemon=True)]
+    else:
+        vision = [threading.Thread(target=gesture_loop, args=(exit_event, recorder, preview), daemon=True),
+                  threading.Thread(target=eye_loop,     args=(exit_event, recorder), daemon=True)]
+    for t in vision:
+        t.start()
+    # dispatcher runs in the calling thread (blocks)
     dispatcher()
+    for t in vision:
+        t.join(timeout=2.0)
+    preview.close()
+    stop_export()
+    stop_tracing()
+    if own_camera:
+        camera.stop()
+    if recorder is not None:
+        recorder.close()
+    get_macro_runner().cancel()
+    log_event("event_bus_stats", str(event_q.stats()))
+    log_event("macro_stats", str(get_macro_runner().stats()))
+    log_event("output_stats", str(get_output().stats()))
+
+if __name__ == "__main__":
+    trace_path = record_path_from_argv()
+    main(stop_event=stop_on_signals(),
+         recorder=TraceRecorder(trace_path, streams=("hands", "face")) if trace_path else None)
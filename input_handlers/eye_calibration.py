@@ -12,6 +12,8 @@ if PROJECT_ROOT not in sys.path:
 
 import pyautogui
 from collections import defaultdict
+from utils.camera import FrameProducer
+from utils.landmarks import face_from_result, gaze_point
 
 # Load profile & defaults
 settings = get_profile("default")
@@ -26,50 +28,41 @@ face_mesh = mp_face.FaceMesh(
     min_tracking_confidence=0.7
 )
 
-# Iris landmarks
-LEFT_IRIS  = [474, 475, 476, 477]
-RIGHT_IRIS = [469, 470, 471, 472]
-
-def iris_center(landmarks, indices, w, h):
-    xs = [landmarks[i].x * w for i in indices]
-    ys = [landmarks[i].y * h for i in indices]
-    return sum(xs)/len(xs), sum(ys)/len(ys)
-
-def capture_corner(name):
+def capture_corner(name, camera, stop_event=None):
     """
     Prompt user to look at a corner, press 'c' to capture average iris ratio.
+    Frames come from the shared `camera` (a started FrameProducer); gives
+    up once `stop_event` is set or the camera stops.
     """
     print(f"\n>> Calibration: look at {name.upper()}, then press 'c'")
-    cap = cv2.VideoCapture(0)
+    frames = camera.subscribe()
     ratios = []
-    while True:
-        ret, frame = cap.read()
-        if not ret:
+    while camera.running and not (stop_event is not None and stop_event.is_set()):
+        shared = frames.read()
+        if shared is None:
             continue
-        frame = cv2.flip(frame, 1)
-        h, w = frame.shape[:2]
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res = face_mesh.process(rgb)
-        if res.multi_face_landmarks:
-            lm = res.multi_face_landmarks[0].landmark
-            lx, ly = iris_center(lm, LEFT_IRIS,  w, h)
-            rx, ry = iris_center(lm, RIGHT_IRIS, w, h)
-            cx, cy = (lx+rx)/2, (ly+ry)/2
+        frame = shared.bgr.copy()  # we draw on it
+        res = face_mesh.process(shared.rgb)
+        iris = face_from_result(res)
+        if iris is not None:
+            cx, cy = gaze_point(iris)
             # draw text
             cv2.putText(frame, f"Press 'c' to capture {name}",
                         (30,30), cv2.FONT_HERSHEY_SIMPLEX,
                         1, (0,255,0), 2)
             cv2.imshow("Calibration", frame)
         key = cv2.waitKey(1) & 0xFF
-        if key == ord('c') and res.multi_face_landmarks:
+        if key == ord('c') and iris is not None:
             # record this frame's ratio
-            ratios.append((cx/w, cy/h))
-            print(f"  Captured: {(cx/w):.3f}, {(cy/h):.3f}")
+            ratios.append((cx, cy))
+            print(f"  Captured: {cx:.3f}, {cy:.3f}")
             break
         elif key == ord('q'):
             break
-    cap.release()
-    cv2.destroyWindow("Calibration")
+    try:
+        cv2.destroyWindow("Calibration")
+    except cv2.error:
+        pass  # stopped before the window was shown
     if ratios:
         # since we captured one sample, return it; could average multiple
         return ratios[-1]
@@ -78,13 +71,15 @@ def capture_corner(name):
 def main():
     corners = ["top-left", "top-right", "bottom-right", "bottom-left"]
     captured = defaultdict(tuple)
+    camera = FrameProducer(0).start()
 
     for name in corners:
-        rx, ry = capture_corner(name)
+        rx, ry = capture_corner(name, camera)
         if rx is None:
             print(f"Skipping {name}, no data.")
             continue
         captured[name] = (rx, ry)
+    camera.stop()
 
     # build min/max from corners
     xs = [v[0] for v in captured.values()]
@@ -1,9 +1,9 @@
 import os
 import sys
+import threading
+import time
 import cv2
 import mediapipe as mp
-import pyautogui
-from collections import deque
 
 # ─── Project‐root import hack ───────────────────────────────────────────────
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
@@ -11,22 +11,44 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 # ────────────────────────────────────────────────────────────────────────────
 
-from config.profile_manager import get_profile, update_default_profile
+from config.profile_manager import get_profile, update_default_profile, ProfileWatcher
 from utils.logger import log_event
+from utils.camera import FrameProducer
+from utils.trace import TraceRecorder, record_path_from_argv
+from utils.output import get_output
+from utils.landmarks import face_from_result, gaze_point, calibration, normalize
+from utils.filters import make_filter, refresh_filter
+from utils.roi import RoiTracker
+from utils.governor import FrameGovernor
+from utils.display import Preview, preview_rate, stop_on_signals
+from utils.telemetry import stage_timer, start_export, stop_export
+from utils.spans import start_tracing, stop_tracing
 
-# ─── Load profile & defaults ───────────────────────────────────────────────
-settings      = get_profile("default")
-SMOOTHING     = settings.get("eye_smoothing", 5)
-SENSITIVITY   = settings.get("eye_sensitivity", 2.0)
-# calibration bounds (will be written back if missing)
-EYE_MIN_X     = settings.get("eye_min_x", None)
-EYE_MAX_X     = settings.get("eye_max_x", None)
-EYE_MIN_Y     = settings.get("eye_min_y", None)
-EYE_MAX_Y     = settings.get("eye_max_y", None)
+# FaceMesh input cropped around the last face ("roi_tracking" etc., see utils.roi)
+roi = RoiTracker("face")
+# Idles to a probe rate while no face is seen ("idle_after_frames" etc.)
+governor = FrameGovernor()
+
+# ─── Load profile & defaults (re-applied by the profile watcher) ──────────
+def apply_settings(new: dict):
+    global settings, SENSITIVITY
+    global EYE_MIN_X, EYE_MAX_X, EYE_MIN_Y, EYE_MAX_Y, CALIBRATION
+    settings      = new
+    SENSITIVITY   = settings.get("eye_sensitivity", 2.0)
+    # calibration bounds (will be written back if missing)
+    EYE_MIN_X     = settings.get("eye_min_x", None)
+    EYE_MAX_X     = settings.get("eye_max_x", None)
+    EYE_MIN_Y     = settings.get("eye_min_y", None)
+    EYE_MAX_Y     = settings.get("eye_max_y", None)
+    CALIBRATION   = calibration((EYE_MIN_X, EYE_MIN_Y), (EYE_MAX_X, EYE_MAX_Y))
+    roi.configure(settings)
+    governor.configure(settings)
+
+apply_settings(get_profile("default"))
 # ────────────────────────────────────────────────────────────────────────────
 
-pyautogui.FAILSAFE = False
-SCREEN_W, SCREEN_H = pyautogui.size()
+output = get_output()
+SCREEN_W, SCREEN_H = output.size()
 
 # MediaPipe Face Mesh + Iris
 mp_face   = mp.solutions.face_mesh
@@ -39,67 +61,74 @@ face_mesh = mp_face.FaceMesh(
 )
 mp_draw   = mp.solutions.drawing_utils
 
-LEFT_IRIS  = [474, 475, 476, 477]
-RIGHT_IRIS = [469, 470, 471, 472]
-
-def iris_center(lms, idxs, w, h):
-    xs = [lms[i].x * w for i in idxs]
-    ys = [lms[i].y * h for i in idxs]
-    return sum(xs)/len(xs), sum(ys)/len(ys)
-
-def capture_corner(label):
+def capture_corner(label, camera, stop_event=None):
     """
     Show a camera window prompting “Look at {label} and press C”,
     return the normalized (x,y) of iris-centroid for that frame.
+    Frames come from the shared `camera` (a started FrameProducer).
+    Gives up, returning (None, None), once `stop_event` is set or the
+    camera stops.
     """
-    cap = cv2.VideoCapture(0)
+    frames = camera.subscribe()
     print(f"\n→ Calibration: look at {label} and press C")
     cx_c, cy_c = None, None
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
+    while camera.running and not (stop_event is not None and stop_event.is_set()):
+        shared = frames.read()
+        if shared is None:
             continue
-        frame = cv2.flip(frame, 1)
-        h, w = frame.shape[:2]
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res = face_mesh.process(rgb)
-
-        if res.multi_face_landmarks:
-            lm = res.multi_face_landmarks[0].landmark
-            lx, ly = iris_center(lm, LEFT_IRIS, w, h)
-            rx, ry = iris_center(lm, RIGHT_IRIS, w, h)
-            cx, cy = (lx+rx)/2, (ly+ry)/2
+        frame = shared.bgr.copy()  # we draw on it
+        res = face_mesh.process(shared.rgb)
+        iris = face_from_result(res)
+
+        if iris is not None:
+            cx, cy = gaze_point(iris)
             cv2.putText(frame, f"Press C to capture {label}",
                         (30,30), cv2.FONT_HERSHEY_SIMPLEX,
                         1.0, (0,255,0), 2)
         cv2.imshow("Eye Calibration", frame)
         key = cv2.waitKey(1) & 0xFF
-        if key == ord('c') and res.multi_face_landmarks:
-            cx_c, cy_c = cx/w, cy/h
+        if key == ord('c') and iris is not None:
+            cx_c, cy_c = cx, cy
             print(f"  Captured {label}: ({cx_c:.3f}, {cy_c:.3f})")
             break
         elif key == ord('q'):
             break
 
-    cap.release()
-    cv2.destroyWindow("Eye Calibration")
+    try:
+        cv2.destroyWindow("Eye Calibration")
+    except cv2.error:
+        pass  # stopped before the window was shown
     return cx_c, cy_c
 
-def run_calibration():
-    """If any of the four corner bounds are missing, run them now."""
-    global EYE_MIN_X, EYE_MAX_X, EYE_MIN_Y, EYE_MAX_Y
+def run_calibration(camera=None, stop_event=None):
+    """
+    If any of the four corner bounds are missing, run them now, using
+    `camera` (a started FrameProducer) if given. Aborted, saving nothing,
+    once `stop_event` is set (the engine stopping or switching modes).
+    """
+    global EYE_MIN_X, EYE_MAX_X, EYE_MIN_Y, EYE_MAX_Y, CALIBRATION
     if None not in (EYE_MIN_X, EYE_MAX_X, EYE_MIN_Y, EYE_MAX_Y):
         return
 
     # capture each corner
     corners = ["top-left", "top-right", "bottom-right", "bottom-left"]
     pts = []
+    own_camera = camera is None
+    if own_camera:
+        camera = FrameProducer(0).start()
     for c in corners:
-        xy = capture_corner(c)
+        xy = capture_corner(c, camera, stop_event)
         if xy[0] is not None:
             pts.append(xy)
+        if stop_event is not None and stop_event.is_set():
+            break
+    if own_camera:
+        camera.stop()
 
+    if stop_event is not None and stop_event.is_set():
+        print("Calibration aborted; stopping.")
+        return
     if len(pts) < 2:
         print("Calibration aborted; not enough data.")
         return
@@ -107,6 +136,7 @@ def run_calibration():
     xs, ys = zip(*pts)
     EYE_MIN_X, EYE_MAX_X = min(xs), max(xs)
     EYE_MIN_Y, EYE_MAX_Y = min(ys), max(ys)
+    CALIBRATION = calibration((EYE_MIN_X, EYE_MIN_Y), (EYE_MAX_X, EYE_MAX_Y))
 
     # save back into profile
     settings["eye_min_x"] = EYE_MIN_X
@@ -117,54 +147,42 @@ def run_calibration():
     print(f"Saved calibration: X∈[{EYE_MIN_X:.3f},{EYE_MAX_X:.3f}], "
           f"Y∈[{EYE_MIN_Y:.3f},{EYE_MAX_Y:.3f}]")
 
-def main():
-    log_event("module_start", "eye_module_auto_calib")
-    # 1) If needed, run calibration
-    run_calibration()
+def predicted_gaze(smoother, now=None):
+    """Screen position a predicting eye filter expects for `now`, or None."""
+    pos = smoother.predict(time.monotonic() if now is None else now) if smoother.predicts else None
+    if pos is None:
+        return None
+    return int(max(0, min(pos[0], 1))*SCREEN_W), int(max(0, min(pos[1], 1))*SCREEN_H)
 
-    # 2) Tracking loop
-    cap       = cv2.VideoCapture(0)
-    smoothing = deque(maxlen=SMOOTHING)
-    print("NAC Eye Module active (auto‐calibrated). Press 'q' to quit.")
+def track_gaze(res, smoother, frame=None, t=None, now=None):
+    """
+    Move the cursor from one frame's FaceMesh result (captured at time
+    `t`, time.monotonic() clock), smoothed by `smoother` (a utils.filters
+    filter; a predicting one extrapolates to `now`). Iris landmarks are
+    drawn onto `frame` if given.
+    """
+    iris = face_from_result(res)
+    if iris is not None:
+        # normalized iris midpoint, mapped through the calibration bounds
+        # (an axis is only clipped while uncalibrated)
+        nx, ny = normalize(gaze_point(iris), CALIBRATION)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            continue
-        frame = cv2.flip(frame, 1)
-        h, w = frame.shape[:2]
-        rgb  = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        res  = face_mesh.process(rgb)
-
-        if res.multi_face_landmarks:
-            lm = res.multi_face_landmarks[0].landmark
-            lx, ly = iris_center(lm, LEFT_IRIS, w, h)
-            rx, ry = iris_center(lm, RIGHT_IRIS, w, h)
-            cx, cy = (lx+rx)/2, (ly+ry)/2
-
-            # raw norm
-            nx = cx/w; ny = cy/h
-            # apply calibration bounds
-            if EYE_MAX_X > EYE_MIN_X:
-                nx = (nx - EYE_MIN_X)/(EYE_MAX_X - EYE_MIN_X)
-            if EYE_MAX_Y > EYE_MIN_Y:
-                ny = (ny - EYE_MIN_Y)/(EYE_MAX_Y - EYE_MIN_Y)
-            nx, ny = max(0, min(nx,1)), max(0, min(ny,1))
-
-            # sensitivity
-            ax = (nx - 0.5)*SENSITIVITY + 0.5
-            ay = (ny - 0.5)*SENSITIVITY + 0.5
-            ax, ay = max(0, min(ax,1)), max(0, min(ay,1))
-
-            # smoothing
-            smoothing.append((ax, ay))
-            mx = sum(p[0] for p in smoothing)/len(smoothing)
-            my = sum(p[1] for p in smoothing)/len(smoothing)
-
-            # move
-            pyautogui.moveTo(int(mx*SCREEN_W), int(my*SCREEN_H))
-
-            # debug draw
+        # sensitivity
+        ax = (nx - 0.5)*SENSITIVITY + 0.5
+        ay = (ny - 0.5)*SENSITIVITY + 0.5
+        ax, ay = max(0, min(ax,1)), max(0, min(ay,1))
+
+        # smoothing
+        mx, my = smoother(ax, ay, t)
+
+        # move (ahead to now, if the filter predicts and has a prediction)
+        pos = predicted_gaze(smoother, now)
+        if pos is None:
+            pos = int(mx*SCREEN_W), int(my*SCREEN_H)
+        output.move_to(*pos)
+
+        # debug draw
+        if frame is not None:
             mp_draw.draw_landmarks(
                 frame,
                 res.multi_face_landmarks[0],
@@ -173,13 +191,101 @@ def main():
                 mp_draw.DrawingSpec((255,0,0),1,1)
             )
 
-        cv2.imshow("NAC Eye Control", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+def draw_gaze(frame, res, text=""):
+    """Draw the iris landmarks and a status line onto `frame` (preview thread)."""
+    if res.multi_face_landmarks:
+        mp_draw.draw_landmarks(
+            frame,
+            res.multi_face_landmarks[0],
+            mp_face.FACEMESH_IRISES,
+            mp_draw.DrawingSpec((0,255,0),1,1),
+            mp_draw.DrawingSpec((255,0,0),1,1)
+        )
+    cv2.putText(frame, text, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+
+def main(camera=None, stop_event=None, recorder=None):
+    """
+    Run eye control until `stop_event` is set (or 'q' in the preview
+    window). `camera` is an already started FrameProducer to borrow (the
+    warm engine passes its own); otherwise one is opened and closed here.
+    Frames and landmarks are written to `recorder` (a TraceRecorder) if
+    given. Without a preview (see utils.display) it runs headless.
+    """
+    stop_event = stop_event if stop_event is not None else threading.Event()
+    rate       = preview_rate(settings)
+    log_event("module_start", "eye_module_auto_calib")
+    own_camera = camera is None
+    if own_camera:
+        # latest-frame capture: inference always runs on the newest frame
+        camera = FrameProducer(0).start()
+
+    # 1) If needed, run calibration (it needs a window and keyboard)
+    if rate:
+        run_calibration(camera, stop_event)
+    elif None in (EYE_MIN_X, EYE_MAX_X, EYE_MIN_Y, EYE_MAX_Y):
+        log_event("calibration_skipped", "headless")
+        print("Headless: skipping calibration; uncalibrated axes use the raw iris position.")
+
+    # 2) Tracking loop
+    frames    = camera.subscribe()
+    smoother  = make_filter(settings, "eye")
+    watcher   = ProfileWatcher("default", current=settings)
+    timer     = stage_timer("eye")
+    start_export(settings)
+    start_tracing(settings)
+    preview   = Preview("NAC Eye Control", rate, stop_event)
+    # optional cursor updates between frames, from the predicting filter
+    source    = lambda: predicted_gaze(smoother)
+    output.track(source if settings.get("eye_display_rate") else None)
+    print("NAC Eye Module active (auto‐calibrated). " +
+          ("Press 'q' to quit." if preview.enabled else "Running headless; stop with Ctrl+C."))
+
+    while not stop_event.is_set():
+        changed = watcher.poll()
+        if changed:
+            apply_settings(changed)
+            smoother = refresh_filter(smoother, settings, "eye")
+            output.track(source if settings.get("eye_display_rate") else None)
+            log_event("profile_reload", "eye_module")
+
+        if not governor.wait(stop_event):
             break
+        shared = frames.read()
+        if shared is None:
+            continue
+        timer.start()
+        timer.record("age", frames.last_age)
+        res  = roi.process(face_mesh, shared.rgb)
+        timer.lap("inference")
+        if recorder is not None:
+            recorder.add(shared.seq, shared.timestamp, frame=shared.bgr, face=res)
+            timer.lap("record")
+
+        track_gaze(res, smoother, None, shared.timestamp)
+        timer.lap("logic")
+        governor.update(bool(res.multi_face_landmarks), shared.timestamp)
+
+        preview.offer(shared.bgr, draw_gaze, res, frames.overlay_text())
+        timer.lap("preview")
+        timer.frame()
 
-    cap.release()
-    cv2.destroyAllWindows()
+    output.track(None)
+    stop_export()
+    stop_tracing()
+    preview.close()
+    if own_camera:
+        camera.stop()
+    log_event("frame_stats", str(frames.stats()))
+    log_event("output_stats", str(output.stats()))
+    log_event("governor_stats", f"eye {governor.stats()}")
+    if roi.enabled:
+        log_event("roi_stats", f"eye {roi.stats()}")
+    if recorder is not None:
+        recorder.close()
 
 if __name__ == "__main__":
-    main()
-    input("Press Enter to exit…")
+    trace_path = record_path_from_argv()
+    main(stop_event=stop_on_signals(),
+         recorder=TraceRecorder(trace_path, streams=("face",)) if trace_path else None)
+    if preview_rate(settings):
+        input("Press Enter to exit…")
@@ -9,20 +9,43 @@ if PROJECT_ROOT not in sys.path:
 
 import cv2
 import mediapipe as mp
-import pyautogui
+import threading
 import time
-import math
-from config.profile_manager import get_profile
+from config.profile_manager import get_profile, ProfileWatcher
 from utils.logger import log_event
+from utils.camera import FrameProducer
+from utils.trace import TraceRecorder, record_path_from_argv
+from utils.output import get_output
+from utils.filters import refresh_filter
+from utils.roi import RoiTracker
+from utils.governor import FrameGovernor
+from utils.display import Preview, preview_rate, stop_on_signals
+from utils.telemetry import stage_timer, start_export, stop_export
+from utils.spans import start_tracing, stop_tracing
+from utils.landmarks import (
+    tip_distances, fingers_extended,
+    THUMB_TIP, INDEX_TIP, MIDDLE_TIP,
+)
 
-# Disable PyAutoGUI failsafe
-pyautogui.FAILSAFE = False
-
-# Load settings
-settings        = get_profile("default")
-CLICK_THRESHOLD = settings.get("click_threshold", 30)
-CLICK_COOLDOWN  = settings.get("click_cooldown", 0.5)
-SCROLL_SCALE    = settings.get("scroll_scale", 2)
+# Cursor smoothing ("gesture_filter" etc. in the profile, see utils.filters)
+cursor_filter = None
+# Hands input cropped around the last hands ("roi_tracking" etc., see utils.roi)
+roi = RoiTracker("hands")
+# Idles to a probe rate while no hands are seen ("idle_after_frames" etc.)
+governor = FrameGovernor()
+
+# Load settings (re-applied by the profile watcher while running)
+def apply_settings(new: dict):
+    global settings, CLICK_THRESHOLD, CLICK_COOLDOWN, SCROLL_SCALE, cursor_filter
+    settings        = new
+    CLICK_THRESHOLD = settings.get("click_threshold", 30)
+    CLICK_COOLDOWN  = settings.get("click_cooldown", 0.5)
+    SCROLL_SCALE    = settings.get("scroll_scale", 2)
+    cursor_filter   = refresh_filter(cursor_filter, settings, "gesture", default="one_euro")
+    roi.configure(settings)
+    governor.configure(settings)
+
+apply_settings(get_profile("default"))
 
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(
@@ -33,106 +56,182 @@ hands = mp_hands.Hands(
 )
 mp_draw = mp.solutions.drawing_utils
 
-screen_w, screen_h = pyautogui.size()
+# cursor/click injection (backend chosen by the profile's "output_backend")
+output = get_output()
+screen_w, screen_h = output.size()
 
-last_click_time = 0.0
+last_click_time = float("-inf")
 scroll_active   = False
 prev_scroll_y   = None
 
-def is_pinch(lm1, lm2, cam_w, cam_h, threshold) -> bool:
-    x1, y1 = lm1.x * cam_w, lm1.y * cam_h
-    x2, y2 = lm2.x * cam_w, lm2.y * cam_h
-    return math.hypot(x2 - x1, y2 - y1) < threshold
-
-def fingers_extended(lms, cam_h) -> bool:
-    return (
-        lms[8].y * cam_h < lms[6].y * cam_h and
-        lms[12].y * cam_h < lms[10].y * cam_h
-    )
-
-def main():
+def predicted_cursor():
+    """Screen position a predicting cursor filter expects for now, or None."""
+    if not cursor_filter.predicts:
+        return None
+    pos = cursor_filter.predict(time.monotonic())
+    if pos is None:
+        return None
+    return max(0, min(pos[0], 1)) * screen_w, max(0, min(pos[1], 1)) * screen_h
+
+def process_hands(result, cam_w, cam_h, frame=None, t=None, now=None):
+    """
+    Act on one frame's Hands result, captured at `t` (time.monotonic()
+    clock): move, click or scroll. Landmarks are drawn onto `frame` if
+    given; `now` overrides the clock (for replay).
+    """
     global last_click_time, scroll_active, prev_scroll_y
 
-    cap = cv2.VideoCapture(0)
-    cam_w = cap.get(cv2.CAP_PROP_FRAME_WIDTH)
-    cam_h = cap.get(cv2.CAP_PROP_FRAME_HEIGHT)
-
-    log_event("module_start", "gesture_module")
-    print("NAC Gesture Module active. Press 'q' to quit.")
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        frame = cv2.flip(frame, 1)
-        rgb   = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = hands.process(rgb)
-
-        if result.multi_hand_landmarks and result.multi_handedness:
-            for idx, hand_hm in enumerate(result.multi_handedness):
-                label = hand_hm.classification[0].label  # "Left" or "Right"
-                lms   = result.multi_hand_landmarks[idx].landmark
+    now   = time.monotonic() if now is None else now
+    t     = now if t is None else t
+    right = False
+    if result.multi_hand_landmarks and result.multi_handedness:
+        for idx, hand_hm in enumerate(result.multi_handedness):
+            label = hand_hm.classification[0].label  # "Left" or "Right"
+            hand  = result.multi_hand_landmarks[idx].landmark
+            if frame is not None:
                 mp_draw.draw_landmarks(
                     frame,
                     result.multi_hand_landmarks[idx],
                     mp_hands.HAND_CONNECTIONS
                 )
 
-                if label == "Right":
-                    x = int(lms[8].x * screen_w)
-                    y = int(lms[8].y * screen_h)
-                    pyautogui.moveTo(x, y)
-
-                elif label == "Left":
-                    now    = time.time()
-                    thumb  = lms[4]
-                    index  = lms[8]
-                    middle = lms[12]
-
-                    # Left-click
-                    if is_pinch(thumb, index, cam_w, cam_h, CLICK_THRESHOLD):
-                        if now - last_click_time > CLICK_COOLDOWN:
-                            pyautogui.click(button="left")
-                            log_event("gesture_click", "left")
-                            last_click_time = now
-                            scroll_active   = False
-                            prev_scroll_y   = None
-
-                    # Right-click
-                    elif is_pinch(thumb, middle, cam_w, cam_h, CLICK_THRESHOLD):
-                        if now - last_click_time > CLICK_COOLDOWN:
-                            pyautogui.click(button="right")
-                            log_event("gesture_click", "right")
-                            last_click_time = now
-                            scroll_active   = False
-                            prev_scroll_y   = None
-
-                    # Continuous scroll
-                    elif fingers_extended(lms, cam_h):
-                        cur_y = lms[8].y * cam_h
-                        if not scroll_active:
-                            scroll_active = True
-                            prev_scroll_y = cur_y
-                        else:
-                            delta = prev_scroll_y - cur_y
-                            amount = int(delta * SCROLL_SCALE)
-                            if amount:
-                                pyautogui.scroll(amount)
-                                log_event("gesture_scroll", str(amount))
-                                prev_scroll_y = cur_y
+            if label == "Right":
+                right  = True
+                fx, fy = cursor_filter(hand[INDEX_TIP].x, hand[INDEX_TIP].y, t)
+                if cursor_filter.predicts:
+                    # extrapolate past camera + inference latency
+                    px, py = cursor_filter.predict(now)
+                    fx, fy = max(0, min(px, 1)), max(0, min(py, 1))
+                output.move_to(int(fx * screen_w), int(fy * screen_h))
+
+            elif label == "Left":
+                # thumb→index and thumb→middle pinch distances, in pixels
+                d_index, d_middle = tip_distances(
+                    hand, THUMB_TIP, (INDEX_TIP, MIDDLE_TIP), (cam_w, cam_h)
+                )
 
+                # Left-click
+                if d_index < CLICK_THRESHOLD:
+                    if t - last_click_time > CLICK_COOLDOWN:
+                        output.click("left")
+                        log_event("gesture_click", "left")
+                        last_click_time = t
+                        scroll_active   = False
+                        prev_scroll_y   = None
+
+                # Right-click
+                elif d_middle < CLICK_THRESHOLD:
+                    if t - last_click_time > CLICK_COOLDOWN:
+                        output.click("right")
+                        log_event("gesture_click", "right")
+                        last_click_time = t
+                        scroll_active   = False
+                        prev_scroll_y   = None
+
+                # Continuous scroll
+                elif fingers_extended(hand):
+                    cur_y = hand[INDEX_TIP].y * cam_h
+                    if not scroll_active:
+                        scroll_active = True
+                        prev_scroll_y = cur_y
                     else:
-                        scroll_active = False
-                        prev_scroll_y = None
+                        delta = prev_scroll_y - cur_y
+                        amount = int(delta * SCROLL_SCALE)
+                        if amount:
+                            output.scroll(amount)
+                            log_event("gesture_scroll", str(amount))
+                            prev_scroll_y = cur_y
 
-        cv2.imshow("NAC Gesture Control", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+                else:
+                    scroll_active = False
+                    prev_scroll_y = None
+
+    if not right:
+        # start afresh when the hand comes back, wherever it is
+        cursor_filter.reset()
+
+def draw_hands(frame, result, text=""):
+    """Draw a Hands result and a status line onto `frame` (preview thread)."""
+    for lms in result.multi_hand_landmarks or []:
+        mp_draw.draw_landmarks(frame, lms, mp_hands.HAND_CONNECTIONS)
+    cv2.putText(frame, text, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+
+def main(camera=None, stop_event=None, recorder=None):
+    """
+    Run gesture control until `stop_event` is set (or 'q' in the preview
+    window). `camera` is an already started FrameProducer to borrow (the
+    warm engine passes its own); otherwise one is opened and closed here.
+    Frames and landmarks are written to `recorder` (a TraceRecorder) if
+    given. Without a preview (see utils.display) it runs headless.
+    """
+    stop_event = stop_event if stop_event is not None else threading.Event()
+    # latest-frame capture: inference always runs on the newest frame
+    own_camera = camera is None
+    if own_camera:
+        camera = FrameProducer(0).start()
+    frames = camera.subscribe()
+    cam_w, cam_h = camera.frame_size()
+
+    watcher = ProfileWatcher("default", current=settings)
+    timer   = stage_timer("gesture")
+    start_export(settings)
+    start_tracing(settings)
+    preview = Preview("NAC Gesture Control", preview_rate(settings), stop_event)
+    # optional cursor updates between frames, from the predicting filter
+    output.track(predicted_cursor if settings.get("gesture_display_rate") else None)
 
-    cap.release()
-    cv2.destroyAllWindows()
+    log_event("module_start", "gesture_module")
+    print("NAC Gesture Module active. " +
+          ("Press 'q' to quit." if preview.enabled else "Running headless; stop with Ctrl+C."))
+
+    while not stop_event.is_set():
+        changed = watcher.poll()
+        if changed:
+            apply_settings(changed)
+            output.track(predicted_cursor if settings.get("gesture_display_rate") else None)
+            log_event("profile_reload", "gesture_module")
+
+        if not governor.wait(stop_event):
+            break
+        shared = frames.read()
+        if shared is None:
+            if not camera.running:
+                break
+            continue
+
+        timer.start()
+        timer.record("age", frames.last_age)
+        result = roi.process(hands, shared.rgb)
+        timer.lap("inference")
+        if recorder is not None:
+            recorder.add(shared.seq, shared.timestamp, frame=shared.bgr, hands=result)
+            timer.lap("record")
+
+        process_hands(result, cam_w, cam_h, None, shared.timestamp)
+        timer.lap("logic")
+        governor.update(bool(result.multi_hand_landmarks), shared.timestamp)
+
+        preview.offer(shared.bgr, draw_hands, result, frames.overlay_text())
+        timer.lap("preview")
+        timer.frame()
+
+    output.track(None)
+    stop_export()
+    stop_tracing()
+    preview.close()
+    if own_camera:
+        camera.stop()
+    log_event("frame_stats", str(frames.stats()))
+    log_event("output_stats", str(output.stats()))
+    log_event("governor_stats", f"gesture {governor.stats()}")
+    if roi.enabled:
+        log_event("roi_stats", f"gesture {roi.stats()}")
+    if recorder is not None:
+        recorder.close()
 
 if __name__ == "__main__":
-    main()
-    input("Press Enter to exit…")
+    trace_path = record_path_from_argv()
+    main(stop_event=stop_on_signals(),
+         recorder=TraceRecorder(trace_path, streams=("hands",)) if trace_path else None)
+    if preview_rate(settings):
+        input("Press Enter to exit…")
@@ -0,0 +1,250 @@
+"""
+Warm NAC engine: one long-lived process that imports cv2/mediapipe/
+pyautogui and builds the models once, then runs input modes on request.
+The selector GUI talks to it through EngineClient over a local
+authenticated socket:
+
+    {"cmd": "start", "mode": "gesture"}   start or switch mode
+    {"cmd": "stop"}                       stop the running mode
+    {"cmd": "status"}                     current mode, timings
+    {"cmd": "telemetry"}                  per-stage latency (utils.telemetry)
+    {"cmd": "shutdown"}                   stop and exit the engine
+"""
+import os
+import sys
+import time
+import secrets
+import threading
+import subprocess
+from multiprocessing.connection import Listener, Client
+from multiprocessing import AuthenticationError
+
+# ─── Ensure project root on sys.path ────────────────────────────────────
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+# ────────────────────────────────────────────────────────────────────────────
+
+from utils.logger import log_event
+
+ENGINE_ADDRESS = ("127.0.0.1", 47653)
+KEY_FILE       = os.path.join(os.path.expanduser("~"), ".nac", "engine.key")
+MODES          = ("voice", "gesture", "eye", "both")
+VISION_MODES   = ("gesture", "eye", "both")
+STOP_TIMEOUT   = 2.0   # seconds to wait for a mode's loop to notice stop
+
+
+def _authkey(create: bool = False) -> bytes:
+    """Per-user shared secret, so only this user's processes can connect."""
+    if create and not os.path.isfile(KEY_FILE):
+        os.makedirs(os.path.dirname(KEY_FILE), exist_ok=True)
+        fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    with open(KEY_FILE) as f:
+        return f.read().strip().encode()
+
+
+class NacEngine:
+    """Holds the preloaded modules and runs at most one mode at a time."""
+
+    def __init__(self):
+        self.modules    = {}
+        self.mode       = None
+        self.camera     = None
+        self.preload_ms = 0.0
+        self.started    = time.time()
+        self._thread    = None
+        self._stop      = None
+        self._lock      = threading.Lock()
+
+    def preload(self):
+        """Import every mode (building its models) and warm the hybrid and speech models."""
+        t0 = time.perf_counter()
+        from input_handlers import voice_module, gesture_module, eye_module, combined_module
+        combined_module.get_model("hands")
+        combined_module.get_model("face")
+        if combined_module.settings.get("roi_tracking", False):
+            combined_module.get_model("hands_crop")
+            combined_module.get_model("face_crop")
+        # loads the offline speech model, if one is installed
+        from utils.speech import create_recognizer
+        try:
+            create_recognizer(voice_module.settings)
+        except (ImportError, OSError, ValueError) as e:
+            log_event("engine_preload", f"speech: {e}")
+        self.modules = {
+            "voice":   voice_module,
+            "gesture": gesture_module,
+            "eye":     eye_module,
+            "both":    combined_module,
+        }
+        self.preload_ms = (time.perf_counter() - t0) * 1000
+        log_event("engine_preload", f"{self.preload_ms:.0f} ms")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, mode: str) -> float:
+        """Start `mode`, stopping/switching from the current one. Returns ms taken."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'")
+        t0 = time.perf_counter()
+        with self._lock:
+            # the camera stays open across vision → vision switches
+            self._stop_mode(keep_camera=mode in VISION_MODES)
+            stop = threading.Event()
+            if mode in VISION_MODES and self.camera is None:
+                from utils.camera import FrameProducer
+                self.camera = FrameProducer(0, shared=True).start()
+            if mode == "both":
+                kwargs = {"cam": self.camera, "stop_event": stop}
+            elif mode in VISION_MODES:
+                kwargs = {"camera": self.camera, "stop_event": stop}
+            else:
+                kwargs = {"stop_event": stop}
+            self._stop   = stop
+            self.mode    = mode
+            self._thread = threading.Thread(
+                target=self._run, args=(mode, kwargs), name=f"nac-{mode}", daemon=True
+            )
+            self._thread.start()
+        elapsed = (time.perf_counter() - t0) * 1000
+        log_event("engine_start", f"{mode} in {elapsed:.1f} ms")
+        return elapsed
+
+    def _run(self, mode, kwargs):
+        try:
+            self.modules[mode].main(**kwargs)
+        except Exception as e:
+            log_event("engine_error", f"{mode}: {e}")
+
+    def stop(self) -> float:
+        """Stop the running mode and release the camera. Returns ms taken."""
+        t0 = time.perf_counter()
+        with self._lock:
+            self._stop_mode(keep_camera=False)
+        return (time.perf_counter() - t0) * 1000
+
+    def _stop_mode(self, keep_camera):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=STOP_TIMEOUT)
+            self._thread = None
+            self.mode    = None
+        if not keep_camera and self.camera is not None:
+            self.camera.stop()
+            self.camera = None
+
+    def status(self) -> dict:
+        return {
+            "mode":        self.mode if self.running else None,
+            "running":     self.running,
+            "camera_open": self.camera is not None,
+            "preload_ms":  self.preload_ms,
+            "uptime_s":    time.time() - self.started,
+        }
+
+    def handle(self, req: dict) -> dict:
+        cmd = req.get("cmd")
+        try:
+            if cmd in ("start", "switch"):
+                return {"ok": True, "elapsed_ms": self.start(req.get("mode")), **self.status()}
+            if cmd == "stop":
+                return {"ok": True, "elapsed_ms": self.stop(), **self.status()}
+            if cmd == "status":
+                return {"ok": True, **self.status()}
+            if cmd == "telemetry":
+                from utils.telemetry import snapshot
+                return {"ok": True, **snapshot()}
+            if cmd == "shutdown":
+                self.stop()
+                return {"ok": True, "shutdown": True}
+            return {"ok": False, "error": f"Unknown command '{cmd}'"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    def serve(self, address=ENGINE_ADDRESS):
+        """Answer requests one connection at a time until "shutdown"."""
+        with Listener(address, authkey=_authkey(create=True)) as listener:
+            log_event("engine_ready", f"{address[0]}:{address[1]}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, OSError):
+                    continue
+                with conn:
+                    try:
+                        reply = self.handle(conn.recv())
+                        conn.send(reply)
+                    except (EOFError, OSError):
+                        continue
+                if reply.get("shutdown"):
+                    break
+
+
+class EngineClient:
+    """GUI-side handle on the engine process."""
+
+    def __init__(self, address=ENGINE_ADDRESS):
+        self.address = address
+
+    def request(self, cmd: str, **args) -> dict:
+        """Send one command; raises OSError if the engine is not reachable."""
+        try:
+            key = _authkey()
+        except OSError as e:
+            raise ConnectionRefusedError("NAC engine has never run") from e
+        try:
+            with Client(self.address, authkey=key) as conn:
+                conn.send(dict(cmd=cmd, **args))
+                return conn.recv()
+        except (EOFError, AuthenticationError) as e:
+            raise ConnectionError(f"NAC engine did not answer: {e}") from e
+
+    def available(self) -> bool:
+        try:
+            return self.request("status").get("ok", False)
+        except OSError:
+            return False
+
+    def spawn(self):
+        """Start an engine process in the background (returns immediately)."""
+        return subprocess.Popen([sys.executable, os.path.abspath(__file__)])
+
+    def ensure_running(self, timeout: float = 60.0) -> bool:
+        """Spawn the engine if needed and wait until it answers."""
+        if self.available():
+            return True
+        self.spawn()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.available():
+                return True
+            time.sleep(0.1)
+        return False
+
+    def start(self, mode: str) -> dict:
+        return self.request("start", mode=mode)
+
+    def stop(self) -> dict:
+        return self.request("stop")
+
+    def status(self) -> dict:
+        return self.request("status")
+
+    def telemetry(self) -> dict:
+        return self.request("telemetry")
+
+    def shutdown(self) -> dict:
+        return self.request("shutdown")
+
+
+def main():
+    engine = NacEngine()
+    engine.preload()
+    engine.serve()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import multiprocessing as mp
+import time
+from collections import namedtuple
+from queue import Empty
+
+from utils.shm_frames import SharedFrameRing
+from utils.landmarks import hands_from_result, face_from_result, gaze_point, compact_hand
+from utils.roi import RoiTracker
+from utils.governor import FrameGovernor
+
+# What a worker sends back: which pipeline, the frame it came from and a
+# compact payload (no images, no protobufs).
+#   gesture: [(label, utils.landmarks.compact_hand list), ...]
+#   eye:     (nx, ny) normalized iris centre, or None if no face
+WorkerResult = namedtuple("WorkerResult", ["source", "seq", "timestamp", "payload"])
+
+# Workers are spawned, not forked: by the time the pool starts, the parent
+# runs the capture, logger and TTS threads (and, in the engine, holds
+# preloaded MediaPipe graphs), and a fork copies any lock one of them holds.
+MP_CONTEXT = mp.get_context("spawn")
+
+
+# ─── Worker process bodies ─────────────────────────────────────────────────
+def hands_worker(spec, results, stop, settings):
+    import mediapipe as mp_
+    ring  = SharedFrameRing.attach(spec)
+    roi   = RoiTracker("hands").configure(settings)
+    gov   = FrameGovernor().configure(settings)
+    hands = mp_.solutions.hands.Hands(
+        max_num_hands=2,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+    last = 0
+    while gov.wait(stop):
+        got = ring.wait_newer(last)
+        if got is None:
+            continue
+        last, ts, rgb = got
+        res = roi.process(hands, rgb)
+        gov.update(bool(res.multi_hand_landmarks), ts)
+        if not ring.valid(last):
+            continue  # slot was overwritten during inference
+        payload = [(label, compact_hand(lms)) for label, lms in hands_from_result(res)]
+        results.put(("gesture", last, ts, payload))
+    ring.close()
+
+def face_worker(spec, results, stop, settings):
+    import mediapipe as mp_
+    ring = SharedFrameRing.attach(spec)
+    roi  = RoiTracker("face").configure(settings)
+    gov  = FrameGovernor().configure(settings)
+    mesh = mp_.solutions.face_mesh.FaceMesh(refine_landmarks=True)
+    last = 0
+    while gov.wait(stop):
+        got = ring.wait_newer(last)
+        if got is None:
+            continue
+        last, ts, rgb = got
+        res = roi.process(mesh, rgb)
+        gov.update(bool(res.multi_face_landmarks), ts)
+        if not ring.valid(last):
+            continue  # slot was overwritten during inference
+        iris = face_from_result(res)
+        results.put(("eye", last, ts, None if iris is None else gaze_point(iris)))
+    ring.close()
+
+
+# ─── Parent-side pool ──────────────────────────────────────────────────────
+class VisionWorkerPool:
+    """
+    Runs the Hands and FaceMesh pipelines in separate processes. The camera
+    (a FrameProducer created with shared=True) writes each frame straight
+    into a shared-memory ring that the workers read in place; they send
+    back compact results that get() hands to the caller. Workers are
+    spawned (MP_CONTEXT), so each imports MediaPipe afresh. The "roi_*" and
+    governor keys of `settings` (see utils.roi, utils.governor) are read
+    once, when the workers start.
+    """
+
+    WORKERS = {"gesture": hands_worker, "eye": face_worker}
+
+    def __init__(self, camera, settings=None):
+        if not getattr(camera, "shared", False):
+            # without a shared-memory ring the workers would never get a frame
+            raise ValueError("VisionWorkerPool needs a FrameProducer created with shared=True")
+        self.camera   = camera
+        self.settings = dict(settings or {})
+        self.results  = MP_CONTEXT.Queue()
+        self._stop    = MP_CONTEXT.Event()
+        self._procs   = []
+        self._counts  = {}   # source -> [results, first_time, last_time, latency_sum]
+
+    def start(self):
+        # the ring is sized by the first frame
+        frames = self.camera.subscribe()
+        while self.camera.ring is None and self.camera.running:
+            frames.read()
+        if self.camera.ring is None:
+            return
+        spec = self.camera.ring.spec()
+        for name, target in self.WORKERS.items():
+            proc = MP_CONTEXT.Process(target=target, name=f"nac-{name}",
+                              args=(spec, self.results, self._stop, self.settings),
+                              daemon=True)
+            proc.start()
+            self._procs.append(proc)
+
+    def get(self, timeout=0.1):
+        """Next WorkerResult, or None."""
+        try:
+            src, seq, ts, payload = self.results.get(timeout=timeout)
+        except Empty:
+            return None
+        now = time.monotonic()
+        c = self._counts.setdefault(src, [0, now, now, 0.0])
+        c[0] += 1
+        c[2]  = now
+        c[3] += now - ts
+        return WorkerResult(src, seq, ts, payload)
+
+    def stop(self):
+        self._stop.set()
+        for proc in self._procs:
+            proc.join(timeout=2.0)
+            if proc.is_alive():
+                proc.terminate()
+
+    def stats(self) -> dict:
+        """Per-pipeline throughput and capture-to-result latency."""
+        out = {}
+        for src, (n, first, last, lat) in self._counts.items():
+            span = last - first
+            out[src] = {
+                "results":         n,
+                "fps":             (n - 1) / span if span > 0 else 0.0,
+                "mean_latency_ms": lat / n * 1000 if n else 0.0,
+            }
+        return out
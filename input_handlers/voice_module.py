@@ -7,111 +7,140 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 # ────────────────────────────────────────────────────────────────────────────
 
-import speech_recognition as sr
-import pyttsx3
 import subprocess
 import webbrowser
 import datetime
-from config.profile_manager import get_profile
+from config.profile_manager import get_profile, ProfileWatcher
+from utils.logger import log_event
+from utils.display import stop_on_signals
+from utils.speech import create_listener
+from utils.tts import get_speech
+from utils.commands import compile_commands
+from utils.macros import compile_macros, get_macro_runner
+from utils.telemetry import stage_timer
 
-# Load settings
-settings = get_profile("default")
-# Example codes: "en-US", "hi-IN"
-LANGUAGE = settings.get("language", "en-US")
-# Derive base language code for easier checks: "en" or "hi"
-BASE_LANG = LANGUAGE.split("-")[0]
+# Load settings (re-applied by the profile watcher while running)
+def apply_settings(new: dict):
+    global settings, LANGUAGE, BASE_LANG, COMMANDS, MACROS
+    settings = new
+    # Example codes: "en-US", "hi-IN"
+    LANGUAGE = settings.get("language", "en-US")
+    # Derive base language code for easier checks: "en" or "hi"
+    BASE_LANG = LANGUAGE.split("-")[0]
+    # Spoken commands for this language, the profile's macros first
+    # (see utils.commands and utils.macros)
+    MACROS   = compile_macros(settings)
+    COMMANDS = compile_commands(settings, MACROS.commands)
 
-# Initialize TTS engine
-engine = pyttsx3.init()
+apply_settings(get_profile("default"))
+
+# Speech output runs on its own worker thread
+speech = get_speech(settings)
+REPLIES = {
+    "en": {
+        "greeting":     "NAC Voice Module activated.",
+        "open_chrome":  "Opening Google Chrome.",
+        "open_notepad": "Opening Notepad.",
+        "search":       "Searching for {term}.",
+        "time":         "The current time is {now}.",
+        "exit":         "Goodbye!",
+        "unknown":      "Sorry, I don't understand that command.",
+    },
+    "hi": {
+        "greeting":     "एनएसी वॉयस मॉड्यूल सक्रिय है।",
+        "open_chrome":  "क्रोम खोल रहा हूँ।",
+        "open_notepad": "नोटपैड खोल रहा हूँ।",
+        "search":       "{term} के लिए खोज रहा हूँ।",
+        "time":         "वर्तमान समय है {now}।",
+        "exit":         "अलविदा!",
+        "unknown":      "माफ़ कीजिए, मैं वह कमांड नहीं समझा।",
+    },
+}
+
+def reply(key: str, **values) -> str:
+    return REPLIES.get(BASE_LANG, REPLIES["en"])[key].format(**values)
+
+def fixed_replies() -> list:
+    """This language's replies without placeholders, for the speech cache."""
+    return [text for text in REPLIES.get(BASE_LANG, REPLIES["en"]).values() if "{" not in text]
 
 def speak(text: str):
-    engine.say(text)
-    engine.runAndWait()
-
-def listen() -> str:
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        print(f"Listening ({LANGUAGE})…")
-        recognizer.pause_threshold = 0.8
-        audio = recognizer.listen(source, timeout=5, phrase_time_limit=5)
-    try:
-        query = recognizer.recognize_google(audio, language=LANGUAGE)
-        print(f"Recognized: {query}")
-        return query.lower().strip()
-    except sr.UnknownValueError:
-        print("Could not understand audio")
-        return ""
-    except sr.RequestError as e:
-        print(f"API error: {e}")
-        return ""
+    """Start saying `text` (interrupting older replies) and return at once."""
+    speech.say(text)
+
+# ─── Command actions (by registry name) ─────────────────────────────────────
+def open_chrome(slots):
+    subprocess.Popen(["chrome"])
+    speak(reply("open_chrome"))
+
+def open_notepad(slots):
+    subprocess.Popen(["notepad"])
+    speak(reply("open_notepad"))
+
+def search(slots):
+    term = slots["term"]
+    webbrowser.open(f"https://www.google.com/search?q={term}")
+    speak(reply("search", term=term))
+
+def tell_time(slots):
+    now = datetime.datetime.now().strftime("%I:%M %p")
+    speak(reply("time", now=now))
+
+def goodbye(slots):
+    # let the goodbye finish (a few seconds at most) before exiting
+    speech.say(reply("exit"))
+    speech.wait(timeout=3.0)
+    sys.exit(0)
+
+ACTIONS = {
+    "open_chrome":  open_chrome,
+    "open_notepad": open_notepad,
+    "search":       search,
+    "time":         tell_time,
+    "exit":         goodbye,
+}
 
 def handle_command(cmd: str):
     if not cmd:
         return
+    match = COMMANDS.match(cmd)
+    if match is None:
+        speak(reply("unknown"))
+        return
+    # built-ins run here; macros are queued for the macro runner
+    action = ACTIONS.get(match.name) or MACROS.actions[match.name]
+    action(match.slots)
 
-    # English commands
-    if BASE_LANG == "en":
-        if "open chrome" in cmd:
-            subprocess.Popen(["chrome"])
-            speak("Opening Google Chrome.")
-        elif "open notepad" in cmd:
-            subprocess.Popen(["notepad"])
-            speak("Opening Notepad.")
-        elif cmd.startswith("search "):
-            term = cmd.replace("search ", "", 1).strip()
-            webbrowser.open(f"https://www.google.com/search?q={term}")
-            speak(f"Searching for {term}.")
-        elif "time" in cmd:
-            now = datetime.datetime.now().strftime("%I:%M %p")
-            speak(f"The current time is {now}.")
-        elif any(word in cmd for word in ("exit", "quit", "close")):
-            speak("Goodbye!")
-            sys.exit(0)
-        else:
-            speak("Sorry, I don't understand that command.")
-
-    # Hindi commands
-    elif BASE_LANG == "hi":
-        # Chrome
-        if "क्रोम" in cmd and ("खोलो" in cmd or "खोलें" in cmd):
-            subprocess.Popen(["chrome"])
-            speak("क्रोम खोल रहा हूँ।")
-        # Notepad
-        elif "नोटपैड" in cmd and ("खोलो" in cmd or "खोलें" in cmd):
-            subprocess.Popen(["notepad"])
-            speak("नोटपैड खोल रहा हूँ।")
-        # Search
-        elif cmd.startswith("खोजो") or cmd.startswith("खोजें") or cmd.startswith("खोज "):
-            # strip any of the Hindi search keywords
-            term = cmd
-            for kw in ("खोजो", "खोजें", "खोज"):
-                if term.startswith(kw):
-                    term = term.replace(kw, "", 1).strip()
-                    break
-            webbrowser.open(f"https://www.google.com/search?q={term}")
-            speak(f"{term} के लिए खोज रहा हूँ।")
-        # Time
-        elif "समय" in cmd:
-            now = datetime.datetime.now().strftime("%I:%M %p")
-            speak(f"वर्तमान समय है {now}।")
-        # Exit
-        elif any(phrase in cmd for phrase in ("बाहर निकलो", "बंद करो", "बाहर निकलें")):
-            speak("अलविदा!")
-            sys.exit(0)
-        else:
-            speak("माफ़ कीजिए, मैं वह कमांड नहीं समझा।")
-
-def main():
+def main(stop_event=None):
+    speech.prerender(fixed_replies())
     # Initial greeting
-    if BASE_LANG == "en":
-        speak("NAC Voice Module activated.")
-    else:
-        speak("एनएसी वॉयस मॉड्यूल सक्रिय है।")
+    speak(reply("greeting"))
 
-    while True:
-        command = listen()
-        handle_command(command)
+    watcher  = ProfileWatcher("default", current=settings)
+    # one microphone stream for the whole session; commands fire on the
+    # first hypothesis that holds one, often before the speaker stops;
+    # deaf while a reply plays, so NAC never hears its own voice
+    listener = create_listener(settings, timer=stage_timer("voice"), mute=speech.is_speaking)
+    print(f"Listening ({LANGUAGE})…")
+    try:
+        for hyp in listener.hypotheses(stop_event):
+            changed = watcher.poll()
+            if changed:
+                apply_settings(changed)
+                listener.configure(settings)
+                log_event("profile_reload", "voice_module")
+            if hyp.final or COMMANDS.ready(hyp.text):
+                if not hyp.final:
+                    listener.skip()
+                print(f"Recognized: {hyp.text}")
+                handle_command(hyp.text)
+    finally:
+        listener.close()
+        get_macro_runner().cancel()
+        log_event("speech_stats", str(listener.stats()))
+        log_event("macro_stats", str(get_macro_runner().stats()))
 
 if __name__ == "__main__":
-    main()
-    input("Press Enter to exit…")
+    main(stop_event=stop_on_signals())
+    if "--headless" not in sys.argv:
+        input("Press Enter to exit…")
@@ -0,0 +1,200 @@
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from utils.telemetry import stage_timer
+
+# One captured frame: sequence number, capture time (time.monotonic()),
+# the mirrored BGR image and its RGB conversion. Both arrays are views into
+# the producer's preallocated ring and are shared by all consumers: treat
+# them as read-only, and use FrameProducer.valid(frame) if you hold on to
+# one long enough for the ring to wrap around.
+Frame = namedtuple("Frame", ["seq", "timestamp", "bgr", "rgb"])
+
+
+class FrameProducer:
+    """
+    Owns the single camera handle. A background thread reads each frame,
+    flips and converts it once into a ring of `slots` preallocated buffers,
+    and publishes it to every subscriber. No image memory is allocated per
+    frame once the first frame has sized the ring.
+
+    With shared=True the RGB slots live in a SharedFrameRing (see
+    utils.shm_frames), so worker processes can read them without copying;
+    `ring` is available once the first frame has arrived.
+    """
+
+    def __init__(self, device=0, slots=4, shared=False):
+        self.device   = device
+        self.slots    = slots
+        self.shared   = shared
+        self.cap      = None
+        self.ring     = None
+        self._raw     = None
+        self._bgr     = None
+        self._rgb     = None
+        self._slot_seq = [0] * slots
+        self._cond    = threading.Condition()
+        self._latest  = None
+        self._seq     = 0
+        self._stop    = threading.Event()
+        self._thread  = None
+
+    def start(self):
+        """Open the camera and start the capture thread (idempotent)."""
+        if self._thread is not None:
+            return self
+        # a device index / file name, or a ready capture object (e.g. ReplayCapture)
+        if isinstance(self.device, (int, str)):
+            self.cap = cv2.VideoCapture(self.device)
+        else:
+            self.cap = self.device
+        # keep the driver queue short; the grab thread drains it anyway
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the capture thread and release the camera."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stop.is_set()
+
+    def frame_size(self):
+        """Return (width, height) as reported by the camera."""
+        if self.cap is None:
+            return 0, 0
+        return (self.cap.get(cv2.CAP_PROP_FRAME_WIDTH),
+                self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    def subscribe(self):
+        """Return a new consumer handle on this producer."""
+        return FrameSubscriber(self)
+
+    def valid(self, frame) -> bool:
+        """True while `frame`'s ring slot has not been overwritten."""
+        return self._slot_seq[frame.seq % self.slots] == frame.seq
+
+    def _allocate(self, shape):
+        h, w = shape[:2]
+        self._bgr = np.empty((self.slots, h, w, 3), dtype=np.uint8)
+        if self.shared:
+            from utils.shm_frames import SharedFrameRing
+            self.ring = SharedFrameRing((h, w, 3), self.slots)
+            self._rgb = self.ring.frames
+        else:
+            self._rgb = np.empty_like(self._bgr)
+
+    def _run(self):
+        timer = stage_timer("camera")
+        while not self._stop.is_set():
+            timer.start()
+            ret, raw = self.cap.read(self._raw)
+            if not ret:
+                time.sleep(0.01)
+                continue
+            ts = time.monotonic()
+            timer.lap("grab")
+            if self._bgr is None:
+                self._allocate(raw.shape)
+            self._raw = raw
+
+            seq = self._seq + 1
+            i   = seq % self.slots
+            self._slot_seq[i] = 0
+            rgb_dst = self.ring.slot_for_write(seq) if self.ring is not None else self._rgb[i]
+            bgr = cv2.flip(raw, 1, dst=self._bgr[i])
+            rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=rgb_dst)
+            self._slot_seq[i] = seq
+            if self.ring is not None:
+                self.ring.publish(seq, ts)
+            timer.lap("convert")
+
+            with self._cond:
+                self._seq    = seq
+                self._latest = Frame(seq, ts, bgr, rgb)
+                self._cond.notify_all()
+            timer.frame()
+        self.cap.release()
+        if self.ring is not None:
+            self.ring.close()
+
+    def _wait_newer(self, seq, timeout):
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._stop.is_set()
+                or (self._latest is not None and self._latest.seq > seq),
+                timeout=timeout
+            )
+            if self._latest is not None and self._latest.seq > seq:
+                return self._latest
+            return None
+
+
+class FrameSubscriber:
+    """
+    A consumer's view of a FrameProducer. Each read() returns the newest
+    frame not yet seen by this subscriber, so slow consumers never work on
+    stale frames. `skipped` counts the frames that were published in
+    between and dropped; `last_age` is how old (seconds) the frame was
+    when handed out.
+    """
+
+    def __init__(self, producer):
+        self.producer  = producer
+        self.last_seq  = 0
+        self.skipped   = 0
+        self.processed = 0
+        self.last_age  = 0.0
+        self.max_age   = 0.0
+        self._age_sum  = 0.0
+        self._first_t  = None
+        self._last_t   = None
+
+    def read(self, timeout=0.5):
+        """Block until a new frame arrives; return it, or None on timeout/stop."""
+        frame = self.producer._wait_newer(self.last_seq, timeout)
+        if frame is None:
+            return None
+        if self.last_seq:
+            self.skipped += frame.seq - self.last_seq - 1
+        now = time.monotonic()
+        if self._first_t is None:
+            self._first_t = now
+        self._last_t    = now
+        self.last_seq   = frame.seq
+        self.processed += 1
+        self.last_age   = now - frame.timestamp
+        self.max_age    = max(self.max_age, self.last_age)
+        self._age_sum  += self.last_age
+        return frame
+
+    def stats(self) -> dict:
+        """Throughput, drop and frame-age counters for this subscriber."""
+        n = self.processed
+        span = (self._last_t - self._first_t) if n > 1 else 0.0
+        return {
+            "processed":   n,
+            "fps":         (n - 1) / span if span > 0 else 0.0,
+            "dropped":     self.skipped,
+            "drop_ratio":  self.skipped / (n + self.skipped) if n else 0.0,
+            "last_age_ms": self.last_age * 1000,
+            "mean_age_ms": self._age_sum / n * 1000 if n else 0.0,
+            "max_age_ms":  self.max_age * 1000,
+        }
+
+    def overlay_text(self) -> str:
+        """Short status line for drawing onto a debug preview."""
+        return f"dropped {self.skipped}  age {self.last_age * 1000:.0f} ms"
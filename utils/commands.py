@@ -0,0 +1,202 @@
+"""
+Voice command registry, shared by voice_module and combined_module.
+
+Commands are declared once, as phrases per language; a phrase is a few
+keywords plus at most one slot at its start or end that captures the
+rest of the utterance:
+
+    "search": {"en": ["search {term}", "search for {term}", "google {term}"],
+               "hi": ["खोजो {term}", "खोजें {term}", "खोज {term}"]}
+
+compile_commands() turns the registry into a CommandIndex for one
+language (English phrases are always included, since Hindi speakers mix
+them in). Each phrase is filed under its rarest keyword only, so an
+utterance is checked against the few phrases anchored on its own words
+rather than against every command, and the cost of match() stays flat
+as commands are added. Recognizer misspellings are matched fuzzily: a
+word not in the vocabulary is compared with the vocabulary words that
+start with the same letter and have a similar length, and the result is
+remembered.
+
+A phrase matches when all its keywords occur in the utterance (in any
+order, with other words around them). Of several matches the one
+covering the most words wins (keywords, weighted by their similarity,
+plus slot words), then the one with more keywords, then the one
+registered first. Commands in EXACT_COMMANDS (exit) only match on
+keywords heard exactly, never on fuzzy lookups.
+
+ready() decides whether a partial hypothesis may fire before the final
+one. It waits while the match could still grow into another command's
+phrase: one whose keywords start with the matched ones ("open chrome"
+→ "open chrome incognito"), or that takes a slot after them.
+
+Profile key: "command_match_cutoff" (0–1, default 0.8; 1 disables
+fuzzy matching).
+"""
+import re
+import difflib
+import unicodedata
+from collections import namedtuple
+
+DEFAULT_CUTOFF = 0.8    # minimum similarity for a fuzzy keyword match
+FUZZY_CACHE    = 4096   # remembered fuzzy lookups per index
+EXACT_COMMANDS = frozenset({"exit"})   # too costly to trigger on a misheard word
+
+# name → {language: [phrase, ...]}; earlier entries win ties
+BUILTIN_COMMANDS = {
+    "open_chrome":  {"en": ["open chrome", "open google chrome", "launch chrome"],
+                     "hi": ["क्रोम खोलो", "क्रोम खोलें"]},
+    "open_notepad": {"en": ["open notepad", "launch notepad"],
+                     "hi": ["नोटपैड खोलो", "नोटपैड खोलें"]},
+    "search":       {"en": ["search {term}", "search for {term}", "google {term}"],
+                     "hi": ["खोजो {term}", "खोजें {term}", "खोज {term}", "{term} खोजो"]},
+    "time":         {"en": ["time", "what time is it"],
+                     "hi": ["समय", "कितने बजे हैं"]},
+    "exit":         {"en": ["exit", "quit"],
+                     "hi": ["बाहर निकलो", "बाहर निकलें"]},
+}
+
+Match  = namedtuple("Match", ["name", "slots", "score", "complete"])
+Phrase = namedtuple("Phrase", ["name", "keywords", "slot", "trailing", "order"])
+
+_SLOT  = re.compile(r"^\{(\w+)\}$")
+# words: letters/digits plus the Devanagari block minus its dandas (।, ॥)
+_WORD  = re.compile(r"[\w\u0900-\u0963\u0966-\u097f]+(?:['’]\w+)*")
+
+
+def tokenize(text: str) -> list:
+    """Lower-case words of `text`, punctuation (including the danda) dropped."""
+    return _WORD.findall(unicodedata.normalize("NFC", text.lower()))
+
+
+class CommandIndex:
+    """The compiled registry for one language; build it with compile_commands()."""
+
+    def __init__(self, commands: dict, languages, cutoff=DEFAULT_CUTOFF, exact=()):
+        self.cutoff   = cutoff
+        self.exact    = frozenset(exact)
+        self.phrases  = []
+        self._anchors = {}     # keyword → phrases anchored on it
+        self._vocab   = set()  # every keyword
+        self._buckets = {}     # first letter → vocabulary words
+        self._fuzzy   = {}     # unknown word → (keyword, similarity) or None
+        self.lookups  = {"exact": 0, "fuzzy": 0, "cached": 0, "miss": 0}
+        parsed = []
+        for name, by_lang in commands.items():
+            for lang in languages:
+                for text in by_lang.get(lang, ()):
+                    parsed.append((name, text))
+        # how many phrases use each keyword, to anchor each phrase on its rarest one
+        freq = {}
+        for name, text in parsed:
+            for word in set(tokenize(text)):
+                freq[word] = freq.get(word, 0) + 1
+        for order, (name, text) in enumerate(parsed):
+            words = text.split()
+            slot, trailing = None, False
+            if words and _SLOT.match(words[-1]):
+                slot, trailing, words = _SLOT.match(words[-1]).group(1), True, words[:-1]
+            elif words and _SLOT.match(words[0]):
+                slot, words = _SLOT.match(words[0]).group(1), words[1:]
+            keywords = tuple(dict.fromkeys(tokenize(" ".join(words))))
+            if not keywords:
+                raise ValueError(f"command '{name}': phrase '{text}' has no keywords")
+            phrase = Phrase(name, keywords, slot, trailing, order)
+            self.phrases.append(phrase)
+            anchor = min(keywords, key=lambda w: (freq[w], -len(w)))
+            self._anchors.setdefault(anchor, []).append(phrase)
+        self._vocab = set(freq)
+        for word in freq:
+            self._buckets.setdefault(word[0], []).append(word)
+        # phrases (by order) another command's phrase extends, see ready()
+        extended = {}          # keyword prefix → names of the phrases extending it
+        for phrase in self.phrases:
+            for i in range(1, len(phrase.keywords) + phrase.trailing):
+                extended.setdefault(phrase.keywords[:i], set()).add(phrase.name)
+        self._open = {p.order for p in self.phrases
+                      if extended.get(p.keywords, set()) - {p.name}}
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def _lookup(self, word):
+        """(keyword, similarity) for an utterance word, or None."""
+        if word in self._vocab:
+            self.lookups["exact"] += 1
+            return word, 1.0
+        if self.cutoff >= 1.0:
+            return None
+        if word in self._fuzzy:
+            self.lookups["cached"] += 1
+            return self._fuzzy[word]
+        best, best_ratio = None, self.cutoff
+        slack = max(1, len(word) // 3)
+        for cand in self._buckets.get(word[0], ()):
+            if abs(len(cand) - len(word)) > slack:
+                continue
+            ratio = difflib.SequenceMatcher(None, word, cand).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = cand, ratio
+        hit = (best, best_ratio) if best is not None else None
+        self.lookups["fuzzy" if hit else "miss"] += 1
+        if len(self._fuzzy) >= FUZZY_CACHE:
+            self._fuzzy.clear()
+        self._fuzzy[word] = hit
+        return hit
+
+    def match(self, text: str):
+        """The best Match for `text`, or None."""
+        words = tokenize(text)
+        found = {}             # keyword → (first position, similarity)
+        for i, word in enumerate(words):
+            hit = self._lookup(word)
+            if hit is not None and hit[0] not in found:
+                found[hit[0]] = (i, hit[1])
+        best, best_key = None, None
+        for anchor in found:
+            for phrase in self._anchors.get(anchor, ()):
+                if not all(k in found for k in phrase.keywords):
+                    continue
+                if phrase.name in self.exact and \
+                   any(found[k][1] < 1.0 for k in phrase.keywords):
+                    continue
+                where = [found[k][0] for k in phrase.keywords]
+                slots, covered = {}, sum(found[k][1] for k in phrase.keywords)
+                if phrase.slot is not None:
+                    rest = words[max(where) + 1:] if phrase.trailing else words[:min(where)]
+                    if not rest:
+                        continue
+                    slots[phrase.slot] = " ".join(rest)
+                    covered += len(rest)
+                key = (covered, len(phrase.keywords), -phrase.order)
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best = Match(phrase.name, slots, round(covered / len(words), 3),
+                                 not phrase.trailing and phrase.order not in self._open)
+        return best
+
+    def ready(self, text: str) -> bool:
+        """
+        Whether a partial hypothesis already holds a whole command: one
+        matches and nothing more is expected (no slot still being spoken,
+        and no other command's longer phrase it could still turn into).
+        """
+        m = self.match(text)
+        return m is not None and m.complete
+
+
+def command_languages(language: str) -> tuple:
+    """Registry languages used for a profile "language" such as "hi-IN"."""
+    base = language.split("-")[0]
+    return (base,) if base == "en" else (base, "en")
+
+def compile_commands(settings: dict, extra: dict = None) -> CommandIndex:
+    """
+    Compile BUILTIN_COMMANDS for the profile's language, after `extra`
+    commands (the profile's macros), which therefore win ties, on partial
+    hypotheses as on final ones.
+    """
+    return CommandIndex(dict(extra or {}, **BUILTIN_COMMANDS),
+                        command_languages(settings.get("language", "en-US")),
+                        float(settings.get("command_match_cutoff", DEFAULT_CUTOFF)),
+                        EXACT_COMMANDS)
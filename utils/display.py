@@ -0,0 +1,110 @@
+"""
+Debug preview windows and headless running for the input modules.
+
+The vision loops never draw or call cv2.imshow/waitKey themselves: they
+offer() frames to a Preview, which copies one only when it is due (at
+"preview_hz", default 10) and draws and shows it on its own thread. With
+a rate of 0, or `--headless` on the command line, no window is created
+at all and the modules are stopped through their stop event instead:
+the warm engine's "stop" command, or SIGINT/SIGTERM when run directly
+(see stop_on_signals()).
+"""
+import signal
+import sys
+import threading
+import time
+
+import cv2
+
+DEFAULT_PREVIEW_HZ = 10
+
+
+def preview_rate(settings: dict, argv=None) -> float:
+    """Preview rate in Hz from the profile; 0 (headless) if `--headless` was given."""
+    argv = sys.argv if argv is None else argv
+    if "--headless" in argv:
+        return 0.0
+    return float(settings.get("preview_hz", DEFAULT_PREVIEW_HZ))
+
+def stop_on_signals(event=None) -> threading.Event:
+    """
+    Set (and return) `event` on SIGINT or SIGTERM instead of raising, so a
+    module run from a shell or a service manager shuts down cleanly.
+    Call from the main thread.
+    """
+    event = event if event is not None else threading.Event()
+
+    def handler(signum, frame):
+        event.set()
+    signal.signal(signal.SIGINT, handler)
+    signal.signal(signal.SIGTERM, handler)
+    return event
+
+
+class Preview:
+    """
+    A debug window shown at `rate` Hz from its own thread. offer() is
+    cheap on the calling loop: it copies the frame only when one is due
+    and leaves drawing (the `draw(image, *args)` callback) and the GUI
+    event loop to the preview thread. Pressing 'q' in the window sets
+    `stop`. rate 0 disables it entirely.
+    """
+
+    def __init__(self, title, rate=DEFAULT_PREVIEW_HZ, stop=None):
+        self.title    = title
+        self.rate     = float(rate)
+        self.stop     = stop
+        self.shown    = 0
+        self._due     = 0.0
+        self._pending = None
+        self._lock    = threading.Lock()
+        self._wake    = threading.Event()
+        self._closed  = False
+        self._thread  = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def offer(self, frame, draw=None, *args):
+        """Hand over the loop's current BGR `frame`; `draw(copy, *args)` annotates it later."""
+        if self.rate <= 0 or self._closed:
+            return
+        now = time.monotonic()
+        if now < self._due:
+            return
+        self._due = now + 1.0 / self.rate
+        with self._lock:
+            self._pending = (frame.copy(), draw, args)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nac-preview", daemon=True)
+            self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        opened = False
+        while not self._closed:
+            self._wake.wait(1.0 / self.rate)
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, None
+            if pending is not None:
+                image, draw, args = pending
+                if draw is not None:
+                    draw(image, *args)
+                cv2.imshow(self.title, image)
+                opened = True
+                self.shown += 1
+            if opened and cv2.waitKey(1) & 0xFF == ord('q') and self.stop is not None:
+                self.stop.set()
+        if opened:
+            cv2.destroyWindow(self.title)
+            cv2.waitKey(1)
+
+    def close(self):
+        """Stop the preview thread and close its window."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+from queue import Empty
+
+# Lower number = served first. Unknown sources go last.
+DEFAULT_PRIORITIES = {"voice": 0, "gesture": 1, "eye": 2}
+
+
+class _SourceStats:
+    """Delivery counters and a window of recent queue latencies for one source."""
+
+    def __init__(self, window=256):
+        self.delivered  = 0
+        self.suppressed = 0
+        self.max_age    = 0.0
+        self._age_sum   = 0.0
+        self._recent    = deque(maxlen=window)
+
+    def record(self, age):
+        self.delivered += 1
+        self.max_age    = max(self.max_age, age)
+        self._age_sum  += age
+        self._recent.append(age)
+
+    def as_dict(self) -> dict:
+        n = self.delivered
+        recent = sorted(self._recent)
+        p95 = recent[int(0.95 * (len(recent) - 1))] if recent else 0.0
+        return {
+            "delivered":   n,
+            "suppressed":  self.suppressed,
+            "mean_age_ms": self._age_sum / n * 1000 if n else 0.0,
+            "p95_age_ms":  p95 * 1000,
+            "max_age_ms":  self.max_age * 1000,
+        }
+
+
+class EventBus:
+    """
+    Bounded, coalescing, priority-aware replacement for queue.Queue between
+    the input threads and the dispatcher. Items are (source, event) tuples.
+
+    - get() always serves the highest-priority source with pending work,
+      so a voice command or gesture click jumps ahead of queued eye moves.
+    - "move" events: only the latest pending move per source is kept; a new
+      move overwrites the queued one in place.
+    - "scroll" events: consecutive scrolls from the same source are merged
+      by summing their amounts.
+    - everything else (clicks, voice commands) is never dropped.
+    - hold_off(src, seconds) suppresses moves from `src` for a while (used
+      to mute the eye cursor while a hand is being tracked).
+
+    `maxsize` bounds the lossy events: when the bus is full, the oldest
+    move/scroll of the lowest-priority source is discarded to make room,
+    or the new event itself if everything queued outranks it.
+    """
+
+    LOSSY = ("move", "scroll")
+
+    def __init__(self, maxsize=64, priorities=None):
+        self.maxsize    = maxsize
+        self.priorities = dict(priorities or DEFAULT_PRIORITIES)
+        self._lowest    = max(self.priorities.values(), default=0) + 1
+        self._cond      = threading.Condition()
+        self._levels    = {}       # priority -> deque of [src, evt, enqueue_time]
+        self._moves     = {}       # src -> pending move entry
+        self._holdoff   = {}       # src -> monotonic time until which moves are muted
+        self._size      = 0
+        self._sources   = {}       # src -> _SourceStats
+        self.coalesced  = 0
+        self.dropped    = 0
+        self.max_depth  = 0
+
+    @staticmethod
+    def _kind(evt):
+        return evt.get("type") if isinstance(evt, dict) else None
+
+    def _priority(self, src):
+        return self.priorities.get(src, self._lowest)
+
+    def _stats_for(self, src):
+        if src not in self._sources:
+            self._sources[src] = _SourceStats()
+        return self._sources[src]
+
+    def hold_off(self, src, seconds):
+        """Discard moves from `src` (queued and new) for the next `seconds`."""
+        with self._cond:
+            self._holdoff[src] = time.monotonic() + seconds
+            entry = self._moves.pop(src, None)
+            if entry is not None:
+                self._levels[self._priority(src)].remove(entry)
+                self._size -= 1
+                self._stats_for(src).suppressed += 1
+
+    def put(self, item):
+        src, evt = item
+        kind = self._kind(evt)
+        now  = time.monotonic()
+        with self._cond:
+            if kind == "move" and now < self._holdoff.get(src, 0.0):
+                self._stats_for(src).suppressed += 1
+                return
+            if kind == "move" and src in self._moves:
+                entry = self._moves[src]
+                entry[1], entry[2] = evt, now
+                self.coalesced += 1
+                return
+            level = self._levels.setdefault(self._priority(src), deque())
+            if kind == "scroll" and level:
+                tail = level[-1]
+                if tail[0] == src and self._kind(tail[1]) == "scroll":
+                    tail[1] = dict(tail[1], amount=tail[1]["amount"] + evt["amount"])
+                    self.coalesced += 1
+                    return
+            if kind in self.LOSSY and self._size >= self.maxsize:
+                if not self._drop_lossy(self._priority(src)):
+                    self.dropped += 1
+                    return
+            entry = [src, evt, now]
+            level.append(entry)
+            self._size += 1
+            if kind == "move":
+                self._moves[src] = entry
+            self.max_depth = max(self.max_depth, self._size)
+            self._cond.notify()
+
+    def _drop_lossy(self, min_prio) -> bool:
+        """
+        Evict the oldest move/scroll, starting from the lowest priority and
+        never touching sources that outrank `min_prio`.
+        """
+        for prio in sorted((p for p in self._levels if p >= min_prio), reverse=True):
+            level = self._levels[prio]
+            for entry in level:
+                if self._kind(entry[1]) in self.LOSSY:
+                    level.remove(entry)
+                    self._size -= 1
+                    self._forget_move(entry)
+                    self.dropped += 1
+                    return True
+        return False
+
+    def _forget_move(self, entry):
+        if self._moves.get(entry[0]) is entry:
+            del self._moves[entry[0]]
+
+    def get(self, timeout=None):
+        """Pop the highest-priority (source, event); raise queue.Empty on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size, timeout=timeout):
+                raise Empty
+            prio  = min(p for p, level in self._levels.items() if level)
+            entry = self._levels[prio].popleft()
+            self._size -= 1
+            self._forget_move(entry)
+            self._stats_for(entry[0]).record(time.monotonic() - entry[2])
+            return entry[0], entry[1]
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._size
+
+    def stats(self) -> dict:
+        """Depth, coalescing and per-source queue-latency counters."""
+        with self._cond:
+            return {
+                "depth":     self._size,
+                "max_depth": self.max_depth,
+                "coalesced": self.coalesced,
+                "dropped":   self.dropped,
+                "sources":   {s: st.as_dict() for s, st in self._sources.items()},
+            }
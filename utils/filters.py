@@ -0,0 +1,263 @@
+"""
+Streaming smoothing filters for cursor positions, each O(1) per update.
+
+    average   moving average over the last `window` samples (running sum)
+    ema       exponential moving average with a fixed `alpha`
+    one_euro  One Euro filter: an EMA whose cutoff rises with speed, so the
+              cursor is steady when held still and lags little when moved
+    kalman    constant-velocity / constant-acceleration Kalman filter that
+              can also predict where the cursor is *now*
+    none      pass-through
+
+All take and return (x, y) and the frame's capture timestamp in seconds
+(One Euro and Kalman use it). Filters with `predicts` set also offer
+predict(now): the position extrapolated from the last frame to `now`
+(plus the configured horizon), which hides camera + inference latency.
+
+Filters are chosen per profile with "<prefix>_filter" plus the parameter
+keys in FILTER_PARAMS, e.g. "eye_filter": "one_euro" and "eye_beta": 5.0;
+see make_filter().
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+
+class PassThrough:
+    name     = "none"
+    predicts = False
+
+    def __call__(self, x, y, t=None):
+        return x, y
+
+    def reset(self):
+        pass
+
+
+class MovingAverage:
+    """Mean of the last `window` points, kept as a running sum."""
+    name     = "average"
+    predicts = False
+
+    def __init__(self, window=5):
+        self.window = max(1, int(window))
+        self.reset()
+
+    def __call__(self, x, y, t=None):
+        pts = self._pts
+        if len(pts) == self.window:
+            ox, oy = pts[0]
+            self._sx -= ox
+            self._sy -= oy
+        pts.append((x, y))
+        self._sx += x
+        self._sy += y
+        n = len(pts)
+        return self._sx / n, self._sy / n
+
+    def reset(self):
+        self._pts = deque(maxlen=self.window)
+        self._sx  = 0.0
+        self._sy  = 0.0
+
+
+class ExponentialFilter:
+    """y ← y + alpha·(x − y); alpha=1 is no smoothing."""
+    name     = "ema"
+    predicts = False
+
+    def __init__(self, alpha=0.5):
+        self.alpha = min(1.0, max(1e-3, float(alpha)))
+        self.reset()
+
+    def __call__(self, x, y, t=None):
+        if self._x is None:
+            self._x, self._y = x, y
+        else:
+            a = self.alpha
+            self._x += a * (x - self._x)
+            self._y += a * (y - self._y)
+        return self._x, self._y
+
+    def reset(self):
+        self._x = self._y = None
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al., CHI 2012) on both axes. `min_cutoff`
+    (Hz) sets smoothing at rest, `beta` how fast the cutoff grows with
+    speed, `d_cutoff` (Hz) the smoothing of the speed estimate. Units of
+    `beta` follow the coordinates: these defaults suit normalized [0, 1]
+    positions.
+    """
+    name     = "one_euro"
+    predicts = False
+
+    def __init__(self, min_cutoff=1.0, beta=5.0, d_cutoff=1.0, rate=30.0):
+        self.min_cutoff = float(min_cutoff)
+        self.beta       = float(beta)
+        self.d_cutoff   = float(d_cutoff)
+        self.rate       = float(rate)   # assumed when timestamps don't advance
+        self.reset()
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x, y, t=None):
+        if self._x is None:
+            self._x, self._y, self._t = x, y, t
+            return x, y
+        dt = t - self._t if t is not None and self._t is not None else 0.0
+        if dt <= 0:
+            dt = 1.0 / self.rate
+        self._t = t
+
+        a_d = self._alpha(self.d_cutoff, dt)
+        self._dx += a_d * ((x - self._x) / dt - self._dx)
+        self._dy += a_d * ((y - self._y) / dt - self._dy)
+        speed  = math.hypot(self._dx, self._dy)
+
+        a = self._alpha(self.min_cutoff + self.beta * speed, dt)
+        self._x += a * (x - self._x)
+        self._y += a * (y - self._y)
+        return self._x, self._y
+
+    def reset(self):
+        self._x = self._y = self._t = None
+        self._dx = self._dy = 0.0
+
+
+class KalmanFilter:
+    """
+    Kalman filter on both axes with a constant-velocity (state: position,
+    velocity) or constant-acceleration (+ acceleration) motion model.
+    `process_noise` is the variance of the unmodelled acceleration (jerk
+    for the acceleration model), `measurement_noise` the landmark noise
+    variance, both in the coordinates' units. Both axes share one covariance, since they use
+    the same model and noise.
+
+    predict(now) extrapolates the last estimate to `now + horizon`, by at
+    most `max_extrapolation` seconds past the last frame, so the cursor
+    freezes rather than drifts when frames stop coming.
+    """
+    name     = "kalman"
+    predicts = True
+
+    def __init__(self, model="velocity", process_noise=10.0, measurement_noise=1e-5,
+                 horizon=0.0, max_extrapolation=0.15, rate=30.0):
+        if model not in ("velocity", "acceleration"):
+            raise ValueError(f"Unknown Kalman model '{model}'")
+        self.order             = 2 if model == "velocity" else 3
+        self.q                 = float(process_noise)
+        self.r                 = float(measurement_noise)
+        self.horizon           = float(horizon)
+        self.max_extrapolation = float(max_extrapolation)
+        self.rate              = float(rate)
+        self.reset()
+
+    def _transition(self, dt):
+        """State transition F and process noise Q for a step of dt seconds."""
+        if self.order == 2:
+            F = np.array([[1.0, dt], [0.0, 1.0]])
+            G = np.array([[dt * dt / 2], [dt]])
+        else:
+            F = np.array([[1.0, dt, dt * dt / 2], [0.0, 1.0, dt], [0.0, 0.0, 1.0]])
+            G = np.array([[dt ** 3 / 6], [dt * dt / 2], [dt]])
+        return F, self.q * (G @ G.T)
+
+    def __call__(self, x, y, t=None):
+        state = self._state
+        if state is None:
+            X = np.zeros((self.order, 2))
+            X[0] = x, y
+            P = np.eye(self.order)
+            P[0, 0] = self.r
+            self._P     = P
+            self._state = (t, X)
+            return x, y
+        t0, X = state
+        dt = t - t0 if t is not None and t0 is not None else 0.0
+        if dt <= 0:
+            dt = 1.0 / self.rate
+
+        # predict to this frame, then correct with the measured position
+        F, Q = self._transition(dt)
+        X = F @ X
+        P = F @ self._P @ F.T + Q
+        K = P[:, 0] / (P[0, 0] + self.r)            # gain (H = [1, 0, ...])
+        X = X + np.outer(K, (x - X[0, 0], y - X[0, 1]))
+        self._P     = P - np.outer(K, P[0])
+        self._state = (t, X)                          # one assignment: safe to read from another thread
+        return float(X[0, 0]), float(X[0, 1])
+
+    def predict(self, now):
+        """Position at `now + horizon` (None before the first frame)."""
+        state = self._state
+        if state is None:
+            return None
+        t0, X = state
+        dt = self.horizon + (now - t0 if t0 is not None else 0.0)
+        dt = min(max(dt, 0.0), self.max_extrapolation)
+        px = X[0, 0] + X[1, 0] * dt
+        py = X[0, 1] + X[1, 1] * dt
+        if self.order == 3:
+            px += X[2, 0] * dt * dt / 2
+            py += X[2, 1] * dt * dt / 2
+        return float(px), float(py)
+
+    def reset(self):
+        self._state = None
+        self._P     = None
+
+
+FILTERS = {
+    "none":     PassThrough,
+    "average":  MovingAverage,
+    "ema":      ExponentialFilter,
+    "one_euro": OneEuroFilter,
+    "kalman":   KalmanFilter,
+}
+
+# constructor argument → profile key suffix and default
+FILTER_PARAMS = {
+    "none":     {},
+    "average":  {"window": ("smoothing", 5)},
+    "ema":      {"alpha": ("ema_alpha", 0.5)},
+    "one_euro": {"min_cutoff": ("min_cutoff", 1.0),
+                 "beta":       ("beta", 5.0),
+                 "d_cutoff":   ("d_cutoff", 1.0)},
+    "kalman":   {"model":             ("kalman_model", "velocity"),
+                 "process_noise":     ("process_noise", 10.0),
+                 "measurement_noise": ("measurement_noise", 1e-5),
+                 "horizon":           ("horizon", 0.0),
+                 "max_extrapolation": ("max_extrapolation", 0.15)},
+}
+
+
+def filter_spec(settings: dict, prefix: str, default: str = "average") -> tuple:
+    """(kind, {arg: value}) for the "<prefix>_..." filter keys in `settings`."""
+    kind = settings.get(f"{prefix}_filter", default)
+    if kind not in FILTERS:
+        raise ValueError(f"Unknown {prefix} filter '{kind}'")
+    args = {
+        arg: settings.get(f"{prefix}_{key}", value)
+        for arg, (key, value) in FILTER_PARAMS[kind].items()
+    }
+    return kind, args
+
+def make_filter(settings: dict, prefix: str, default: str = "average"):
+    """Build the filter the profile selects for `prefix` ("eye", "gesture")."""
+    kind, args = filter_spec(settings, prefix, default)
+    filt = FILTERS[kind](**args)
+    filt.spec = (kind, args)
+    return filt
+
+def refresh_filter(filt, settings: dict, prefix: str, default: str = "average"):
+    """`filt` if the profile still selects it, else a fresh one (after hot reload)."""
+    if getattr(filt, "spec", None) == filter_spec(settings, prefix, default):
+        return filt
+    return make_filter(settings, prefix, default)
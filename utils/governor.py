@@ -0,0 +1,136 @@
+"""
+Frame-rate governor for the vision loops, so a pipeline with nobody in
+front of the camera stops burning a core on inference.
+
+    active  every frame is processed (the camera sets the pace)
+    idle    after `idle_after` frames in a row with no landmarks, only
+            `probe_hz` frames per second are processed; the first one
+            that finds something switches back to active at once
+
+Independently, `cpu_budget` (fraction of one core, 0 = unlimited) caps
+the loop's duty cycle: after an expensive frame the next one is delayed
+so that work / elapsed time stays under the budget.
+
+Profile keys: "idle_after_frames", "idle_probe_hz", "cpu_budget".
+"""
+import time
+
+DEFAULT_IDLE_AFTER = 30    # frames without landmarks before idling (0 = never idle)
+DEFAULT_PROBE_HZ   = 5.0   # frames per second while idle
+DEFAULT_CPU_BUDGET = 0.0   # max share of wall time spent working (0 = unlimited)
+
+
+class FrameGovernor:
+    """
+    Paces one loop: call wait() before reading a frame (it sleeps until
+    the next frame is due) and update(found) once the frame is handled.
+    """
+
+    def __init__(self):
+        self.idle_after   = DEFAULT_IDLE_AFTER
+        self.probe_period = 1.0 / DEFAULT_PROBE_HZ
+        self.cpu_budget   = DEFAULT_CPU_BUDGET
+        self.idle         = False
+        self._misses      = 0      # frames in a row without landmarks
+        self._due         = 0.0    # monotonic time the next frame may start
+        self._start       = None   # when the current frame's work began
+        self._last_empty  = None   # capture time of the last idle probe that found nothing
+        self._idle_since  = None
+        self._settings    = None
+        self._t0          = None
+        self._cpu0        = None
+        self._busy        = 0.0
+        self._idle_time   = 0.0
+        self._wake_sum    = 0.0
+        self._wake_max    = 0.0
+        self._counts      = {"frames": 0, "probes": 0, "wakes": 0, "throttled": 0}
+
+    def configure(self, settings: dict):
+        """Apply the governor's profile keys (no-op if `settings` is unchanged)."""
+        if settings is self._settings:
+            return self
+        self._settings    = settings
+        self.idle_after   = int(settings.get("idle_after_frames", DEFAULT_IDLE_AFTER))
+        self.probe_period = 1.0 / max(float(settings.get("idle_probe_hz", DEFAULT_PROBE_HZ)), 0.1)
+        self.cpu_budget   = float(settings.get("cpu_budget", DEFAULT_CPU_BUDGET))
+        return self
+
+    def wait(self, stop=None) -> bool:
+        """Sleep until the next frame is due; False if `stop` was set meanwhile."""
+        now = time.monotonic()
+        if self._t0 is None:
+            self._t0, self._cpu0 = now, time.process_time()
+        delay = self._due - now
+        if delay > 0:
+            if stop is not None:
+                if stop.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+        self._start = time.monotonic()
+        return stop is None or not stop.is_set()
+
+    def update(self, found: bool, timestamp=None):
+        """
+        Record the frame just handled: `found` if it had landmarks,
+        `timestamp` its capture time (time.monotonic() clock).
+        """
+        now   = time.monotonic()
+        start = self._start if self._start is not None else now
+        # work began when both the loop and the frame were ready
+        if timestamp is not None:
+            start = max(start, timestamp)
+        work  = now - start
+        self._busy += work
+        self._counts["frames"] += 1
+        if self.idle:
+            self._counts["probes"] += 1
+
+        if found:
+            self._misses = 0
+            if self.idle:
+                # the target showed up at the earliest just after the last empty probe
+                wake = now - (self._last_empty if self._last_empty is not None else start)
+                self._counts["wakes"] += 1
+                self._wake_sum += wake
+                self._wake_max  = max(self._wake_max, wake)
+                self._idle_time += now - self._idle_since
+                self.idle = False
+        else:
+            self._misses += 1
+            if not self.idle and self.idle_after and self._misses >= self.idle_after:
+                self.idle        = True
+                self._idle_since = now
+            if self.idle:
+                self._last_empty = timestamp if timestamp is not None else start
+
+        due = start + self.probe_period if self.idle else now
+        if self.cpu_budget > 0:
+            paced = start + work / self.cpu_budget
+            if paced > due:
+                due = paced
+                self._counts["throttled"] += 1
+        self._due = due
+
+    def stats(self) -> dict:
+        """
+        Frame counts; `duty` is the share of wall time this loop spent
+        working, `cpu` the whole process's CPU use in cores over the same
+        span, `idle` the share of time spent idling, and `wake_ms` how long
+        a target waited to be noticed after idling (mean / max).
+        """
+        out = dict(self._counts)
+        if self._t0 is None:
+            return out
+        now  = time.monotonic()
+        wall = now - self._t0
+        idle = self._idle_time + (now - self._idle_since if self.idle else 0.0)
+        wakes = self._counts["wakes"]
+        out.update({
+            "duty":         round(self._busy / wall, 3) if wall > 0 else 0.0,
+            "cpu":          round((time.process_time() - self._cpu0) / wall, 3) if wall > 0 else 0.0,
+            "idle":         round(idle / wall, 3) if wall > 0 else 0.0,
+            "wake_ms_mean": round(self._wake_sum / wakes * 1000, 1) if wakes else 0.0,
+            "wake_ms_max":  round(self._wake_max * 1000, 1),
+        })
+        return out
@@ -0,0 +1,131 @@
+"""
+MediaPipe landmarks and the geometry the input modules need (iris
+centre, pinch distances, finger extension, calibration normalization).
+
+Landmarks are used as MediaPipe returns them: a hand or face is its
+`.landmark` sequence and a point is anything with .x and .y, read only
+where the logic needs it. At a handful of points per frame, plain float
+arithmetic on those fields beats converting them to NumPy arrays first
+(see benchmarks/bench_landmarks.py). compact_hand() packs a hand into
+picklable Points for the vision workers; to_array() gives (N, 3) arrays
+for code that works on many points at once (utils.roi).
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# Face mesh (refine_landmarks=True) iris rings
+LEFT_IRIS  = (474, 475, 476, 477)
+RIGHT_IRIS = (469, 470, 471, 472)
+IRIS       = LEFT_IRIS + RIGHT_IRIS
+
+# Hand landmarks
+THUMB_TIP  = 4
+INDEX_PIP  = 6
+INDEX_TIP  = 8
+MIDDLE_PIP = 10
+MIDDLE_TIP = 12
+HAND_ROWS  = (THUMB_TIP, INDEX_PIP, INDEX_TIP, MIDDLE_PIP, MIDDLE_TIP)   # all the logic reads
+HAND_SIZE  = 21
+
+Point = namedtuple("Point", ["x", "y"])
+
+
+# ─── Conversion ────────────────────────────────────────────────────────────
+def to_array(landmarks, indices=None) -> np.ndarray:
+    """
+    (N, 3) float32 array from a MediaPipe landmark sequence (the
+    `.landmark` field), converting only `indices` if given.
+    """
+    if indices is not None:
+        landmarks = [landmarks[i] for i in indices]
+    n = len(landmarks)
+    flat = np.fromiter(
+        (v for p in landmarks for v in (p.x, p.y, p.z)), dtype=np.float32, count=3 * n
+    )
+    return flat.reshape(n, 3)
+
+def compact_hand(landmarks) -> list:
+    """
+    A hand's landmarks as a picklable list indexed like the original,
+    holding a Point for each of HAND_ROWS and None elsewhere.
+    """
+    out = [None] * HAND_SIZE
+    for i in HAND_ROWS:
+        p = landmarks[i]
+        out[i] = Point(p.x, p.y)
+    return out
+
+def hands_from_result(result) -> list:
+    """[(label, landmarks), ...] for a Hands result; [] if no hands."""
+    if not (result.multi_hand_landmarks and result.multi_handedness):
+        return []
+    return [
+        (hm.classification[0].label, lms.landmark)
+        for hm, lms in zip(result.multi_handedness, result.multi_hand_landmarks)
+    ]
+
+def face_from_result(result, indices=IRIS):
+    """
+    The first face's `indices` landmarks for a FaceMesh result (by
+    default the IRIS points, in IRIS order), or None if no face was found.
+    """
+    if not result.multi_face_landmarks:
+        return None
+    lms = result.multi_face_landmarks[0].landmark
+    return [lms[i] for i in indices]
+
+
+# ─── Eye geometry ──────────────────────────────────────────────────────────
+def _centroid(points):
+    x = y = 0.0
+    for p in points:
+        x += p.x
+        y += p.y
+    return x / len(points), y / len(points)
+
+def iris_centers(iris) -> tuple:
+    """Normalized (x, y) centroids of the left and right iris."""
+    half = len(iris) // 2
+    return _centroid(iris[:half]), _centroid(iris[half:])
+
+def gaze_point(iris) -> tuple:
+    """Normalized (x, y) midpoint between the two iris centroids."""
+    return _centroid(iris)
+
+def calibration(lo, hi):
+    """
+    (offset, scale) pairs mapping the calibrated [lo, hi] box onto [0, 1]
+    per axis, for normalize(). Axes whose bounds are missing (None) or
+    empty are left as they are.
+    """
+    offset, scale = [0.0, 0.0], [1.0, 1.0]
+    for axis, (a, b) in enumerate(zip(lo, hi)):
+        if a is not None and b is not None and b > a:
+            offset[axis], scale[axis] = a, 1.0 / (b - a)
+    return tuple(offset), tuple(scale)
+
+def normalize(xy, calib) -> tuple:
+    """Map `xy` through a calibration() box and clip to [0, 1]."""
+    (ox, oy), (sx, sy) = calib
+    x, y = (xy[0] - ox) * sx, (xy[1] - oy) * sy
+    return min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+
+
+# ─── Hand geometry ─────────────────────────────────────────────────────────
+def tip_distances(hand, origin, tips, scale=(1.0, 1.0)) -> list:
+    """
+    Distances from landmark `origin` to each of `tips` in the x/y plane,
+    scaled per axis by `scale` (e.g. the camera size for pixels).
+    """
+    o      = hand[origin]
+    sx, sy = scale
+    return [math.hypot((hand[t].x - o.x) * sx, (hand[t].y - o.y) * sy) for t in tips]
+
+def is_pinch(hand, a, b, scale, threshold) -> bool:
+    return tip_distances(hand, a, (b,), scale)[0] < threshold
+
+def fingers_extended(hand) -> bool:
+    """True if the index and middle fingertips are above (smaller y) their PIP joints."""
+    return hand[INDEX_TIP].y < hand[INDEX_PIP].y and hand[MIDDLE_TIP].y < hand[MIDDLE_PIP].y
@@ -1,21 +1,137 @@
 import os
 import json
+import atexit
 import datetime
+import threading
+from queue import Queue, Empty, Full
 
 LOG_DIR  = os.path.join(os.path.expanduser("~"), ".nac", "logs")
 LOG_FILE = os.path.join(LOG_DIR, "nac_events.log")
 
+# Batching: write when this many records are pending, or after this long
+FLUSH_BATCH    = 64
+FLUSH_INTERVAL = 1.0   # seconds
+# Rotation: nac_events.log → nac_events.log.1 … .BACKUP_COUNT
+MAX_BYTES      = 1024 * 1024
+BACKUP_COUNT   = 5
+# Records waiting for the writer; beyond this, log_event drops (and counts)
+QUEUE_SIZE     = 10000
+
+
 def _ensure_log():
     os.makedirs(LOG_DIR, exist_ok=True)
     if not os.path.isfile(LOG_FILE):
         open(LOG_FILE, "w").close()
 
-def log_event(event_type: str, details: str):
-    _ensure_log()
-    entry = {
+
+class _LogWriter:
+    """
+    Background thread that owns the log file. Records are queued by
+    log_event() and written in batches, so callers never touch the disk.
+    """
+
+    def __init__(self):
+        self.queue    = Queue(maxsize=QUEUE_SIZE)
+        self.dropped  = 0
+        self._lock    = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._pending = 0      # records enqueued but not yet on disk
+        self._thread  = None
+
+    def submit(self, entry):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="nac-log-writer", daemon=True
+                )
+                self._thread.start()
+            self._pending += 1
+        try:
+            self.queue.put_nowait(entry)
+        except Full:
+            with self._lock:
+                self._pending -= 1
+                self.dropped  += 1
+
+    def flush(self, timeout=5.0):
+        """Block until everything submitted so far is written."""
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(None, timeout=timeout)   # wake the writer now
+        except Full:
+            return
+        with self._lock:
+            self._flushed.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def _run(self):
+        batch = []
+        while True:
+            try:
+                entry = self.queue.get(timeout=FLUSH_INTERVAL)
+            except Empty:
+                entry = None
+            if entry is not None:
+                batch.append(entry)
+                if len(batch) < FLUSH_BATCH:
+                    continue
+            if batch:
+                self._write(batch)
+                with self._lock:
+                    self._pending -= len(batch)
+                    self._flushed.notify_all()
+                batch = []
+
+    def _write(self, batch):
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            batch = batch + [_entry("log_dropped", str(dropped))]
+        try:
+            _ensure_log()
+            _rotate_if_needed()
+            with open(LOG_FILE, "a") as f:
+                f.write("".join(json.dumps(e) + "\n" for e in batch))
+        except OSError:
+            pass  # logging must never take an input loop down
+
+
+def _rotate_if_needed():
+    try:
+        if os.path.getsize(LOG_FILE) < MAX_BYTES:
+            return
+    except OSError:
+        return
+    for i in range(BACKUP_COUNT - 1, 0, -1):
+        src = f"{LOG_FILE}.{i}"
+        if os.path.isfile(src):
+            os.replace(src, f"{LOG_FILE}.{i + 1}")
+    if BACKUP_COUNT > 0:
+        os.replace(LOG_FILE, f"{LOG_FILE}.1")
+    else:
+        os.remove(LOG_FILE)
+    open(LOG_FILE, "w").close()
+
+
+def _entry(event_type, details):
+    return {
         "timestamp": datetime.datetime.now().isoformat(),
         "event": event_type,
         "details": details
     }
-    with open(LOG_FILE, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+
+
+_writer = _LogWriter()
+
+
+def log_event(event_type: str, details: str):
+    """Queue an event for the background writer; never blocks on disk."""
+    _writer.submit(_entry(event_type, details))
+
+
+def flush(timeout: float = 5.0):
+    """Write out all queued events (also runs automatically at exit)."""
+    _writer.flush(timeout)
+
+
+atexit.register(flush)
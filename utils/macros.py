@@ -0,0 +1,237 @@
+"""
+User-defined voice macros, stored per profile (config.profile_manager
+get_macros / save_macro / delete_macro) under "macros":
+
+    "macros": {
+        "copy":     {"phrases": {"en": ["copy that"], "hi": ["कॉपी करो"]},
+                     "steps":   [{"keys": "ctrl+c"}]},
+        "sign off": {"phrases": ["sign off"],
+                     "steps":   [{"type": "Best regards,"}, {"keys": "enter"}]},
+        "note":     {"phrases": ["take a note {text}"],
+                     "steps":   [{"launch": "notepad"}, {"wait": 1.0}, {"type": "{text}"}]}
+    }
+
+"phrases" are command phrases as in utils.commands (a plain list counts
+as English, which every language's index includes); a slot such as
+{text} may be used in the steps' text. Macros win ties with built-in
+commands, and a macro phrase that extends a built-in one ("open chrome
+incognito", "open notepad {text}") holds the built-in back until the
+speaker has finished. Steps, run in order:
+
+    keys    key combination, "ctrl+shift+t" or ["ctrl", "shift", "t"]
+    type    text typed on the keyboard
+    launch  program to start, a command line or an argv list
+    open    URL opened in the browser
+    click   mouse button clicked where the cursor is ("left" if empty)
+    wait    seconds to pause
+    say     text spoken through utils.tts
+
+compile_macros() validates and compiles every macro once, when the
+profile is loaded, into a tuple of ready-to-call steps, and returns a
+MacroTable: registry entries for compile_commands() plus a dispatch
+table from command name to an action that only queues the steps. The
+steps run on the MacroRunner's worker thread, so a long macro never
+holds up recognition or the event dispatcher. A macro with a bad step
+is logged and left out rather than stopping the module.
+"""
+import re
+import shlex
+import threading
+import subprocess
+import webbrowser
+from functools import partial
+from queue import Queue, Empty, Full
+
+from utils.logger import log_event
+from utils.output import get_output
+from utils.commands import CommandIndex
+
+MACRO_PREFIX = "macro:"   # registry names of macros, apart from the built-ins
+QUEUE_SIZE   = 16         # macros waiting to run; beyond this they are dropped
+MOUSE_KEYS   = ("left", "right", "middle")
+
+_SLOT_REF = re.compile(r"\{(\w+)\}")
+
+
+# ─── Step compilation ──────────────────────────────────────────────────────
+def _template(text, slot_names):
+    """`text` → function(slots) → str, substituting only the macro's own slots."""
+    text = str(text)
+    used = set(_SLOT_REF.findall(text)) & slot_names
+    if not used:
+        return lambda slots: text
+    return lambda slots: _SLOT_REF.sub(
+        lambda m: slots.get(m.group(1), "") if m.group(1) in used else m.group(0), text)
+
+def compile_step(step: dict, slot_names=frozenset()):
+    """One step dict → function(slots, runner); raises ValueError if malformed."""
+    if not isinstance(step, dict) or len(step) != 1:
+        raise ValueError(f"a step is one {{kind: value}} pair, not {step!r}")
+    (kind, arg), = step.items()
+    if kind == "keys":
+        keys = [k.strip().lower() for k in arg.split("+")] if isinstance(arg, str) else list(arg)
+        if not keys or not all(keys):
+            raise ValueError(f"bad key combination {arg!r}")
+        return lambda slots, runner: get_output().hotkey(keys)
+    if kind == "type":
+        text = _template(arg, slot_names)
+        return lambda slots, runner: get_output().write(text(slots))
+    if kind == "launch":
+        argv = shlex.split(arg) if isinstance(arg, str) else [str(a) for a in arg]
+        if not argv:
+            raise ValueError("nothing to launch")
+        return lambda slots, runner: subprocess.Popen(argv)
+    if kind == "open":
+        url = _template(arg, slot_names)
+        return lambda slots, runner: webbrowser.open(url(slots))
+    if kind == "click":
+        button = arg or "left"
+        if button not in MOUSE_KEYS:
+            raise ValueError(f"bad mouse button {arg!r}")
+        return lambda slots, runner: get_output().click(button)
+    if kind == "wait":
+        seconds = float(arg)
+        return lambda slots, runner: runner.sleep(seconds)
+    if kind == "say":
+        from utils.tts import get_speech
+        text = _template(arg, slot_names)
+        return lambda slots, runner: get_speech().say(text(slots))
+    raise ValueError(f"unknown step '{kind}'")
+
+
+# ─── Runner ────────────────────────────────────────────────────────────────
+class MacroRunner:
+    """
+    Runs queued macros one at a time on a worker thread, started on first
+    use. cancel() drops the queue and stops the running macro before its
+    next step (or in the middle of a wait).
+    """
+
+    def __init__(self, maxsize=QUEUE_SIZE):
+        self.queue     = Queue(maxsize=maxsize)
+        self._gen      = 0                    # bumped by cancel()
+        self._cancel   = threading.Event()
+        self._lock     = threading.Lock()
+        self._thread   = None
+        self._counts   = {"queued": 0, "run": 0, "steps": 0, "failed": 0,
+                          "cancelled": 0, "dropped": 0}
+
+    def submit(self, name, steps, slots=None) -> bool:
+        """Queue compiled `steps`; False (and logged) if the queue is full."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="nac-macros", daemon=True)
+                self._thread.start()
+            gen = self._gen
+        try:
+            self.queue.put_nowait((gen, name, steps, slots or {}))
+        except Full:
+            with self._lock:
+                self._counts["dropped"] += 1
+            log_event("macro_dropped", name)
+            return False
+        with self._lock:
+            self._counts["queued"] += 1
+        return True
+
+    def sleep(self, seconds) -> bool:
+        """A wait step; returns early (False) if the macro is cancelled."""
+        return not self._cancel.wait(seconds)
+
+    def cancel(self):
+        with self._lock:
+            self._gen += 1
+            self._cancel.set()
+        while True:
+            try:
+                self.queue.get_nowait()
+            except Empty:
+                break
+            with self._lock:
+                self._counts["cancelled"] += 1
+
+    def _run(self):
+        while True:
+            gen, name, steps, slots = self.queue.get()
+            with self._lock:
+                if gen != self._gen:
+                    self._counts["cancelled"] += 1
+                    continue
+                self._cancel.clear()
+            log_event("macro_run", name)
+            for step in steps:
+                if gen != self._gen:
+                    with self._lock:
+                        self._counts["cancelled"] += 1
+                    break
+                try:
+                    step(slots, self)
+                except Exception as e:   # a failing program or key must not kill the runner
+                    with self._lock:
+                        self._counts["failed"] += 1
+                    log_event("macro_error", f"{name}: {e}")
+                    break
+                with self._lock:
+                    self._counts["steps"] += 1
+            else:
+                with self._lock:
+                    self._counts["run"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._counts)
+        out["pending"] = self.queue.qsize()
+        return out
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+def get_macro_runner() -> MacroRunner:
+    """The process-wide macro runner."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = MacroRunner()
+        return _runner
+
+
+# ─── Compiled table ────────────────────────────────────────────────────────
+class MacroTable:
+    """
+    A profile's macros, compiled: `commands` holds their registry entries
+    (named MACRO_PREFIX + name) and `actions` maps those names to a
+    function(slots) that queues the macro on `runner`.
+    """
+
+    def __init__(self, macros: dict, runner: MacroRunner):
+        self.commands = {}
+        self.actions  = {}
+        self.errors   = {}
+        for name, spec in (macros or {}).items():
+            try:
+                phrases = spec["phrases"]
+                if isinstance(phrases, (list, tuple)):
+                    phrases = {"en": list(phrases)}
+                slot_names = {m for texts in phrases.values() for text in texts
+                              for m in _SLOT_REF.findall(text)}
+                # rejects phrases without keywords before they reach the live index
+                CommandIndex({name: phrases}, tuple(phrases))
+                steps = tuple(compile_step(step, slot_names) for step in spec["steps"])
+                if not steps:
+                    raise ValueError("no steps")
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                self.errors[name] = str(e)
+                log_event("macro_error", f"{name}: {e}")
+                continue
+            key = MACRO_PREFIX + name
+            self.commands[key] = phrases
+            self.actions[key]  = partial(runner.submit, name, steps)
+
+    def __len__(self):
+        return len(self.actions)
+
+
+def compile_macros(settings: dict) -> MacroTable:
+    """The profile's "macros", compiled for the process-wide runner."""
+    return MacroTable(settings.get("macros", {}), get_macro_runner())
@@ -0,0 +1,286 @@
+import threading
+import time
+
+from config.profile_manager import get_profile
+from utils.telemetry import stage_timer
+
+# Defaults for the profile keys read by create_output()
+DEFAULT_BACKEND = "fast"   # "fast", "pyautogui" or "recording"
+DEFAULT_REFRESH = 60       # Hz; the fast backend injects moves at most this often
+DEFAULT_DEADBAND = 1       # px; smaller cursor steps are treated as jitter
+
+
+class OutputBackend:
+    """
+    What the input modules use to drive the pointer instead of calling
+    pyautogui themselves. Coordinates are screen pixels.
+    """
+
+    def size(self):
+        raise NotImplementedError
+
+    def move_to(self, x, y):
+        raise NotImplementedError
+
+    def click(self, button="left"):
+        raise NotImplementedError
+
+    def scroll(self, amount):
+        raise NotImplementedError
+
+    def hotkey(self, keys):
+        """Press the key combination `keys` (pyautogui key names, e.g. ["ctrl", "c"])."""
+        raise NotImplementedError
+
+    def write(self, text):
+        """Type `text` on the keyboard."""
+        raise NotImplementedError
+
+    def flush(self):
+        """Inject anything still pending (no-op for synchronous backends)."""
+
+    def track(self, source):
+        """
+        Between explicit moves, poll `source()` → (x, y) or None at display
+        rate and move there (None stops). Only backends with their own
+        injection thread do this; the others ignore it.
+        """
+
+    def stats(self) -> dict:
+        return {}
+
+
+class PyAutoGUIBackend(OutputBackend):
+    """Plain pyautogui calls, one OS round-trip (and pause) per call."""
+
+    def __init__(self):
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        self._gui   = pyautogui
+        self._timer = stage_timer("output")
+
+    def size(self):
+        return self._gui.size()
+
+    def move_to(self, x, y):
+        t0 = time.perf_counter()
+        self._gui.moveTo(int(x), int(y))
+        self._timer.record("move", time.perf_counter() - t0, t0)
+
+    def click(self, button="left"):
+        t0 = time.perf_counter()
+        self._gui.click(button=button)
+        self._timer.record("click", time.perf_counter() - t0, t0)
+
+    def scroll(self, amount):
+        t0 = time.perf_counter()
+        self._gui.scroll(int(amount))
+        self._timer.record("scroll", time.perf_counter() - t0, t0)
+
+    def hotkey(self, keys):
+        t0 = time.perf_counter()
+        self._gui.hotkey(*keys)
+        self._timer.record("keys", time.perf_counter() - t0, t0)
+
+    def write(self, text):
+        t0 = time.perf_counter()
+        self._gui.write(text)
+        self._timer.record("write", time.perf_counter() - t0, t0)
+
+
+class FastBackend(OutputBackend):
+    """
+    Cursor moves are only recorded by move_to(); a background thread
+    injects the latest target at most `refresh_hz` times per second through
+    pyautogui's platform layer, without its per-call pause. Targets within
+    `deadband` pixels of the last injected position are skipped. Clicks,
+    scrolls and keys are injected immediately, after any pending move, so
+    they land where the cursor was last sent. With track() the thread also polls a
+    position source every refresh interval (e.g. a predicting filter), so
+    the cursor keeps moving between camera frames.
+    """
+
+    def __init__(self, refresh_hz=DEFAULT_REFRESH, deadband=DEFAULT_DEADBAND):
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        self._gui     = pyautogui
+        native        = getattr(getattr(pyautogui, "platformModule", None), "_moveTo", None)
+        self._move    = native or (lambda x, y: pyautogui.moveTo(x, y, _pause=False))
+        self.period   = 1.0 / refresh_hz
+        self.deadband = deadband
+        self._target  = None
+        self._last    = None
+        self._source  = None
+        self._counts  = {"requested": 0, "injected": 0, "jitter": 0, "coalesced": 0, "tracked": 0}
+        self._timer   = stage_timer("output")
+        self._lock    = threading.Lock()
+        self._wake    = threading.Event()
+        self._thread  = threading.Thread(target=self._run, name="nac-output", daemon=True)
+        self._thread.start()
+
+    def size(self):
+        return self._gui.size()
+
+    def move_to(self, x, y):
+        with self._lock:
+            self._counts["requested"] += 1
+            if self._target is not None:
+                self._counts["coalesced"] += 1
+            self._target = (int(round(x)), int(round(y)))
+        self._wake.set()
+
+    def click(self, button="left"):
+        with self._lock:
+            self._inject_move()
+            t0 = time.perf_counter()
+            self._gui.click(button=button, _pause=False)
+            self._timer.record("click", time.perf_counter() - t0, t0)
+
+    def scroll(self, amount):
+        with self._lock:
+            self._inject_move()
+            t0 = time.perf_counter()
+            self._gui.scroll(int(amount), _pause=False)
+            self._timer.record("scroll", time.perf_counter() - t0, t0)
+
+    def hotkey(self, keys):
+        with self._lock:
+            self._inject_move()
+            t0 = time.perf_counter()
+            self._gui.hotkey(*keys, _pause=False)
+            self._timer.record("keys", time.perf_counter() - t0, t0)
+
+    def write(self, text):
+        with self._lock:
+            self._inject_move()
+            t0 = time.perf_counter()
+            self._gui.write(text, _pause=False)
+            self._timer.record("write", time.perf_counter() - t0, t0)
+
+    def flush(self):
+        with self._lock:
+            self._inject_move()
+
+    def track(self, source):
+        self._source = source
+        self._wake.set()
+
+    def _inject_move(self):
+        """Send the pending target, if any (lock held)."""
+        target, self._target = self._target, None
+        if target is None:
+            return
+        last = self._last
+        if last is not None and max(abs(target[0] - last[0]), abs(target[1] - last[1])) < self.deadband:
+            self._counts["jitter"] += 1
+            return
+        t0 = time.perf_counter()
+        self._move(*target)
+        self._timer.record("move", time.perf_counter() - t0, t0)
+        self._last = target
+        self._counts["injected"] += 1
+
+    def _run(self):
+        while True:
+            source = self._source
+            self._wake.wait(None if source is None else self.period)
+            self._wake.clear()
+            t0 = time.monotonic()
+            pos = source() if source is not None else None
+            with self._lock:
+                if pos is not None:
+                    # the source is at least as fresh as any queued frame position
+                    if self._target is not None:
+                        self._counts["coalesced"] += 1
+                    self._target = (int(round(pos[0])), int(round(pos[1])))
+                    self._counts["tracked"] += 1
+                self._inject_move()
+            # one injection per refresh interval; later targets coalesce
+            delay = self.period - (time.monotonic() - t0)
+            if delay > 0:
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+class RecordingBackend(OutputBackend):
+    """
+    Never touches the OS: keeps (time, tag, kind, value) for every call in
+    `actions` (or only counts them with record=False), so pipelines can run
+    headless. `tag` is stored with each action; callers set it, e.g. to the
+    frame index being processed.
+    """
+
+    def __init__(self, screen_size=(1920, 1080), record=True):
+        self.screen_size = tuple(screen_size)
+        self.record      = record
+        self.tag         = None
+        self.actions     = []
+        self._counts     = {"move": 0, "click": 0, "scroll": 0, "keys": 0, "write": 0}
+        self._lock       = threading.Lock()
+
+    def _add(self, kind, value):
+        with self._lock:
+            self._counts[kind] += 1
+            if self.record:
+                self.actions.append((time.monotonic(), self.tag, kind, value))
+
+    def size(self):
+        return self.screen_size
+
+    def move_to(self, x, y):
+        self._add("move", (int(x), int(y)))
+
+    def click(self, button="left"):
+        self._add("click", button)
+
+    def scroll(self, amount):
+        self._add("scroll", int(amount))
+
+    def hotkey(self, keys):
+        self._add("keys", tuple(keys))
+
+    def write(self, text):
+        self._add("write", text)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+BACKENDS = {
+    "fast":      FastBackend,
+    "pyautogui": PyAutoGUIBackend,
+    "recording": RecordingBackend,
+}
+
+_output = None
+_output_lock = threading.Lock()
+
+def create_output(settings: dict) -> OutputBackend:
+    """Build the backend named by the profile's "output_backend" setting."""
+    name = settings.get("output_backend", DEFAULT_BACKEND)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown output backend '{name}'")
+    if name == "fast":
+        return FastBackend(
+            refresh_hz=settings.get("display_refresh_hz", DEFAULT_REFRESH),
+            deadband=settings.get("cursor_deadband", DEFAULT_DEADBAND),
+        )
+    return BACKENDS[name]()
+
+def get_output() -> OutputBackend:
+    """The process-wide backend, created from the default profile on first use."""
+    global _output
+    with _output_lock:
+        if _output is None:
+            _output = create_output(get_profile("default"))
+        return _output
+
+def set_output(backend: OutputBackend):
+    """Install `backend` for the process (call before importing the modules)."""
+    global _output
+    with _output_lock:
+        _output = backend
@@ -0,0 +1,191 @@
+"""
+Region-of-interest tracking for the MediaPipe models. Once hands or a
+face have been found, the next frame is cropped to a square around
+where they were (plus a margin for motion), scaled down to at most
+`max_side` pixels and only that is passed to the model. The landmarks
+are then mapped back to full-frame coordinates in place, so callers see
+the same result as a full-frame run.
+
+Crops go to a separate video-mode model (see create_crop_model()), which
+keeps its own tracking state, while the caller's model keeps the
+full-frame runs. Video-mode tracking assumes a steady view, so the crop
+is kept stable: its side is fixed when tracking starts (and only reset
+when the targets outgrow it or shrink to well under half of it), the
+box stays put while the landmarks remain inside its inner part, so the
+model gets the same input size and a steady view between resets.
+
+When the crop comes back empty the same frame is run again on the full
+frame. While fewer targets are tracked than the model can find (one of
+two hands), the full frame is also re-checked every `redetect` frames,
+so a newly raised hand is still picked up.
+
+Profile keys: "roi_tracking" (off by default), "roi_max_side",
+"roi_margin" and "roi_redetect".
+"""
+import cv2
+import numpy as np
+
+from utils.landmarks import to_array
+
+# Face mesh points bounding the face: forehead, chin, right and left cheek
+FACE_EXTENT = (10, 152, 234, 454)
+
+DEFAULT_MAX_SIDE = 256   # px; crops are scaled down to this
+DEFAULT_MARGIN   = 0.5   # of the landmark box size, added on every side
+DEFAULT_REDETECT = 15    # frames between full-frame checks for missing targets
+MIN_SIDE         = 64    # px; smaller crops are grown to this
+MAX_AREA         = 0.6   # crops covering more of the frame aren't worth it
+
+# targets the modules' models look for: Hands max_num_hands, one face
+TARGETS = {"hands": 2, "face": 1}
+
+
+def create_crop_model(kind):
+    """A video-mode MediaPipe model for `kind` crops, matching the modules' settings."""
+    import mediapipe as mp
+    if kind == "hands":
+        return mp.solutions.hands.Hands(max_num_hands=TARGETS[kind],
+                                        min_detection_confidence=0.7,
+                                        min_tracking_confidence=0.7)
+    return mp.solutions.face_mesh.FaceMesh(max_num_faces=TARGETS[kind], refine_landmarks=True)
+
+def _landmark_lists(kind, result) -> list:
+    if kind == "hands":
+        return result.multi_hand_landmarks or []
+    return result.multi_face_landmarks or []
+
+
+class RoiTracker:
+    """
+    Feeds one model ("hands" or "face") crops around the previous frame's
+    landmarks: call process(model, rgb) in place of model.process(rgb).
+    Disabled (always full frame) until configure() turns it on. Crops go
+    to the model returned by `crop_model` (a function, called once, on
+    the first crop; default create_crop_model(kind)).
+    """
+
+    def __init__(self, kind, crop_model=None):
+        if kind not in TARGETS:
+            raise ValueError(f"Unknown ROI kind '{kind}'")
+        self.kind      = kind
+        self.targets   = TARGETS[kind]
+        self.enabled   = False
+        self.max_side  = DEFAULT_MAX_SIDE
+        self.margin    = DEFAULT_MARGIN
+        self.redetect  = DEFAULT_REDETECT
+        self.box       = None   # (x0, y0, x1, y1) pixels of the next crop; None = full frame
+        self.side      = 0.0    # px; the crop's side, fixed while tracking
+        self.crop_model = None
+        self._make_crop = crop_model or (lambda: create_crop_model(kind))
+        self._found    = 0      # targets in the last result
+        self._since    = 0      # frames since the last full-frame run
+        self._settings = None
+        self._crop     = None   # model input buffer, reused while the side is held
+        self._counts   = {"frames": 0, "cropped": 0, "fallbacks": 0, "redetects": 0,
+                          "resized": 0, "pixels": 0.0}
+
+    def configure(self, settings: dict):
+        """Apply the "roi_*" profile keys (no-op if `settings` is unchanged)."""
+        if settings is self._settings:
+            return self
+        self._settings = settings
+        self.enabled   = bool(settings.get("roi_tracking", False))
+        self.max_side  = int(settings.get("roi_max_side", DEFAULT_MAX_SIDE))
+        self.margin    = float(settings.get("roi_margin", DEFAULT_MARGIN))
+        self.redetect  = int(settings.get("roi_redetect", DEFAULT_REDETECT))
+        if not self.enabled:
+            self.box = None
+        self._crop = None
+        return self
+
+    def process(self, model, rgb):
+        """model.process() on a crop of `rgb` if one is tracked, else on all of it."""
+        h, w = rgb.shape[:2]
+        self._counts["frames"] += 1
+        if self.box is not None:
+            missing = self._found < self.targets
+            if missing and self._since >= self.redetect:
+                self._counts["redetects"] += 1
+            else:
+                result = self._process_crop(rgb, w, h)
+                if result is not None:
+                    self._since += 1
+                    return result
+                self._counts["fallbacks"] += 1
+
+        result = model.process(rgb)
+        self._counts["pixels"] += 1.0
+        self._since = 0
+        self._update(result, w, h)
+        return result
+
+    def _process_crop(self, rgb, w, h):
+        """Run on the tracked box; the result in full-frame coordinates, or None if empty."""
+        x0, y0, x1, y1 = self.box
+        cw, ch = x1 - x0, y1 - y0
+        side   = min(self.max_side, cw)
+        if self._crop is None or self._crop.shape[0] != side:
+            self._crop = np.empty((side, side, 3), dtype=np.uint8)
+        if side < cw:
+            crop = cv2.resize(rgb[y0:y1, x0:x1], (side, side), dst=self._crop,
+                              interpolation=cv2.INTER_LINEAR)
+        else:
+            crop = self._crop
+            crop[:] = rgb[y0:y1, x0:x1]
+        if self.crop_model is None:
+            self.crop_model = self._make_crop()
+        result = self.crop_model.process(crop)
+        self._counts["pixels"] += crop.shape[0] * crop.shape[1] / (w * h)
+
+        lists = _landmark_lists(self.kind, result)
+        if not lists:
+            return None
+        # crop-normalized → frame-normalized (z shares x's scale)
+        sx, sy, ox, oy = cw / w, ch / h, x0 / w, y0 / h
+        for lms in lists:
+            for p in lms.landmark:
+                p.x = ox + p.x * sx
+                p.y = oy + p.y * sy
+                p.z = p.z * sx
+        self._counts["cropped"] += 1
+        self._update(result, w, h)
+        return result
+
+    def _update(self, result, w, h):
+        """Next crop: a fixed-size square kept around this result's landmarks, or None."""
+        lists = _landmark_lists(self.kind, result) if self.enabled else []
+        self._found = len(lists)
+        if not lists:
+            self.box = None
+            return
+        indices = FACE_EXTENT if self.kind == "face" else None
+        pts  = np.concatenate([to_array(lms.landmark, indices)[:, :2] for lms in lists])
+        lo   = pts.min(0) * (w, h)
+        hi   = pts.max(0) * (w, h)
+        need = max(float((hi - lo).max()) * (1 + 2 * self.margin), MIN_SIDE)
+        if self.box is None or need > self.side or need < self.side / 2:
+            if self.box is not None:
+                self._counts["resized"] += 1
+            self.side = need
+        side = self.side
+        if side > min(w, h) or side * side > MAX_AREA * w * h:
+            self.box = None
+            return
+        # leave the box where it is while the landmarks stay inside its inner part
+        if self.box is not None and self.box[2] - self.box[0] == int(side):
+            inset = (side - (side / (1 + 2 * self.margin))) / 4   # half of each side's margin
+            x0, y0, x1, y1 = self.box
+            if (lo[0] >= x0 + inset and lo[1] >= y0 + inset
+                    and hi[0] <= x1 - inset and hi[1] <= y1 - inset):
+                return
+        # keep the square inside the frame, shifting rather than shrinking it
+        cx, cy = (lo + hi) / 2
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        self.box = (x0, y0, x0 + int(side), y0 + int(side))
+
+    def stats(self) -> dict:
+        """Frame counts, plus the mean share of full-frame pixels given to the model."""
+        c = dict(self._counts)
+        c["pixels"] = round(c["pixels"] / c["frames"], 3) if c["frames"] else 0.0
+        return c
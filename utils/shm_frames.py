@@ -0,0 +1,94 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    A fixed ring of preallocated RGB frame slots in one shared-memory block,
+    for zero-copy hand-off from the capture thread to inference workers in
+    other processes. Create it in the parent, pass spec() to the child and
+    rebuild it there with attach().
+
+    Frame `seq` lives in slot `seq % slots`. The producer writes straight
+    into slot_for_write(seq) and then publish()es it; readers get a view of
+    the newest slot from wait_newer() and, once done with it, check valid()
+    to make sure the producer did not lap them and overwrite the slot.
+
+    Layout: head seq (int64) | slot seqs (int64 × slots) |
+            slot timestamps (float64 × slots) | frames (uint8 × slots × shape)
+    """
+
+    def __init__(self, shape, slots=4, name=None, cond=None):
+        self.shape  = tuple(shape)
+        self.slots  = slots
+        self._owner = name is None
+        header      = 8 * (1 + 2 * slots)
+        self.shm    = shared_memory.SharedMemory(
+            name=name, create=self._owner,
+            size=header + slots * int(np.prod(self.shape))
+        )
+        buf          = self.shm.buf
+        self._head   = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        self._seqs   = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=8)
+        self._stamps = np.ndarray((slots,), dtype=np.float64, buffer=buf,
+                                  offset=8 * (1 + slots))
+        self.frames  = np.ndarray((slots,) + self.shape, dtype=np.uint8,
+                                  buffer=buf, offset=header)
+        if self._owner:
+            self._head[0] = 0
+            self._seqs[:] = 0
+        # spawn-context, so it can be handed to the spawned vision workers
+        self.cond = cond if cond is not None else mp.get_context("spawn").Condition()
+
+    def spec(self):
+        """Picklable description for attach() in a worker process."""
+        return self.shm.name, self.shape, self.slots, self.cond
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, slots, cond = spec
+        return cls(shape, slots, name=name, cond=cond)
+
+    # ─── producer side ────────────────────────────────────────────────────
+    def slot_for_write(self, seq):
+        """Mark the slot for `seq` as being written and return it."""
+        i = seq % self.slots
+        self._seqs[i] = -1
+        return self.frames[i]
+
+    def publish(self, seq, timestamp):
+        """Make the slot written for `seq` visible and wake the readers."""
+        i = seq % self.slots
+        self._stamps[i] = timestamp
+        self._seqs[i]   = seq
+        with self.cond:
+            self._head[0] = seq
+            self.cond.notify_all()
+
+    # ─── consumer side ────────────────────────────────────────────────────
+    def wait_newer(self, last_seq, timeout=0.5):
+        """
+        Wait for a frame newer than `last_seq`. Return (seq, timestamp, view)
+        where view is the slot itself (no copy), or None on timeout.
+        """
+        with self.cond:
+            if not self.cond.wait_for(lambda: self._head[0] > last_seq, timeout):
+                return None
+            seq = int(self._head[0])
+        i  = seq % self.slots
+        ts = float(self._stamps[i])
+        if self._seqs[i] != seq:
+            return None
+        return seq, ts, self.frames[i]
+
+    def valid(self, seq) -> bool:
+        """True while the slot for `seq` still holds that frame."""
+        return self._seqs[seq % self.slots] == seq
+
+    def close(self):
+        self._head = self._seqs = self._stamps = self.frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
@@ -0,0 +1,122 @@
+"""
+Opt-in span tracing for offline profiling in chrome://tracing or
+Perfetto (ui.perfetto.dev).
+
+While tracing, every StageTimer lap (see utils.telemetry) is also kept
+as a span: thread, pipeline, stage, start and duration. Spans go into a
+preallocated ring of `capacity` fixed-size records, one slot per span
+and no allocation or I/O on the hot path; the oldest spans are
+overwritten once it is full. stop_tracing() (or interpreter exit)
+writes the ring out as Chrome trace JSON.
+
+Enabled with `--trace-spans PATH` on a module's command line or
+"span_trace_file" in the profile; "span_trace_capacity" sets the ring
+size.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import itertools
+import threading
+
+import numpy as np
+
+DEFAULT_CAPACITY = 1 << 16   # spans kept (about 2 MB)
+
+SPAN = np.dtype([("name", np.int32), ("cat", np.int32), ("tid", np.int32),
+                 ("start", np.float64), ("dur", np.float64)])
+
+
+class SpanTracer:
+    """Ring buffer of complete spans, written out as Chrome trace JSON."""
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path     = path
+        self.capacity = int(capacity)
+        self.spans    = np.zeros(self.capacity, dtype=SPAN)
+        self._next    = itertools.count()   # atomic under the GIL
+        self._names   = {}                   # name → id (stages and pipelines)
+        self._threads = {}                   # thread ident → (tid, name)
+        self._lock    = threading.Lock()
+        self._origin  = time.perf_counter()
+
+    def _intern(self, name) -> int:
+        i = self._names.get(name)
+        if i is None:
+            with self._lock:
+                i = self._names.setdefault(name, len(self._names))
+        return i
+
+    def _tid(self) -> int:
+        ident = threading.get_ident()
+        entry = self._threads.get(ident)
+        if entry is None:
+            with self._lock:
+                entry = self._threads.setdefault(
+                    ident, (len(self._threads) + 1, threading.current_thread().name))
+        return entry[0]
+
+    def add(self, name, cat, start, dur):
+        """One span on the calling thread; `start` is a time.perf_counter() value."""
+        self.spans[next(self._next) % self.capacity] = (
+            self._intern(name), self._intern(cat), self._tid(), start, dur)
+
+    def events(self) -> list:
+        """The ring's spans (oldest first) plus thread-name metadata, as trace events."""
+        n     = next(self._next)
+        count = min(n, self.capacity)
+        first = n - count
+        order = (np.arange(first, n) % self.capacity) if count else np.arange(0)
+        names = {i: name for name, i in list(self._names.items())}
+        pid   = os.getpid()
+        out   = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0,
+                  "args": {"name": os.path.basename(sys.argv[0]) or "nac"}}]
+        for tid, thread in list(self._threads.values()):
+            out.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid,
+                        "args": {"name": thread}})
+        for rec in self.spans[order].tolist():
+            name, cat, tid, start, dur = rec
+            out.append({"ph": "X", "name": names.get(name, "?"), "cat": names.get(cat, "?"),
+                        "pid": pid, "tid": tid,
+                        "ts": round((start - self._origin) * 1e6, 1),
+                        "dur": round(dur * 1e6, 1)})
+        return out
+
+    def write(self):
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
+
+
+# The active tracer; StageTimer checks it on every lap
+tracer = None
+
+def span_path(settings: dict, argv=None):
+    """Trace file from `--trace-spans PATH`, else the profile's "span_trace_file"."""
+    argv = sys.argv if argv is None else argv
+    if "--trace-spans" in argv:
+        i = argv.index("--trace-spans")
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return settings.get("span_trace_file") or None
+
+def start_tracing(settings: dict, argv=None):
+    """Start tracing if asked to (see span_path()); returns the tracer or None."""
+    global tracer
+    path = span_path(settings, argv)
+    if path and tracer is None:
+        tracer = SpanTracer(path, settings.get("span_trace_capacity", DEFAULT_CAPACITY))
+    return tracer
+
+def stop_tracing():
+    """Stop tracing and write the trace file, if tracing."""
+    global tracer
+    active, tracer = tracer, None
+    if active is not None:
+        active.write()
+        print(f"Span trace written to {active.path}")
+
+atexit.register(stop_tracing)
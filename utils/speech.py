@@ -0,0 +1,439 @@
+"""
+Speech input for the voice modules: one audio stream, a voice-activity
+detector (VAD) to cut it into utterances, and a pluggable recognizer.
+
+    source      MicrophoneSource keeps a single PyAudio input stream open
+                for the life of the listener; WavSource plays a recorded
+                16-bit WAV (benchmarks, see benchmarks/bench_voice.py)
+    VAD         each 30 ms chunk is speech or not (webrtcvad if installed,
+                else an energy detector with an adaptive noise floor);
+                an utterance starts at the first speech chunk (plus a
+                short pre-roll) and ends after "speech_hangover" seconds of
+                silence or "speech_max_utterance" seconds in all
+    recognizer  "vosk" decodes locally while the utterance is still being
+                spoken and reports partial text as it goes; "google" sends
+                the finished utterance to the Google Web Speech API
+
+SpeechListener.hypotheses() yields Hypothesis(text, final, onset, end,
+t): partial ones whenever the streaming text changes, then the final
+text of each utterance. onset/end bound the utterance's speech so far
+and t is when the hypothesis was made, all in seconds of audio. A
+caller that can act on a partial (the keyword has been heard) calls
+skip() so the rest of that utterance is dropped.
+
+Profile keys: "speech_engine" ("auto" = vosk when a model is installed,
+else google), "vosk_model" (model directory, default
+~/.nac/models/vosk-<language>), "vad" ("auto", "webrtc" or "energy"),
+"vad_ratio", "speech_hangover", "speech_max_utterance",
+"microphone_index".
+"""
+import os
+import json
+import time
+import wave
+import threading
+from collections import deque, namedtuple
+
+import numpy as np
+
+from utils.logger import log_event
+
+SAMPLE_RATE           = 16000
+CHUNK_MS              = 30      # webrtcvad accepts 10, 20 or 30 ms frames
+MODEL_DIR             = os.path.join(os.path.expanduser("~"), ".nac", "models")
+DEFAULT_ENGINE        = "auto"  # "auto", "vosk" or "google"
+DEFAULT_VAD           = "auto"  # "auto", "webrtc" or "energy"
+DEFAULT_VAD_RATIO     = 3.0     # energy VAD: speech above this × the noise floor
+DEFAULT_HANGOVER      = 0.8     # s of silence that ends an utterance
+DEFAULT_MAX_UTTERANCE = 5.0     # s; longer utterances are cut here
+PREROLL               = 0.3     # s of audio before the first speech chunk kept
+
+Hypothesis = namedtuple("Hypothesis", ["text", "final", "onset", "end", "t"])
+
+
+# ─── Audio sources ─────────────────────────────────────────────────────────
+class MicrophoneSource:
+    """16-bit mono chunks from one PyAudio input stream, opened once."""
+
+    def __init__(self, rate=SAMPLE_RATE, chunk_ms=CHUNK_MS, device=None):
+        import pyaudio
+        self.rate    = rate
+        self.chunk   = rate * chunk_ms // 1000
+        self._audio  = pyaudio.PyAudio()
+        self._stream = self._audio.open(format=pyaudio.paInt16, channels=1, rate=rate,
+                                        input=True, frames_per_buffer=self.chunk,
+                                        input_device_index=device)
+
+    def read(self):
+        """The next chunk (bytes); blocks until the microphone delivers it."""
+        return self._stream.read(self.chunk, exception_on_overflow=False)
+
+    def close(self):
+        self._stream.stop_stream()
+        self._stream.close()
+        self._audio.terminate()
+
+
+class WavSource:
+    """
+    A 16-bit WAV file as a MicrophoneSource stand-in (stereo is mixed down).
+    With `realtime` each chunk is delivered when it would have been
+    recorded; otherwise as fast as it is read. read() returns None at the end.
+    """
+
+    def __init__(self, path, chunk_ms=CHUNK_MS, realtime=False):
+        with wave.open(path, "rb") as w:
+            if w.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+            channels  = w.getnchannels()
+            self.rate = w.getframerate()
+            pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+        if channels > 1:
+            pcm = pcm.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        self.path     = path
+        self.pcm      = pcm
+        self.chunk    = self.rate * chunk_ms // 1000
+        self.realtime = realtime
+        self.pos      = 0
+        self._t0      = None
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / self.rate
+
+    def read(self):
+        if self.pos >= len(self.pcm):
+            return None
+        if self.realtime:
+            if self._t0 is None:
+                self._t0 = time.monotonic()
+            delay = self._t0 + (self.pos + self.chunk) / self.rate - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        chunk = self.pcm[self.pos:self.pos + self.chunk]
+        self.pos += self.chunk
+        return chunk.tobytes()
+
+    def close(self):
+        pass
+
+
+# ─── Voice activity detection ──────────────────────────────────────────────
+class EnergyVad:
+    """
+    Speech when a chunk's RMS exceeds `ratio` × the noise floor; the floor
+    follows the RMS of the non-speech chunks.
+    """
+
+    def __init__(self, ratio=DEFAULT_VAD_RATIO, floor=100.0):
+        self.ratio = ratio
+        self.floor = floor
+        self.noise = floor
+
+    def is_speech(self, chunk: bytes) -> bool:
+        x   = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(x * x))) if len(x) else 0.0
+        if rms > self.ratio * self.noise:
+            return True
+        self.noise = max(self.floor, 0.95 * self.noise + 0.05 * rms)
+        return False
+
+
+class WebRtcVad:
+    """The WebRTC VAD (`webrtcvad` package); `mode` 0–3, higher rejects more noise."""
+
+    def __init__(self, rate, mode=2):
+        import webrtcvad
+        self.rate = rate
+        self._vad = webrtcvad.Vad(mode)
+
+    def is_speech(self, chunk: bytes) -> bool:
+        return self._vad.is_speech(chunk, self.rate)
+
+
+def create_vad(settings: dict, rate):
+    """The VAD named by the profile's "vad" setting, for audio at `rate` Hz."""
+    name = settings.get("vad", DEFAULT_VAD)
+    if name not in ("auto", "webrtc", "energy"):
+        raise ValueError(f"Unknown VAD '{name}'")
+    if name != "energy" and rate in (8000, 16000, 32000, 48000):
+        try:
+            return WebRtcVad(rate)
+        except ImportError:
+            if name == "webrtc":
+                raise
+    return EnergyVad(float(settings.get("vad_ratio", DEFAULT_VAD_RATIO)))
+
+
+# ─── Recognizers ───────────────────────────────────────────────────────────
+class Recognizer:
+    """
+    A speech-to-text engine fed one utterance at a time as 16-bit mono
+    PCM chunks. Streaming engines return their partial text from
+    accept(); the others return "" until finish().
+    """
+    name      = "?"
+    streaming = False
+
+    def start(self, rate):
+        """Begin an utterance sampled at `rate` Hz."""
+        raise NotImplementedError
+
+    def accept(self, chunk: bytes) -> str:
+        """Feed one chunk; the text so far ("" if none yet)."""
+        raise NotImplementedError
+
+    def finish(self) -> str:
+        """End the utterance; its final text ("" if nothing was understood)."""
+        raise NotImplementedError
+
+
+class GoogleRecognizer(Recognizer):
+    """The Google Web Speech API via speech_recognition (needs network)."""
+    name = "google"
+
+    def __init__(self, language="en-US"):
+        import speech_recognition as sr
+        self.language = language
+        self._sr      = sr
+        self._engine  = sr.Recognizer()
+        self._chunks  = []
+        self._rate    = SAMPLE_RATE
+
+    def start(self, rate):
+        self._rate   = rate
+        self._chunks = []
+
+    def accept(self, chunk: bytes) -> str:
+        self._chunks.append(chunk)
+        return ""
+
+    def finish(self) -> str:
+        audio, self._chunks = self._sr.AudioData(b"".join(self._chunks), self._rate, 2), []
+        try:
+            return self._engine.recognize_google(audio, language=self.language).lower().strip()
+        except self._sr.UnknownValueError:
+            return ""
+        except self._sr.RequestError as e:
+            log_event("speech_error", f"google: {e}")
+            return ""
+
+
+_vosk_models = {}
+_vosk_lock   = threading.Lock()
+
+def vosk_model_path(settings: dict, language) -> str:
+    return settings.get("vosk_model") or os.path.join(MODEL_DIR, f"vosk-{language}")
+
+def load_vosk_model(model_path):
+    """The Vosk model in `model_path`, loaded once per process."""
+    import vosk
+    vosk.SetLogLevel(-1)
+    if not os.path.isdir(model_path):
+        raise FileNotFoundError(f"no Vosk model in {model_path}")
+    with _vosk_lock:
+        if model_path not in _vosk_models:
+            _vosk_models[model_path] = vosk.Model(model_path)
+        return _vosk_models[model_path]
+
+class VoskRecognizer(Recognizer):
+    """
+    Offline streaming recognition with a Vosk (Kaldi) model. The model is
+    loaded once per process and shared; decoding happens as chunks arrive,
+    so the text is ready moments after the speaker stops.
+    """
+    name      = "vosk"
+    streaming = True
+
+    def __init__(self, model_path, language="en-US"):
+        import vosk
+        self._model   = load_vosk_model(model_path)
+        self.language = language
+        self._vosk    = vosk
+        self._rec     = None
+        self._rate    = None
+        self._done    = []      # text of segments Vosk already closed itself
+
+    def start(self, rate):
+        if self._rec is None or rate != self._rate:
+            self._rec  = self._vosk.KaldiRecognizer(self._model, rate)
+            self._rate = rate
+        else:
+            self._rec.Reset()
+        self._done = []
+
+    def accept(self, chunk: bytes) -> str:
+        if self._rec.AcceptWaveform(chunk):
+            text = json.loads(self._rec.Result()).get("text", "")
+            if text:
+                self._done.append(text)
+            return " ".join(self._done)
+        partial = json.loads(self._rec.PartialResult()).get("partial", "")
+        return " ".join(self._done + [partial] if partial else self._done)
+
+    def finish(self) -> str:
+        text = json.loads(self._rec.FinalResult()).get("text", "")
+        return " ".join(self._done + [text] if text else self._done).strip()
+
+
+ENGINES = {
+    "google": GoogleRecognizer,
+    "vosk":   VoskRecognizer,
+}
+
+def create_recognizer(settings: dict, language=None) -> Recognizer:
+    """
+    The recognizer named by the profile's "speech_engine" setting. "auto"
+    picks vosk when it is installed with a model for the language, else google.
+    """
+    name     = settings.get("speech_engine", DEFAULT_ENGINE)
+    language = language or settings.get("language", "en-US")
+    if name not in ENGINES and name != "auto":
+        raise ValueError(f"Unknown speech engine '{name}'")
+    if name in ("auto", "vosk"):
+        try:
+            return VoskRecognizer(vosk_model_path(settings, language), language)
+        except (ImportError, FileNotFoundError) as e:
+            if name == "vosk":
+                raise
+            log_event("speech_engine", f"vosk unavailable ({e}); using google")
+    return GoogleRecognizer(language)
+
+
+# ─── Listener ──────────────────────────────────────────────────────────────
+class SpeechListener:
+    """
+    Reads `source` on the calling thread, segments it with `vad` and feeds
+    each utterance to `recognizer`. With `timer` (a StageTimer) the decoding
+    cost per chunk ("decode") and per utterance end ("finalize") is recorded.
+    While `mute()` is true (e.g. utils.tts SpeechOutput.is_speaking) the
+    audio is dropped and any utterance in progress is discarded.
+    """
+
+    def __init__(self, source, recognizer, vad, timer=None, mute=None):
+        self.source        = source
+        self.recognizer    = recognizer
+        self.vad           = vad
+        self.timer         = timer
+        self.mute          = mute
+        self.hangover      = DEFAULT_HANGOVER
+        self.max_utterance = DEFAULT_MAX_UTTERANCE
+        self._skip         = False
+        self._settings     = None
+        self._engine       = None   # (engine, language, model) the recognizer was built for
+        self._rebuild      = False
+        self._counts       = {"utterances": 0, "partials": 0, "finals": 0, "skipped": 0,
+                              "muted": 0}
+        self._audio        = 0.0    # seconds of audio read
+        self._muted        = 0.0    # seconds of it dropped while muted
+        self._busy         = 0.0    # seconds spent in the recognizer
+
+    def configure(self, settings: dict):
+        """Apply the profile's speech keys (no-op if `settings` is unchanged)."""
+        if settings is self._settings:
+            return self
+        self._settings     = settings
+        self.hangover      = float(settings.get("speech_hangover", DEFAULT_HANGOVER))
+        self.max_utterance = float(settings.get("speech_max_utterance", DEFAULT_MAX_UTTERANCE))
+        engine = (settings.get("speech_engine", DEFAULT_ENGINE),
+                  settings.get("language", "en-US"), settings.get("vosk_model"))
+        # a new language or engine takes effect from the next utterance
+        self._rebuild = self._rebuild or (self._engine is not None and engine != self._engine)
+        self._engine  = engine
+        return self
+
+    def skip(self):
+        """Drop the rest of the current utterance (its command already fired)."""
+        self._skip = True
+
+    def _decode(self, call, *args):
+        t0 = time.perf_counter()
+        out = call(*args)
+        dt = time.perf_counter() - t0
+        self._busy += dt
+        if self.timer is not None:
+            self.timer.record("decode" if args else "finalize", dt, t0)
+        return out
+
+    def hypotheses(self, stop=None):
+        """Yield Hypothesis tuples until the source ends or `stop` is set."""
+        rate    = self.source.rate
+        step    = self.source.chunk / rate
+        preroll = deque(maxlen=max(1, int(PREROLL / step)))
+        t       = 0.0
+        onset   = None      # stream time the current utterance began
+        last    = 0.0       # stream time of its latest speech chunk
+        text    = ""
+        while stop is None or not stop.is_set():
+            chunk = self.source.read()
+            if chunk is None:
+                break
+            t += len(chunk) / 2 / rate
+            self._audio = t
+            if self.mute is not None and self.mute():
+                self._muted += len(chunk) / 2 / rate
+                preroll.clear()
+                if onset is not None:
+                    onset = None
+                    self._counts["muted"] += 1
+                    self.recognizer.start(rate)   # discard the decoder state
+                continue
+            speech = self.vad.is_speech(chunk)
+            if onset is None:
+                if not speech:
+                    preroll.append(chunk)
+                    continue
+                onset, text, self._skip = t - step, "", False
+                self._counts["utterances"] += 1
+                if self._rebuild:
+                    self.recognizer, self._rebuild = create_recognizer(self._settings), False
+                self.recognizer.start(rate)
+                for old in preroll:
+                    self._decode(self.recognizer.accept, old)
+                preroll.clear()
+            if speech:
+                last = t
+            if not self._skip:
+                partial = self._decode(self.recognizer.accept, chunk)
+                if partial and partial != text:
+                    text = partial
+                    self._counts["partials"] += 1
+                    yield Hypothesis(partial, False, onset, last, t)
+            if t - last >= self.hangover or t - onset >= self.max_utterance:
+                began, onset = onset, None
+                if self._skip:
+                    self._counts["skipped"] += 1
+                    self.recognizer.start(rate)   # discard the decoder state
+                    continue
+                final = self._decode(self.recognizer.finish)
+                if final:
+                    self._counts["finals"] += 1
+                    yield Hypothesis(final, True, began, last, t)
+        # the source ended mid-utterance
+        if onset is not None and not self._skip and (stop is None or not stop.is_set()):
+            final = self._decode(self.recognizer.finish)
+            if final:
+                self._counts["finals"] += 1
+                yield Hypothesis(final, True, onset, last, t)
+
+    def stats(self) -> dict:
+        """Utterance/hypothesis counts; `rtf` is recognizer time per second of audio."""
+        out = dict(self._counts)
+        out["audio_s"] = round(self._audio, 1)
+        out["muted_s"] = round(self._muted, 1)
+        out["rtf"]     = round(self._busy / self._audio, 3) if self._audio else 0.0
+        return out
+
+    def close(self):
+        self.source.close()
+
+
+def create_listener(settings: dict, source=None, timer=None, mute=None) -> SpeechListener:
+    """
+    A configured listener on `source` (default: the profile's microphone),
+    deaf while `mute()` is true.
+    """
+    if source is None:
+        source = MicrophoneSource(device=settings.get("microphone_index"))
+    return SpeechListener(source, create_recognizer(settings),
+                          create_vad(settings, source.rate), timer, mute).configure(settings)
@@ -0,0 +1,213 @@
+"""
+Per-stage latency telemetry for the input pipelines.
+
+Each pipeline (and the camera and output threads) owns a StageTimer and
+marks its stages as it goes:
+
+    timer = stage_timer("gesture")
+    timer.start()                 # frame handed to the pipeline
+    result = hands.process(rgb)
+    timer.lap("inference")        # time since the previous mark
+    ...
+    timer.frame()                 # end of frame: "total" and fps
+
+Every stage keeps a rolling window of its last WINDOW samples, from
+which snapshot() reports p50/p95/p99/max in milliseconds, plus the
+pipeline's frame rate. A lap costs two clock reads and a deque append.
+While span tracing is on (utils.spans), laps are kept as spans too.
+
+The numbers are exposed two ways: the warm engine answers
+{"cmd": "telemetry"} with snapshot(), and with "telemetry": true in the
+profile a background thread rewrites TELEMETRY_FILE (JSON) every
+"telemetry_interval" seconds. `python utils/telemetry.py [--engine]
+[--watch]` prints that file (or asks the engine) as a table.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from collections import deque
+
+from utils import spans
+
+TELEMETRY_FILE   = os.path.join(os.path.expanduser("~"), ".nac", "telemetry.json")
+WINDOW           = 512    # samples kept per stage
+DEFAULT_INTERVAL = 1.0    # seconds between file updates
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class StageTimer:
+    """Rolling per-stage durations and frame rate for one pipeline."""
+
+    def __init__(self, name, window=WINDOW):
+        self.name    = name
+        self.window  = window
+        self.frames  = 0
+        self._stages = {}
+        self._ends   = deque(maxlen=window)   # frame end times, for fps
+        self._t0     = None
+        self._mark   = None
+
+    def start(self):
+        """Begin a frame (or any timed unit of work)."""
+        self._t0 = self._mark = time.perf_counter()
+
+    def lap(self, stage):
+        """Record the time since start() or the previous lap() under `stage`."""
+        now = time.perf_counter()
+        if self._mark is not None:
+            self.record(stage, now - self._mark, self._mark)
+        self._mark = now
+
+    def record(self, stage, seconds, start=None):
+        """
+        Add one `stage` sample measured elsewhere (seconds). With `start`
+        (its time.perf_counter() start) it is also traced as a span.
+        """
+        samples = self._stages.get(stage)
+        if samples is None:
+            samples = self._stages[stage] = deque(maxlen=self.window)
+        samples.append(seconds)
+        tracer = spans.tracer
+        if tracer is not None and start is not None:
+            tracer.add(stage, self.name, start, seconds)
+
+    def frame(self):
+        """End the frame: record "total" since start() and count it for fps."""
+        now = time.perf_counter()
+        if self._t0 is not None:
+            self.record("total", now - self._t0, self._t0)
+        self._t0 = self._mark = None
+        self._ends.append(now)
+        self.frames += 1
+
+    def snapshot(self) -> dict:
+        ends = list(self._ends)
+        span = ends[-1] - ends[0] if len(ends) > 1 else 0.0
+        out  = {"frames": self.frames, "fps": round((len(ends) - 1) / span, 1) if span > 0 else 0.0,
+                "stages": {}}
+        for stage, samples in list(self._stages.items()):
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            out["stages"][stage] = {
+                "n":      len(ordered),
+                "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+                "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+                "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return out
+
+
+_timers = {}
+_timers_lock = threading.Lock()
+
+def stage_timer(name) -> StageTimer:
+    """The process-wide timer for pipeline `name`, created on first use."""
+    timer = _timers.get(name)
+    if timer is None:
+        with _timers_lock:
+            timer = _timers.setdefault(name, StageTimer(name))
+    return timer
+
+def snapshot() -> dict:
+    """Every pipeline's current numbers, keyed by name."""
+    return {"time": time.time(), "pid": os.getpid(),
+            "pipelines": {name: t.snapshot() for name, t in list(_timers.items())}}
+
+
+# ─── File export ───────────────────────────────────────────────────────────
+class _FileExporter:
+    """Rewrites `path` with snapshot() every `interval` seconds, atomically."""
+
+    def __init__(self, path, interval):
+        self.path     = path
+        self.interval = interval
+        self._stop    = threading.Event()
+        self._thread  = threading.Thread(target=self._run, name="nac-telemetry", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+        self.write()
+
+    def write(self):
+        folder = os.path.dirname(self.path)
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".telemetry.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(snapshot(), f, indent=1)
+            os.replace(tmp, self.path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+
+
+_exporter = None
+
+def start_export(settings: dict):
+    """Start the file exporter if the profile enables "telemetry" (idempotent)."""
+    global _exporter
+    with _timers_lock:
+        if _exporter is None and settings.get("telemetry", False):
+            _exporter = _FileExporter(TELEMETRY_FILE,
+                                      float(settings.get("telemetry_interval", DEFAULT_INTERVAL)))
+    return _exporter
+
+def stop_export():
+    """Write a final snapshot and stop the file exporter, if running."""
+    global _exporter
+    with _timers_lock:
+        exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.stop()
+
+
+# ─── Viewer ────────────────────────────────────────────────────────────────
+def format_table(snap: dict) -> str:
+    lines = [f"{'pipeline':<16} {'stage':<11} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+             f"{'max ms':>8} {'fps':>6}"]
+    for name, p in sorted(snap.get("pipelines", {}).items()):
+        fps = f"{p['fps']:6.1f}"
+        for stage, s in p["stages"].items():
+            lines.append(f"{name:<16} {stage:<11} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} "
+                         f"{s['p99_ms']:8.2f} {s['max_ms']:8.2f} {fps}")
+            name, fps = "", ""
+    return "\n".join(lines)
+
+def _read(from_engine):
+    if from_engine:
+        sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+        from input_handlers.nac_engine import EngineClient
+        try:
+            return EngineClient().telemetry()
+        except OSError as e:
+            sys.exit(f"engine not reachable: {e}")
+    try:
+        with open(TELEMETRY_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        sys.exit(f"no telemetry in {TELEMETRY_FILE}: {e}")
+
+if __name__ == "__main__":
+    while True:
+        snap = _read("--engine" in sys.argv)
+        age = time.time() - snap.get("time", 0)
+        print(f"pid {snap.get('pid')}, {age:.1f} s old")
+        print(format_table(snap))
+        if "--watch" not in sys.argv:
+            break
+        time.sleep(DEFAULT_INTERVAL)
+        print()
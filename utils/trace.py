@@ -0,0 +1,269 @@
+"""
+Record-and-replay of input sessions, so the vision pipelines can be run
+and timed without a webcam or a person in front of it.
+
+A trace is a JSON-lines file: one header line, then one line per frame
+
+    {"nac_trace": 1, "frame_size": [w, h], "streams": [...], "video": "x.avi"}
+    {"seq": 12, "t": 0.40, "frame": 3,
+     "hands": [{"label": "Right", "score": 0.98, "landmarks": [[x, y, z], ...]}],
+     "face": [[x, y, z], ...]}
+
+"t" is seconds since the first frame. "hands"/"face" hold the MediaPipe
+outputs ("face" is null when no face was found); "frame" indexes the
+optional companion video, which stores the camera image un-mirrored, as
+the camera delivered it.
+
+ReplayCapture stands in for cv2.VideoCapture (and can be handed to
+FrameProducer as its device); ReplayHands / ReplayFaceMesh stand in for
+the MediaPipe models and return the landmarks recorded for the frame the
+capture last delivered.
+"""
+import os
+import sys
+import json
+import time
+import threading
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+TRACE_VERSION = 1
+# Records still missing a stream are written anyway once this many frames behind
+FLUSH_LAG     = 30
+
+
+# ─── MediaPipe result ↔ JSON ───────────────────────────────────────────────
+def hands_to_json(result) -> list:
+    if not (result.multi_hand_landmarks and result.multi_handedness):
+        return []
+    return [
+        {
+            "label": hm.classification[0].label,
+            "score": round(hm.classification[0].score, 4),
+            "landmarks": [[p.x, p.y, p.z] for p in lms.landmark],
+        }
+        for hm, lms in zip(result.multi_handedness, result.multi_hand_landmarks)
+    ]
+
+def face_to_json(result):
+    if not result.multi_face_landmarks:
+        return None
+    return [[p.x, p.y, p.z] for p in result.multi_face_landmarks[0].landmark]
+
+
+class _Landmark(SimpleNamespace):
+    """Replayed landmark; HasField keeps mediapipe.drawing_utils happy."""
+
+    def HasField(self, name):
+        return False
+
+def _landmark_list(points):
+    return SimpleNamespace(landmark=[_Landmark(x=x, y=y, z=z) for x, y, z in points])
+
+def hands_from_json(hands):
+    if not hands:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    return SimpleNamespace(
+        multi_hand_landmarks=[_landmark_list(h["landmarks"]) for h in hands],
+        multi_handedness=[
+            SimpleNamespace(classification=[SimpleNamespace(label=h["label"], score=h["score"])])
+            for h in hands
+        ],
+    )
+
+def face_from_json(face):
+    if face is None:
+        return SimpleNamespace(multi_face_landmarks=None)
+    return SimpleNamespace(multi_face_landmarks=[_landmark_list(face)])
+
+
+# ─── Recording ─────────────────────────────────────────────────────────────
+class TraceRecorder:
+    """
+    Writes a trace while a module runs. Several threads may add() parts of
+    the same frame (e.g. hands from the gesture thread, face from the eye
+    thread); a record is written once every stream in `streams` is present.
+    """
+
+    def __init__(self, path, streams=("hands",), record_frames=True):
+        self.path       = path
+        self.streams    = set(streams)
+        self.video_path = os.path.splitext(path)[0] + ".avi" if record_frames else None
+        self._file      = open(path, "w")
+        self._video     = None
+        self._frames    = 0
+        self._t0        = None
+        self._size      = None
+        self._header    = False
+        self._pending   = {}
+        self._lock      = threading.Lock()
+
+    def add(self, seq, timestamp, frame=None, hands=None, face=None):
+        """
+        Add one frame's data. `hands`/`face` are MediaPipe results; `frame`
+        is the mirrored BGR image the modules see (stored un-mirrored).
+        """
+        with self._lock:
+            if self._t0 is None:
+                self._t0 = timestamp
+            rec = self._pending.setdefault(seq, {"seq": seq, "t": round(timestamp - self._t0, 4)})
+            if hands is not None:
+                rec["hands"] = hands_to_json(hands)
+            if face is not None:
+                rec["face"] = face_to_json(face)
+            if frame is not None and "frame" not in rec:
+                self._size = (frame.shape[1], frame.shape[0])
+                if self.video_path is not None:
+                    self._write_frame(frame)
+                    rec["frame"] = self._frames - 1
+            self._flush(seq)
+
+    def _write_frame(self, frame):
+        if self._video is None:
+            self._video = cv2.VideoWriter(
+                self.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 30, self._size
+            )
+        self._video.write(cv2.flip(frame, 1))
+        self._frames += 1
+
+    def _flush(self, latest, force=False):
+        for seq in sorted(self._pending):
+            rec = self._pending[seq]
+            if force or self.streams <= rec.keys() or seq < latest - FLUSH_LAG:
+                if not self._header:
+                    self._file.write(json.dumps({
+                        "nac_trace":  TRACE_VERSION,
+                        "frame_size": list(self._size) if self._size else None,
+                        "streams":    sorted(self.streams),
+                        "video":      os.path.basename(self.video_path) if self.video_path else None,
+                    }) + "\n")
+                    self._header = True
+                self._file.write(json.dumps(rec) + "\n")
+                del self._pending[seq]
+
+    def close(self):
+        with self._lock:
+            self._flush(0, force=True)
+            self._file.close()
+            if self._video is not None:
+                self._video.release()
+
+
+def record_path_from_argv(argv=None):
+    """Return the path given as `--record PATH` on the command line, or None."""
+    argv = sys.argv if argv is None else argv
+    if "--record" in argv:
+        i = argv.index("--record")
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return None
+
+
+# ─── Replay ────────────────────────────────────────────────────────────────
+class TraceReader:
+    """Parsed trace: header fields plus the list of per-frame records."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path) as f:
+            header       = json.loads(f.readline())
+            self.records = [json.loads(line) for line in f if line.strip()]
+        if header.get("nac_trace") != TRACE_VERSION:
+            raise ValueError(f"{path}: not a version {TRACE_VERSION} NAC trace")
+        self.frame_size = tuple(header["frame_size"] or (640, 480))
+        self.streams    = header.get("streams", [])
+        video           = header.get("video")
+        self.video_path = os.path.join(os.path.dirname(path), video) if video else None
+        if self.video_path and not os.path.isfile(self.video_path):
+            self.video_path = None
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self) -> float:
+        return self.records[-1]["t"] if self.records else 0.0
+
+
+class ReplayCapture:
+    """
+    cv2.VideoCapture stand-in that plays a trace back. With realtime=True
+    read() is paced by the recorded timestamps; otherwise frames come as
+    fast as they are asked for. `current` is the record last delivered.
+    """
+
+    def __init__(self, trace, realtime=False):
+        self.trace    = trace if isinstance(trace, TraceReader) else TraceReader(trace)
+        self.realtime = realtime
+        self.current  = None
+        self._cursor  = 0
+        self._start   = None
+        self._video   = cv2.VideoCapture(self.trace.video_path) if self.trace.video_path else None
+        self._vidpos  = 0
+        w, h = self.trace.frame_size
+        self._blank   = np.zeros((h, w, 3), dtype=np.uint8)
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        if self._cursor >= len(self.trace.records):
+            return False, None
+        rec = self.trace.records[self._cursor]
+        self._cursor += 1
+        if self.realtime:
+            if self._start is None:
+                self._start = time.monotonic()
+            delay = self._start + rec["t"] - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        frame = self._blank
+        if self._video is not None and "frame" in rec:
+            while self._vidpos <= rec["frame"]:
+                ok, img = self._video.read(image)
+                self._vidpos += 1
+                if not ok:
+                    break
+                frame = img
+        self.current = rec
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.trace.frame_size[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.trace.frame_size[1])
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(len(self.trace.records))
+        return 0.0
+
+    def set(self, prop, value):
+        return True
+
+    def release(self):
+        if self._video is not None:
+            self._video.release()
+
+
+class ReplayHands:
+    """Stands in for mp.solutions.hands.Hands: returns the recorded hands."""
+
+    def __init__(self, capture):
+        self.capture = capture
+
+    def process(self, rgb):
+        rec = self.capture.current or {}
+        return hands_from_json(rec.get("hands"))
+
+
+class ReplayFaceMesh:
+    """Stands in for mp.solutions.face_mesh.FaceMesh: returns the recorded face."""
+
+    def __init__(self, capture):
+        self.capture = capture
+
+    def process(self, rgb):
+        rec = self.capture.current or {}
+        return face_from_json(rec.get("face"))
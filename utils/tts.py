@@ -0,0 +1,258 @@
+"""
+Spoken feedback without blocking the input loops.
+
+One long-lived worker thread owns the pyttsx3 engine (created once, on
+that thread) and speaks what say() queues; callers return at once.
+
+    interruption  say() supersedes whatever is still queued or playing,
+                  so feedback for an old command never delays the newest
+                  one; say(..., interrupt=False) queues behind it instead
+    cache         fixed phrases handed to prerender() are synthesized to
+                  WAV files under CACHE_DIR while the worker is idle and
+                  played from memory afterwards (through PyAudio), which
+                  starts in milliseconds instead of a synthesis round;
+                  files are keyed by voice, rate and text and kept across
+                  runs. Anything else is synthesized live.
+    echo          is_speaking() is true from say() until ECHO_TAIL
+                  seconds after the reply has finished playing; the
+                  speech listeners ignore the microphone meanwhile, so
+                  NAC never takes its own replies for commands
+
+"tts_cache": false in the profile disables the cache.
+"""
+import os
+import wave
+import hashlib
+import tempfile
+import threading
+import time
+from collections import deque
+
+from utils.logger import log_event
+from utils.telemetry import stage_timer
+
+CACHE_DIR    = os.path.join(os.path.expanduser("~"), ".nac", "tts_cache")
+PLAY_CHUNK   = 1024    # frames per write; interruption is checked between writes
+ECHO_TAIL    = 0.4     # s after a reply during which is_speaking() stays true
+
+
+class SpeechOutput:
+    """The speech-output worker; use get_speech() for the process-wide one."""
+
+    def __init__(self, cache=True, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir if cache else None
+        self._queue    = deque()             # (generation, text, queued at)
+        self._render   = deque()             # phrases still to pre-render
+        self._cached   = {}                  # text → ((rate, channels, width), PCM bytes)
+        self._cond     = threading.Condition()
+        self._gen      = 0                   # bumped by every interrupting say()
+        self._busy     = False               # a reply is being spoken
+        self._quiet_at = 0.0                 # monotonic time the last reply's tail ends
+        self._closed   = False
+        self._thread   = None
+        self._engine   = None
+        self._playing  = None                # generation being synthesized live
+        self._key      = ""                  # voice and rate, part of the cache key
+        self._audio    = None                # PyAudio instance, for cached playback
+        self._streams  = {}                  # (rate, channels, width) → output stream
+        self._timer    = stage_timer("tts")
+        self._counts   = {"said": 0, "cached": 0, "live": 0, "interrupted": 0,
+                          "dropped": 0, "rendered": 0}
+
+    # ─── Caller side ──────────────────────────────────────────────────────
+    def say(self, text: str, interrupt=True):
+        """Queue `text`; with `interrupt`, stop and drop everything said before it."""
+        if not text or self._closed:
+            return
+        with self._cond:
+            self._start()
+            if interrupt:
+                self._gen += 1
+                self._counts["dropped"] += len(self._queue)
+                self._queue.clear()
+            self._queue.append((self._gen, text, time.perf_counter()))
+            self._counts["said"] += 1
+            self._cond.notify()
+
+    def prerender(self, phrases):
+        """Render `phrases` to the cache in the background (already cached ones are skipped)."""
+        if self.cache_dir is None:
+            return
+        with self._cond:
+            self._start()
+            self._render.extend(p for p in phrases if p not in self._render)
+            self._cond.notify()
+
+    def stop(self):
+        """Silence the current utterance and drop the queue."""
+        with self._cond:
+            self._gen += 1
+            self._counts["dropped"] += len(self._queue)
+            self._queue.clear()
+
+    def is_speaking(self) -> bool:
+        """Whether a reply is queued, playing or ended less than ECHO_TAIL s ago."""
+        # read without the lock: polled for every microphone chunk
+        return bool(self._queue) or self._busy or time.monotonic() < self._quiet_at
+
+    def wait(self, timeout=None) -> bool:
+        """Block until everything queued has been spoken; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._closed or not (self._queue or self._busy), timeout)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = dict(self._counts)
+        out["cache_size"] = len(self._cached)
+        return out
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nac-tts", daemon=True)
+            self._thread.start()
+
+    def _stale(self, gen) -> bool:
+        return gen != self._gen or self._closed
+
+    # ─── Worker side ──────────────────────────────────────────────────────
+    def _run(self):
+        try:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+        except Exception as e:
+            log_event("tts_error", f"no speech output: {e}")
+            self.close()
+            return
+        self._engine.connect("started-word", self._on_word)
+        self._key    = f"{self._engine.getProperty('voice')}|{self._engine.getProperty('rate')}"
+        while True:
+            with self._cond:
+                if self._busy:
+                    self._quiet_at = time.monotonic() + ECHO_TAIL
+                self._busy = False
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._queue or self._render or self._closed)
+                if self._closed:
+                    break
+                item   = self._queue.popleft() if self._queue else None
+                phrase = self._render.popleft() if item is None else None
+                self._busy = item is not None
+            try:
+                if item is not None:
+                    self._speak(*item)
+                else:
+                    self._prerender(phrase)
+            except Exception as e:   # a bad voice or device must not kill the worker
+                log_event("tts_error", str(e))
+        for stream in self._streams.values():
+            stream.close()
+        if self._audio is not None:
+            self._audio.terminate()
+
+    def _speak(self, gen, text, queued):
+        if self._stale(gen):
+            return
+        with self._cond:
+            pending = text in self._render
+        if pending and text not in self._cached:
+            # rendered on an earlier run but not loaded yet
+            path = self._cache_path(text)
+            if os.path.isfile(path):
+                self._load(text, path)
+        start = time.perf_counter()
+        self._timer.record("start", start - queued, queued)
+        if text in self._cached and self._play(text, gen):
+            self._counts["cached"] += 1
+        else:
+            self._playing = gen
+            self._engine.say(text)
+            self._engine.runAndWait()
+            self._playing = None
+            self._counts["live"] += 1
+        if self._stale(gen):
+            self._counts["interrupted"] += 1
+        self._timer.record("speak", time.perf_counter() - start, start)
+
+    def _on_word(self, name, location, length):
+        # runs inside runAndWait(), on the worker thread
+        if self._playing is not None and self._stale(self._playing):
+            self._engine.stop()
+
+    def _cache_path(self, text):
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha1(f"{self._key}|{text}".encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{digest}.wav")
+
+    def _prerender(self, text):
+        path = self._cache_path(text)
+        if path is None or text in self._cached:
+            return
+        if not os.path.isfile(path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, prefix=".render.", suffix=".wav")
+            os.close(fd)
+            try:
+                self._engine.save_to_file(text, tmp)
+                self._engine.runAndWait()
+                if os.path.getsize(tmp) == 0:
+                    return
+                os.replace(tmp, path)
+                self._counts["rendered"] += 1
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        self._load(text, path)
+
+    def _load(self, text, path):
+        try:
+            with wave.open(path, "rb") as w:
+                fmt = (w.getframerate(), w.getnchannels(), w.getsampwidth())
+                self._cached[text] = (fmt, w.readframes(w.getnframes()))
+        except (OSError, EOFError, wave.Error) as e:
+            log_event("tts_cache", f"{path}: {e}")
+
+    def _play(self, text, gen) -> bool:
+        """Play a cached phrase, stopping early if superseded; False if it can't be played."""
+        fmt, pcm = self._cached[text]
+        try:
+            if self._audio is None:
+                import pyaudio
+                self._audio = pyaudio.PyAudio()
+            stream = self._streams.get(fmt)
+            if stream is None:
+                stream = self._streams[fmt] = self._audio.open(
+                    format=self._audio.get_format_from_width(fmt[2]),
+                    channels=fmt[1], rate=fmt[0], output=True)
+        except (ImportError, OSError) as e:
+            log_event("tts_cache", f"no audio output for cached phrases ({e}); speaking live")
+            self._cached.clear()
+            self.cache_dir = None
+            return False
+        step = PLAY_CHUNK * fmt[1] * fmt[2]
+        for i in range(0, len(pcm), step):
+            if self._stale(gen):
+                break
+            stream.write(pcm[i:i + step])
+        return True
+
+
+_speech = None
+_speech_lock = threading.Lock()
+
+def get_speech(settings: dict = None) -> SpeechOutput:
+    """The process-wide speech output, created on first use (from `settings`, if given)."""
+    global _speech
+    with _speech_lock:
+        if _speech is None:
+            _speech = SpeechOutput(cache=(settings or {}).get("tts_cache", True))
+        return _speech
@@ -0,0 +1,349 @@
+"""
+Wake-word gating for the hybrid voice thread.
+
+    capture   AudioRing reads the microphone on its own thread, all the
+              time, into a preallocated ring of the last "audio_buffer"
+              seconds, so nothing is lost while the consumer is busy and
+              any recent audio can be read again
+    idle      only the VAD runs on the live audio; speech segments go to
+              a small keyword spotter (Vosk restricted to a grammar of
+              the wake phrases), which costs a fraction of full
+              recognition and nothing at all in silence
+    awake     once a wake phrase is heard, the full recognizer (see
+              utils.speech) is run from "wake_preroll" seconds before the
+              start of that utterance, read back from the ring, so a
+              command said in the same breath is not clipped. It stays
+              awake until a command has been recognized or
+              "wake_window" seconds after the wake phrase, whichever is
+              first; the wake phrase itself is removed from the text.
+
+WakeGate has the SpeechListener interface (hypotheses(), skip(),
+configure(), stats(), close()), so the voice thread uses either.
+create_wake_listener() returns a gate when "wake_words" (default
+["hey computer"]; [] turns gating off) can be spotted, i.e. Vosk and a
+model for the language are installed, else a plain listener on the ring.
+Wake phrases must be words the model knows.
+"""
+import json
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+from utils.logger import log_event
+from utils.speech import (
+    MicrophoneSource, SpeechListener, create_recognizer, create_vad, load_vosk_model,
+    vosk_model_path, DEFAULT_HANGOVER, DEFAULT_MAX_UTTERANCE,
+)
+from utils.commands import tokenize
+
+DEFAULT_WAKE_WORDS = ["hey computer"]
+DEFAULT_WINDOW     = 5.0    # s awake after the wake phrase
+DEFAULT_PREROLL    = 0.5    # s replayed from before the wake utterance's onset
+DEFAULT_BUFFER     = 10.0   # s of audio kept in the ring
+
+
+# ─── Capture ───────────────────────────────────────────────────────────────
+class AudioRing:
+    """
+    The last `seconds` of `source` (16-bit mono), filled by a capture
+    thread. Positions are sample counts since capture began; `written`
+    is the newest. Reads of audio already overwritten skip forward.
+    Capture starts on the first read, so readers created before it,
+    at position 0, see the source from its first sample.
+    """
+
+    def __init__(self, source, seconds=DEFAULT_BUFFER):
+        self.source   = source
+        self.rate     = source.rate
+        self.chunk    = source.chunk
+        self.size     = int(seconds * self.rate)
+        self.buf      = np.zeros(self.size, dtype=np.int16)
+        self.written  = 0
+        self.ended    = False
+        self.overruns = 0       # reads that had fallen behind the ring
+        self._cond    = threading.Condition()
+        self._closed  = False
+        self._thread  = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nac-audio", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._closed:
+            data = self.source.read()
+            if data is None:
+                break
+            x = np.frombuffer(data, dtype=np.int16)
+            i = self.written % self.size
+            n = min(len(x), self.size - i)
+            self.buf[i:i + n] = x[:n]
+            self.buf[:len(x) - n] = x[n:]
+            with self._cond:
+                self.written += len(x)
+                self._cond.notify_all()
+        with self._cond:
+            self.ended = True
+            self._cond.notify_all()
+
+    def read(self, pos, n):
+        """(start, bytes) for up to `n` samples from `pos`, waiting for them; None at the end."""
+        if self._thread is None:
+            self.start()
+        with self._cond:
+            self._cond.wait_for(lambda: self.written >= pos + n or self.ended or self._closed)
+            oldest = self.written - self.size
+            if pos < oldest:
+                pos = oldest
+                self.overruns += 1
+            end = min(pos + n, self.written)
+        if end <= pos:
+            return None
+        i, j = pos % self.size, end % self.size
+        if i < j:
+            data = self.buf[i:j].tobytes()
+        else:
+            data = self.buf[i:].tobytes() + self.buf[:j].tobytes()
+        return pos, data
+
+    def reader(self, start=None, end=None, owner=False):
+        """
+        A source reading the ring from `start` (default: now) up to `end`
+        (default: forever); closing an `owner` reader closes the ring.
+        """
+        return RingReader(self, self.written if start is None else start, end, owner)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.source.close()
+
+
+class RingReader:
+    """One cursor into an AudioRing, usable wherever a MicrophoneSource is."""
+
+    def __init__(self, ring, pos, end=None, owner=False):
+        self.ring  = ring
+        self.rate  = ring.rate
+        self.chunk = ring.chunk
+        self.pos   = pos
+        self.end   = end
+        self.owner = owner
+
+    def read(self):
+        n = self.chunk if self.end is None else min(self.chunk, self.end - self.pos)
+        if n <= 0:
+            return None
+        got = self.ring.read(self.pos, n)
+        if got is None:
+            return None
+        start, data = got
+        self.pos = start + len(data) // 2
+        return data
+
+    def close(self):
+        if self.owner:
+            self.ring.close()
+
+
+# ─── Wake phrase spotting ──────────────────────────────────────────────────
+class VoskWakeWord:
+    """Vosk restricted to the wake phrases; far cheaper than open-vocabulary decoding."""
+
+    def __init__(self, model_path, phrases):
+        import vosk
+        self.phrases = [" ".join(tokenize(p)) for p in phrases]
+        self._vosk   = vosk
+        self._model  = load_vosk_model(model_path)
+        self._rec    = None
+        self._rate   = None
+
+    def start(self, rate):
+        if self._rec is None or rate != self._rate:
+            grammar = json.dumps(self.phrases + ["[unk]"], ensure_ascii=False)
+            self._rec  = self._vosk.KaldiRecognizer(self._model, rate, grammar)
+            self._rate = rate
+        else:
+            self._rec.Reset()
+
+    def accept(self, chunk: bytes) -> bool:
+        """Feed a chunk of the current utterance; True once a wake phrase is heard."""
+        if self._rec.AcceptWaveform(chunk):
+            text = json.loads(self._rec.Result()).get("text", "")
+        else:
+            text = json.loads(self._rec.PartialResult()).get("partial", "")
+        return any(p in text for p in self.phrases)
+
+
+# ─── Gate ──────────────────────────────────────────────────────────────────
+class WakeGate:
+    """Full recognition only after a wake phrase; see the module docstring."""
+
+    def __init__(self, ring, detector, listener, vad, timer=None, mute=None):
+        self.ring          = ring
+        self.detector      = detector
+        self.listener      = listener   # SpeechListener, pointed at the ring while awake
+        self.vad           = vad
+        self.timer         = timer
+        self.mute          = mute       # as SpeechListener's: no spotting while true
+        self.window        = DEFAULT_WINDOW
+        self.preroll       = DEFAULT_PREROLL
+        self.hangover      = DEFAULT_HANGOVER
+        self.max_utterance = DEFAULT_MAX_UTTERANCE
+        self._settings     = None
+        self._fired        = False      # skip() called: a partial already gave the command
+        self._spot         = 0.0        # seconds spent spotting
+        self._awake        = 0          # samples fed to the full recognizer
+        self._counts       = {"segments": 0, "wakes": 0, "commands": 0, "timeouts": 0}
+
+    def configure(self, settings: dict):
+        """Apply the gate's and the listener's profile keys (no-op if unchanged)."""
+        if settings is self._settings:
+            return self
+        self._settings     = settings
+        self.window        = float(settings.get("wake_window", DEFAULT_WINDOW))
+        self.preroll       = float(settings.get("wake_preroll", DEFAULT_PREROLL))
+        self.hangover      = float(settings.get("speech_hangover", DEFAULT_HANGOVER))
+        self.max_utterance = float(settings.get("speech_max_utterance", DEFAULT_MAX_UTTERANCE))
+        self.listener.configure(settings)
+        return self
+
+    def skip(self):
+        self._fired = True
+        self.listener.skip()
+
+    def _spot_wake(self, reader, stop):
+        """Read until a wake phrase is heard; its utterance's onset (ring position) or None."""
+        rate    = self.ring.rate
+        preroll = deque(maxlen=max(1, int(0.3 * rate / self.ring.chunk)))
+        onset   = None
+        last    = 0
+        while stop is None or not stop.is_set():
+            pos   = reader.pos
+            chunk = reader.read()
+            if chunk is None:
+                return None
+            if self.mute is not None and self.mute():
+                preroll.clear()
+                onset = None
+                continue
+            speech = self.vad.is_speech(chunk)
+            if onset is None:
+                if not speech:
+                    preroll.append(chunk)
+                    continue
+                onset = pos - sum(len(c) // 2 for c in preroll)
+                self._counts["segments"] += 1
+                t0 = time.perf_counter()
+                self.detector.start(rate)
+                for old in preroll:
+                    self.detector.accept(old)
+                self._spot += time.perf_counter() - t0
+                preroll.clear()
+            if speech:
+                last = reader.pos
+            t0 = time.perf_counter()
+            heard = self.detector.accept(chunk)
+            dt = time.perf_counter() - t0
+            self._spot += dt
+            if self.timer is not None:
+                self.timer.record("spot", dt, t0)
+            if heard:
+                return onset
+            if (reader.pos - last) / rate >= self.hangover or \
+               (reader.pos - onset) / rate >= self.max_utterance:
+                onset = None
+        return None
+
+    def _strip(self, text):
+        words = tokenize(text)
+        for phrase in self.detector.phrases:
+            wake = phrase.split()
+            for i in range(len(words) - len(wake) + 1):
+                if words[i:i + len(wake)] == wake:
+                    return " ".join(words[i + len(wake):])
+        return text
+
+    def hypotheses(self, stop=None):
+        """Yield Hypothesis tuples of what is said after a wake phrase."""
+        reader = self.ring.reader()
+        rate   = self.ring.rate
+        while stop is None or not stop.is_set():
+            onset = self._spot_wake(reader, stop)
+            if onset is None:
+                break
+            self._counts["wakes"] += 1
+            log_event("wake_word", f"at {reader.pos / rate:.1f} s")
+            start = max(0, onset - int(self.preroll * rate))
+            awake = self.ring.reader(start, end=reader.pos + int(self.window * rate))
+            self.listener.source = awake
+            self._fired = fired = False
+            offset = start / rate      # listener times → seconds since capture began
+            for hyp in self.listener.hypotheses(stop):
+                text = self._strip(hyp.text)
+                if not text:
+                    continue
+                yield hyp._replace(text=text, onset=hyp.onset + offset,
+                                   end=hyp.end + offset, t=hyp.t + offset)
+                if hyp.final or self._fired:
+                    fired = True
+                    break
+            self._awake += awake.pos - start
+            self._counts["commands" if fired else "timeouts"] += 1
+            # back to spotting from where recognition stopped
+            reader.pos = max(reader.pos, awake.pos)
+
+    def stats(self) -> dict:
+        """Gate counts; `awake_share` is the part of the audio given to the full recognizer."""
+        out   = dict(self._counts)
+        audio = self.ring.written / self.ring.rate
+        out.update({
+            "audio_s":     round(audio, 1),
+            "awake_share": round(self._awake / self.ring.written, 3) if self.ring.written else 0.0,
+            "spot_rtf":    round(self._spot / audio, 4) if audio else 0.0,
+            "overruns":    self.ring.overruns,
+            "recognizer":  self.listener.stats(),
+        })
+        return out
+
+    def close(self):
+        self.ring.close()
+
+
+# ─── Factory ───────────────────────────────────────────────────────────────
+def create_wake_detector(settings: dict):
+    """A spotter for the profile's "wake_words", or None if gating is off or unavailable."""
+    phrases = settings.get("wake_words", DEFAULT_WAKE_WORDS)
+    if not phrases:
+        return None
+    path = vosk_model_path(settings, settings.get("language", "en-US"))
+    try:
+        return VoskWakeWord(path, phrases)
+    except (ImportError, FileNotFoundError) as e:
+        log_event("wake_word", f"spotting unavailable ({e}); listening to everything")
+        return None
+
+def create_wake_listener(settings: dict, source=None, timer=None, mute=None):
+    """
+    Continuous capture from `source` (default: the profile's microphone)
+    into a ring, with a WakeGate in front of recognition when possible;
+    both ignore the audio while `mute()` is true.
+    """
+    if source is None:
+        source = MicrophoneSource(device=settings.get("microphone_index"))
+    # not started: capture begins when recognition first reads the ring
+    ring     = AudioRing(source, float(settings.get("audio_buffer", DEFAULT_BUFFER)))
+    listener = SpeechListener(ring.reader(owner=True), create_recognizer(settings),
+                              create_vad(settings, ring.rate), timer, mute).configure(settings)
+    detector = create_wake_detector(settings)
+    if detector is None:
+        return listener
+    return WakeGate(ring, detector, listener, create_vad(settings, ring.rate), timer,
+                    mute).configure(settings)